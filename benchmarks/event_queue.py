@@ -0,0 +1,58 @@
+#!python
+
+from argparse import ArgumentParser, FileType, Namespace
+from contextlib import redirect_stdout
+from utils.files import get_from_file
+from utils.rts import mixrange
+from sim import Simulator, create_rts, event_queues
+import os
+import sys
+import time
+
+
+def bench_rts(jrts: dict, args, event_queue: str) -> tuple:
+    """
+    Simulate a rts with the given event list implementation.
+    :param jrts: rts
+    :param args: benchmark parameters
+    :param event_queue: event list implementation name
+    :return: number of simulated events and elapsed time in seconds
+    """
+    args.cpu.seek(0)
+    sim_args = Namespace(ss_methods=None, instance_count=args.instance_count, cpu=args.cpu,
+                         scheduler=args.scheduler, event_queue=event_queue, detect_cycles=False,
+                         verbose=False)
+    sim = Simulator(create_rts(jrts), sim_args)
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        start = time.perf_counter()
+        sim.sim()
+        elapsed = time.perf_counter() - start
+
+    return sim.event_count, elapsed
+
+
+def get_args():
+    """ Command line arguments """
+    parser = ArgumentParser(description="Compare the event list implementations of sim.py.")
+    parser.add_argument("file", nargs='?', type=FileType('r'), default=sys.stdin, help="File with RTS.")
+    parser.add_argument("--rts", type=str, help="Which RTS simulate.", default="0-15")
+    parser.add_argument("--scheduler", type=str, default="LPFPS", help="Scheduling algorithm")
+    parser.add_argument("--instance-count", type=int, default=1000, help="Instances of the lowest priority task.")
+    parser.add_argument("--cpu", type=FileType('r'), default="cpu.json", help="CPU model.")
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+
+    print("RTS\tTasks\tQueue\tEvents\tTime\tEvents/s")
+    for jrts in get_from_file(args.file, mixrange(args.rts)):
+        for event_queue in event_queues:
+            events, elapsed = bench_rts(jrts, args, event_queue)
+            print("{}\t{}\t{}\t{}\t{:.3f}\t{:.0f}".format(jrts["id"], len(jrts["ptasks"]), event_queue, events,
+                                                        elapsed, events / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!python
+
+from argparse import ArgumentParser, FileType
+import os
+import sys
+import time
+
+# Run as a script from any directory, the modules are imported from the repository root.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.files import get_from_file
+from utils.rts import mixrange, rts_to_arrays
+from schedtests import josephp, josephp_batch
+
+
+def bench_group(rts_list: list) -> tuple:
+    """
+    Evaluate task sets with the same number of tasks with josephp and josephp_batch.
+    :param rts_list: list of task lists
+    :return: josephp time, josephp_batch time and number of task sets with different results
+    """
+    c, t, d = rts_to_arrays(rts_list)
+
+    start = time.perf_counter()
+    schedulable, wcrt = josephp_batch(c, t, d)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = [josephp(rts, verbose=False) for rts in rts_list]
+    loop_time = time.perf_counter() - start
+
+    errors = 0
+    for idx, (rts, result) in enumerate(zip(rts_list, results)):
+        if result != schedulable[idx] or [task["R"] for task in rts] != wcrt[idx].tolist():
+            errors += 1
+
+    return loop_time, batch_time, errors
+
+
+def get_args():
+    """ Command line arguments """
+    parser = ArgumentParser(description="Compare josephp against the vectorized josephp_batch.")
+    parser.add_argument("file", nargs='?', type=FileType('r'), default=sys.stdin, help="File with RTS.")
+    parser.add_argument("--rts", type=str, help="RTS number inside file.", default="1")
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+
+    groups = {}
+    for rts in get_from_file(args.file, mixrange(args.rts)):
+        if rts["ptasks"]:
+            groups.setdefault(len(rts["ptasks"]), []).append(rts["ptasks"])
+
+    if not groups:
+        print("No RTS read, give a file with RTS and their numbers with --rts.", file=sys.stderr)
+        sys.exit(1)
+
+    print("Tasks\tRTS\tjosephp\tbatch\tSpeedup\tErrors")
+    for n, rts_list in sorted(groups.items()):
+        loop_time, batch_time, errors = bench_group(rts_list)
+        print("{}\t{}\t{:.3f}\t{:.3f}\t{:.1f}\t{}".format(n, len(rts_list), loop_time, batch_time,
+                                                      loop_time / batch_time, errors))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!python
+
+from argparse import ArgumentParser, FileType, Namespace
+from contextlib import redirect_stdout
+from utils.files import get_from_file
+from utils.rts import mixrange
+from sim import Simulator, Event, EventType, create_rts
+import os
+import sys
+import time
+import tracemalloc
+
+
+def object_size(obj) -> int:
+    """ Size of an object in bytes, including its attribute dict if it has one """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def bench_rts(jrts: dict, args, trace: bool) -> tuple:
+    """
+    Simulate a rts.
+    :param jrts: rts
+    :param args: benchmark parameters
+    :param trace: trace the memory allocations
+    :return: number of simulated events, number of jobs, elapsed time in seconds and allocated memory peak in bytes
+    """
+    args.cpu.seek(0)
+    sim_args = Namespace(ss_methods=None, instance_count=args.instance_count, cpu=args.cpu,
+                         scheduler=args.scheduler, event_queue="heap", detect_cycles=False, verbose=False)
+    rts = create_rts(jrts)
+    sim = Simulator(rts, sim_args)
+
+    peak = 0
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        if trace:
+            tracemalloc.start()
+        start = time.perf_counter()
+        sim.sim()
+        elapsed = time.perf_counter() - start
+        if trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    return sim.event_count, sum(task.job_counter for task in rts), elapsed, peak
+
+
+def get_args():
+    """ Command line arguments """
+    parser = ArgumentParser(description="Measure the cost of the Task, Job and Event objects of sim.py.")
+    parser.add_argument("file", nargs='?', type=FileType('r'), default=sys.stdin, help="File with RTS.")
+    parser.add_argument("--rts", type=str, help="Which RTS simulate.", default="0-15")
+    parser.add_argument("--scheduler", type=str, default="LPFPS", help="Scheduling algorithm")
+    parser.add_argument("--instance-count", type=int, default=1000, help="Instances of the lowest priority task.")
+    parser.add_argument("--cpu", type=FileType('r'), default="cpu.json", help="CPU model.")
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+
+    rts_list = list(get_from_file(args.file, mixrange(args.rts)))
+    if not rts_list:
+        return
+
+    task = create_rts(rts_list[0])[0]
+    job = task.new_job(0)
+    event = Event(0, EventType.ARRIVAL, task)
+    event_size, job_size = object_size(event), object_size(job)
+    print("Object sizes (bytes): Event {}, Job {}, Task {}".format(event_size, job_size, object_size(task)))
+
+    # every simulated event allocates an Event, and every arrival a Job
+    print("RTS\tTasks\tEvents\tTime\tEvents/s\tBytes/event\tPeak")
+    for jrts in rts_list:
+        events, jobs, elapsed, _ = bench_rts(jrts, args, False)
+        _, _, _, peak = bench_rts(jrts, args, True)
+        print("{}\t{}\t{}\t{:.3f}\t{:.0f}\t{:.1f}\t{}".format(jrts["id"], len(jrts["ptasks"]), events, elapsed,
+                                                             events / elapsed,
+                                                             (events * event_size + jobs * job_size) / events, peak))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!python
+
+from argparse import ArgumentParser, FileType
+from contextlib import redirect_stdout
+from copy import deepcopy
+from utils.files import get_from_file
+from utils.rts import mixrange
+from utils.profiling import set_profiling
+from schedtests import josephp
+from simso.core import Model
+from slack.SlackReplay import SlackLog, replay_slack_log
+from simulation import create_configuration
+import os
+import sys
+import time
+
+
+def record_slack_log(rts: dict, method: str, instance_count: int) -> SlackLog:
+    """
+    Simulate a rts with RM_SS_mono and record its slack calculations.
+    :param rts: rts
+    :param method: slack method
+    :param instance_count: instances of the lowest priority task
+    :return: slack log
+    """
+    rts = deepcopy(rts)
+    rts["schedulable"] = josephp(rts["ptasks"], verbose=False)
+    log = SlackLog()
+
+    cfg = create_configuration(rts, instance_count, "schedulers.RM_SS_mono")
+    cfg.trace = "null"
+    model = Model(cfg)
+    model.scheduler.data = {"rts": rts, "instance_count": instance_count, "ss_methods": [method], "gantt": False,
+                            "slack_log": log}
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        model.run_model()
+
+    return log
+
+
+def bench_replay(log: SlackLog, method: str, profile: bool) -> tuple:
+    """
+    Replay a slack log with or without operation counting.
+    :return: elapsed time in seconds and True if every result matches the recorded one
+    """
+    set_profiling(profile)
+    start = time.perf_counter()
+    divergence = replay_slack_log(log, method)
+    elapsed = time.perf_counter() - start
+    set_profiling(False)
+    return elapsed, divergence is None
+
+
+def bench_rta(rts_list: list, profile: bool) -> tuple:
+    """
+    Evaluate the rts with josephp with or without operation counting.
+    :return: elapsed time in seconds and the results (schedulability and wcrt of each rts)
+    """
+    rts_list = deepcopy(rts_list)
+    set_profiling(profile)
+    start = time.perf_counter()
+    results = [josephp(rts, verbose=False) for rts in rts_list]
+    elapsed = time.perf_counter() - start
+    set_profiling(False)
+    return elapsed, [(result, [task["R"] for task in rts]) for result, rts in zip(results, rts_list)]
+
+
+def get_args():
+    """ Command line arguments """
+    parser = ArgumentParser(description="Compare the slack methods and josephp with and without operation counting.")
+    parser.add_argument("file", nargs='?', type=FileType('r'), default=sys.stdin, help="File with RTS.")
+    parser.add_argument("--rts", type=str, help="Which RTS simulate.", default="0-13")
+    parser.add_argument("--instance-count", type=int, default=50, help="Instances of the lowest priority task.")
+    parser.add_argument("--methods", nargs='+', type=str, help="Slack methods.",
+                        default=["Fast", "Fast2", "Fixed", "Fixed2", "Fixed15", "SlackHet", "Davis"])
+    parser.add_argument("--repeat", type=int, default=100, help="josephp evaluations of each rts.")
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+
+    rts_list = list(get_from_file(args.file, mixrange(args.rts)))
+    schedulable = [rts for rts in rts_list if josephp(deepcopy(rts["ptasks"]), verbose=False)]
+
+    print("Method\tCalcs\tProfiling\tFast path\tSpeedup\tIdentical")
+    for method in args.methods:
+        calcs, profile_time, fast_time, identical = 0, 0, 0, True
+        for rts in schedulable:
+            try:
+                log = record_slack_log(rts, method, args.instance_count)
+            except Exception as exc:
+                print("{}: RTS {} skipped ({})".format(method, rts["id"], exc), file=sys.stderr)
+                continue
+            elapsed, same = bench_replay(log, method, True)
+            profile_time += elapsed
+            identical = identical and same
+            elapsed, same = bench_replay(log, method, False)
+            fast_time += elapsed
+            identical = identical and same
+            calcs += len(log)
+        print("{}\t{}\t{:.3f}\t{:.3f}\t{:.2f}\t{}".format(method, calcs, profile_time, fast_time,
+                                                         profile_time / fast_time if fast_time else 0, identical))
+
+    ptasks = [rts["ptasks"] for rts in rts_list] * args.repeat
+    profile_time, profile_results = bench_rta(ptasks, True)
+    fast_time, fast_results = bench_rta(ptasks, False)
+    print("josephp\t{}\t{:.3f}\t{:.3f}\t{:.2f}\t{}".format(len(ptasks), profile_time, fast_time,
+                                                         profile_time / fast_time, profile_results == fast_results))
+
+
+if __name__ == '__main__':
+    main()
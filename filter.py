@@ -1,30 +1,49 @@
 #!python
 from argparse import ArgumentParser, FileType
-from utils.rts import calculate_k, mixrange
+from itertools import islice
+from utils.rts import calculate_k, mixrange, rts_to_arrays
 from utils.files import get_from_file
-from schedtests import josephp
+from schedtests import josephp, josephp_batch
 import sys
 
 
 def format(rts: dict):
-    print("{0:}".format(len(rts["tasks"])))
-    for task in rts["tasks"]:  
+    print("{0:}".format(len(rts["ptasks"])))
+    for task in rts["ptasks"]:  
         print("{0:} {1:} {2:}".format(task["C"], task["T"], task["D"]))
 
 
 def filter(args, rts: dict):
-    rts["schedulable"] = josephp(rts["tasks"], verbose=False)
+    rts["schedulable"] = josephp(rts["ptasks"], verbose=False)
     if args.sched:
         if rts["schedulable"]:
             format(rts)
 
 
+def filter_batch(args, batch: list):
+    # group the task sets by number of tasks, and evaluate each group at once
+    groups = {}
+    for idx, rts in enumerate(batch):
+        groups.setdefault(len(rts["ptasks"]), []).append(idx)
+
+    for idxs in groups.values():
+        schedulable, _ = josephp_batch(*rts_to_arrays([batch[idx]["ptasks"] for idx in idxs]))
+        for idx, sched in zip(idxs, schedulable):
+            batch[idx]["schedulable"] = bool(sched)
+
+    if args.sched:
+        for rts in batch:
+            if rts["schedulable"]:
+                format(rts)
+
+
 def get_args():
     """ Command line arguments """
     parser = ArgumentParser(description="Filter RTS from file.")
     parser.add_argument("file", nargs='?', type=FileType('r'), default=sys.stdin, help="File with RTS.")
     parser.add_argument("--sched", action="store_true", default=True, help="Scheduling algorithm")
     parser.add_argument("--rts", type=str, help="RTS number inside file.", default="1")
+    parser.add_argument("--batch-size", type=int, default=1, help="Number of RTS evaluated at once with the vectorized RTA.")
     return parser.parse_args()
 
 
@@ -32,8 +51,16 @@ def main():
     args = get_args()
 
     try:
-        for rts in get_from_file(args.file, mixrange(args.rts)):
-            filter(args, rts)
+        rts_list = get_from_file(args.file, mixrange(args.rts))
+        if args.batch_size > 1:
+            while True:
+                batch = list(islice(rts_list, args.batch_size))
+                if not batch:
+                    break
+                filter_batch(args, batch)
+        else:
+            for rts in rts_list:
+                filter(args, rts)
     except KeyboardInterrupt:
         sys.exit(1)
 
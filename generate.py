@@ -0,0 +1,59 @@
+#!python
+
+from argparse import ArgumentParser
+from schedtests import josephp_batch
+from utils.generator import generate_batches, write_rts, utilization_methods, period_methods
+import numpy as np
+import sys
+
+
+def rm_schedulable(c, t, d):
+    """ Task sets schedulable under RM, by the vectorized RTA """
+    schedulable, _ = josephp_batch(c, t, d)
+    return schedulable
+
+
+def get_args():
+    """ Command line arguments """
+    parser = ArgumentParser(description="Generate random RTS.")
+    parser.add_argument("output", type=str, help="Output file, the extension selects the format (.xml, .json, .rtsb or .txt), - for txt on stdout.")
+    parser.add_argument("--nsets", type=int, default=1000, help="Number of RTS.")
+    parser.add_argument("--tasks", type=int, default=10, help="Number of tasks of each RTS.")
+    parser.add_argument("--utilization", type=float, default=0.7, help="Total utilization of each RTS.")
+    parser.add_argument("--method", type=str, choices=utilization_methods.keys(), default="uunifast", help="Utilization generator.")
+    parser.add_argument("--periods", type=str, choices=period_methods.keys(), default="loguniform", help="Period distribution.")
+    parser.add_argument("--period-min", type=int, default=10, help="Minimum period.")
+    parser.add_argument("--period-max", type=int, default=1000, help="Maximum period.")
+    parser.add_argument("--granularity", type=int, default=1, help="Periods are multiples of the granularity.")
+    parser.add_argument("--only-schedulable", action="store_true", default=False, help="Discard the RTS not schedulable under RM.")
+    parser.add_argument("--seed", type=int, help="Random seed, the same seed and batch size give the same RTS.")
+    parser.add_argument("--batch-size", type=int, default=10000, help="Number of RTS generated at once.")
+    args = parser.parse_args()
+    if args.utilization > args.tasks:
+        parser.error("the utilization can not be greater than the number of tasks")
+    if args.period_min < 1 or args.period_max < args.period_min:
+        parser.error("invalid period range")
+    return args
+
+
+def main():
+    args = get_args()
+
+    rng = np.random.default_rng(args.seed)
+    batches = generate_batches(rng, args.nsets, args.tasks, args.utilization, args.batch_size, args.method,
+                               args.periods, args.period_min, args.period_max, args.granularity,
+                               rm_schedulable if args.only_schedulable else None)
+
+    try:
+        count = write_rts(args.output, batches)
+    except KeyboardInterrupt:
+        sys.exit(1)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        sys.exit(1)
+
+    print("{} RTS written to {}".format(count, args.output), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
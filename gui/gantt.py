@@ -3,8 +3,12 @@ from PyQt5.QtGui import QPen, QFont, QImage, QPainter, QColor, QBrush
 from PyQt5.QtWidgets import QApplication, QDialog, QFileDialog, QHBoxLayout, QListWidgetItem, QListWidget, QPushButton, QScrollArea, QSizePolicy, QStyle, QToolBar, QVBoxLayout, QWidget
 
 from .QxtSpanSlider import QxtSpanSliderWidget
+from .gantt_index import GanttIndex, OVERHEAD
 
-from simso.core import JobEvent, ProcEvent
+import math
+import numpy as np
+
+QWIDGETSIZE_MAX = (1 << 24) - 1
 
 
 class GanttConfigure(QDialog):
@@ -66,18 +70,25 @@ class GanttConfigure(QDialog):
 
 
 class GanttCanvas(QWidget):
+    """
+    Gantt chart of the selected processors and tasks. The trace is indexed
+    once (see gui.gantt_index) and each paint event only draws the segments
+    visible in its rectangle, aggregated when several fall in a pixel.
+    """
     def __init__(self, sim, config, parent=None):
         super(GanttCanvas, self).__init__(parent)
         self._sim = sim
+        self._index = GanttIndex(sim)
         self._start_date, self._end_date, self._selected_items = config
         self.plot()
 
     def plot(self):
-        self._vwidth = (self._end_date - self._start_date) * 10 
+        self._vwidth = (self._end_date - self._start_date) * 10
+        if self._vwidth < 200:
+            self._vwidth = 200
+        self._vwidth = min(self._vwidth, QWIDGETSIZE_MAX - 40)
         self._width = self._vwidth + 40
         self._height = 20 + 80 * len(self._selected_items)
-        if self._width < 200:
-            self._width = 200
         self._update()
 
     def convX(self, x):
@@ -90,44 +101,59 @@ class GanttCanvas(QWidget):
 
     def paintEvent(self, event):
         qp = QPainter(self)
-        dirtyRect = event.rect()
-        i = dirtyRect.x() // (2 ** 15)
-        rect = QRect(dirtyRect.x() % (2 ** 15), dirtyRect.y(), dirtyRect.width(), dirtyRect.height())
-        qp.drawImage(dirtyRect, self._image[i], rect)
+        self.draw(qp, event.rect())
+        qp.end()
+
+    def draw(self, qp, rect):
+        """
+        Draw the part of the chart in rect.
+        """
+        qp.fillRect(rect, QColor(235, 235, 235, 255))
+        x, _ = self.origGraph(0)
+        ms_per_px = (self._end_date - self._start_date) / float(self._vwidth)
+        # Visible dates, with a margin for the labels and arrows.
+        t0 = max(self._start_date,
+                 self._start_date + (rect.left() - x - 20) * ms_per_px)
+        t1 = min(self._end_date,
+                 self._start_date + (rect.right() - x + 20) * ms_per_px)
+        if t0 > t1:
+            return
+        self.plot_gantt(qp, t0, t1, ms_per_px)
 
     def plot_graph(self, qp, name, start_date, end_date, step, substep, c):
         qp.save()
         convX = self.convX
-        graph_height = 50 
+        graph_height = 50
         qp.setBrush(QColor(255, 255, 255))
         x, y = self.origGraph(c)
-        qp.drawRect(QRectF(x - 1, y, convX(end_date - start_date) + 1,
-                           graph_height))
+        qp.drawRect(QRectF(x - 1 + convX(start_date - self._start_date), y,
+                           convX(end_date - start_date) + 1, graph_height))
 
+        # Ticks of the visible dates only.
         qp.setFont(QFont('Decorative', 8))
-        for i in range(start_date, end_date + 1, 1):
+        first = int(math.ceil(start_date / float(substep))) * substep
+        for i in range(first, int(end_date) + 1, substep):
             h = 0
             if i % step == 0:
                 text = str(i)
                 fw = qp.fontMetrics().width(text)
                 fh = qp.fontMetrics().height()
-                qp.drawText(x + convX(i - start_date) - fw // 2,
+                qp.drawText(x + convX(i - self._start_date) - fw // 2,
                             graph_height + y + fh + 1, text)
                 pen = qp.pen()
-                if i != start_date and i != end_date:
+                if i != self._start_date and i != self._end_date:
                     qp.setPen(QPen(Qt.DotLine))
-                    qp.drawLine(x + convX(i - start_date), y,
-                                x + convX(i - start_date),
+                    qp.drawLine(x + convX(i - self._start_date), y,
+                                x + convX(i - self._start_date),
                                 graph_height + y + 1)
                     qp.setPen(pen)
 
                 h = 4
-            elif i % substep == 0:
+            else:
                 h = 2
-            if h:
-                qp.drawLine(
-                    x + convX(i - start_date), graph_height + 1 + y,
-                    x + convX(i - start_date), graph_height + y + 1 + h)
+            qp.drawLine(
+                x + convX(i - self._start_date), graph_height + 1 + y,
+                x + convX(i - self._start_date), graph_height + y + 1 + h)
 
         qp.translate(x - 20, y + 65)
         qp.rotate(-90)
@@ -135,27 +161,32 @@ class GanttCanvas(QWidget):
         qp.drawText(QRect(0, 0, 80, 20), Qt.AlignCenter, name)
         qp.restore()
 
-    def plot_rect_graph(self, qp, start_x, end_x, color_style, c, speed=1.0):
-        if start_x < self._start_date:
-            start_x = self._start_date
-        if start_x >= end_x:
+    def plot_segments(self, qp, segments, c):
+        """
+        Draw the (start, end, speed, key) segments of a row, the height of a
+        segment is proportional to its speed.
+        """
+        start, end, speed, key = segments
+        if not len(start):
             return
 
-        start_x -= self._start_date
-        end_x -= self._start_date
-
         qp.save()
         qp.setPen(Qt.NoPen)
         x, y = self.origGraph(c)
-        color, style = color_style
-        color.setAlpha(200)
-        qp.setBrush(QBrush(color, style))
-        speed_var = 40 * speed;
-        qp.drawRect(QRectF(x + self.convX(start_x), y + (10 + (40 - speed_var)),
-                           self.convX(end_x - start_x), (speed_var)))
+        scale = self._vwidth / float(self._end_date - self._start_date)
+        left = x + (start - self._start_date) * scale
+        # At least a pixel wide, for the aggregated segments.
+        width = np.maximum((end - start) * scale, 1.0)
+        height = 40 * speed
+        top = y + 10 + (40 - height)
+        for k in np.unique(key):
+            color, style = self.get_color_key(int(k))
+            color.setAlpha(200)
+            qp.setBrush(QBrush(color, style))
+            sel = np.flatnonzero(key == k)
+            qp.drawRects([QRectF(left[i], top[i], width[i], height[i])
+                          for i in sel.tolist()])
         qp.restore()
-        #qp.drawLine(x + self.convX(start_x), y + 10,
-        #            x + self.convX(end_x), y + 10)
 
     def plot_vert_line_graph(self, qp, x_line, color, c, arrow_up=False,
                              arrow_down=False):
@@ -208,10 +239,30 @@ class GanttCanvas(QWidget):
             pattern = Qt.BDiagPattern
         return (QColor(*colors[i % len(colors)]), pattern)
 
-    def plot_gantt(self, event, qp, sim, start_date, end_date):
+    def get_color_key(self, key):
+        if key == OVERHEAD:
+            return (QColor(150, 150, 150), Qt.SolidPattern)
+        return self.get_color(key)
+
+    def plot_markers(self, qp, markers, t0, t1, ms_per_px, draw):
+        """
+        Draw the markers in [t0, t1], at most one per pixel.
+        """
+        dates, flags = markers.window(t0, t1)
+        if len(dates) > 1:
+            column = np.floor((dates - t0) / ms_per_px)
+            keep = np.ones(len(dates), dtype=bool)
+            keep[1:] = column[1:] != column[:-1]
+            # A flagged marker (missed deadline, abort) is never hidden.
+            keep |= flags
+            dates, flags = dates[keep], flags[keep]
+        for date, flag in zip(dates.tolist(), flags.tolist()):
+            draw(date, flag)
+
+    def plot_gantt(self, qp, start_date, end_date, ms_per_px):
         c = -1
 
-        zoom = self._vwidth / float(end_date - start_date)
+        zoom = self._vwidth / float(self._end_date - self._start_date)
 
         if zoom < 0.3:
             step = 200
@@ -225,107 +276,61 @@ class GanttCanvas(QWidget):
             step = 10
         else:
             step = 5
+        # Keep the labels at least 40 pixels apart when zoomed out.
+        while step * zoom < 40:
+            step *= 10
 
         substep = step // 5
 
         # Plot processors
-        for processor in [x for x in sim.processors
+        for processor in [x for x in self._sim.processors
                           if x in self._selected_items]:
             c += 1
             self.plot_graph(qp, processor.name, start_date, end_date, step,
                             substep, c)
-
-            x1 = start_date
-            color = None
-            speed = 1.0
-            for evt in processor.monitor:
-                current_date = float(evt[0]) / sim.cycles_per_ms
-                if current_date > end_date:
-                    break
-
-                if evt[1].event == ProcEvent.RUN:
-                    ncolor = self.get_color(evt[1].args.task.identifier)
-                elif evt[1].event == ProcEvent.OVERHEAD:
-                    ncolor = (QColor(150, 150, 150), Qt.SolidPattern)
-                elif evt[1].event == ProcEvent.IDLE:
-                    ncolor = None
-                elif evt[1].event == ProcEvent.SPEED:
-                    ncolor = None
-                    speed = evt[1].args
-
-                if ncolor != color:
-                    if current_date > x1 and color:
-                        self.plot_rect_graph(qp, x1, current_date, color, c, speed) 
-                    color = ncolor
-                    x1 = current_date
-
-            if color:
-                self.plot_rect_graph(qp, x1, end_date, color, c, speed)
+            self.plot_segments(qp, self._index.visible(
+                processor, start_date, end_date, ms_per_px), c)
 
         # Plot tasks
-        for task in [x for x in sim.task_list if x in self._selected_items]:
+        for task in [x for x in self._sim.task_list
+                     if x in self._selected_items]:
             c += 1
             self.plot_graph(
                 qp, task.name, start_date, end_date, step, substep, c)
+            self.plot_segments(qp, self._index.visible(
+                task, start_date, end_date, ms_per_px), c)
 
-            x1 = start_date
-            color = None
-            for evt in task.monitor:
-                current_date = evt[0] / float(sim.cycles_per_ms)
-                if current_date > end_date:
-                    break
-
-                if evt[1].event != JobEvent.ACTIVATE:
-                    if color and x1 < current_date:
-                        self.plot_rect_graph(qp, x1, current_date, color, c, evt[1].job.cpu.speed)
-                    if evt[1].event == JobEvent.EXECUTE:
-                        color = self.get_color(task.identifier)
-                    elif evt[1].event == JobEvent.PREEMPTED:
-                        color = None
-                    elif evt[1].event == JobEvent.TERMINATED:
-                        color = None
-                    elif evt[1].event == JobEvent.ABORTED:
-                        color = None
-
-                    x1 = current_date
-
-            if x1 < end_date and color:
-                self.plot_rect_graph(qp, x1, end_date, color, c, evt[1].job.cpu.speed)
+            row = self._index.tasks[task]
 
             # Draw activation lines.
-            for evt in task.monitor:
-                current_date = evt[0] / float(sim.cycles_per_ms)
-                if current_date > end_date:
-                    break
-
-                if evt[1].event == JobEvent.ACTIVATE:
-                    self.plot_vert_line_graph(qp, current_date,
-                                              QColor(50, 50, 50),
-                                              c, arrow_up=True)
+            self.plot_markers(
+                qp, row.activations, start_date, end_date, ms_per_px,
+                lambda date, flag: self.plot_vert_line_graph(
+                    qp, date, QColor(50, 50, 50), c, arrow_up=True))
 
             # Draw deadlines and dots.
-            for evt in task.monitor:
-                current_date = evt[0] / float(sim.cycles_per_ms)
-                if current_date > end_date:
-                    break
-
-                if evt[1].event == JobEvent.ACTIVATE:
-                    if current_date + task.deadline <= end_date:
-                        job_end = evt[1].job.end_date or end_date
-                        if (job_end > evt[1].job.absolute_deadline
-                                * sim.cycles_per_ms or evt[1].job.aborted):
-                            color = QColor(255, 0, 0)
-                        else:
-                            color = QColor(50, 50, 50)
-                        self.plot_vert_line_graph(
-                            qp, current_date + task.deadline, color, c,
-                            arrow_down=True)
-                elif evt[1].event == JobEvent.TERMINATED:
-                    self.plot_circle_graph(
-                        qp, current_date, QColor(0, 0, 0), c)
-                elif evt[1].event == JobEvent.ABORTED:
-                    self.plot_circle_graph(
-                        qp, current_date, QColor(255, 0, 0), c)
+            self.plot_markers(
+                qp, row.deadlines, start_date, end_date, ms_per_px,
+                lambda date, flag: self.plot_vert_line_graph(
+                    qp, date, QColor(255, 0, 0) if flag
+                    else QColor(50, 50, 50), c, arrow_down=True))
+            self.plot_markers(
+                qp, row.terminations, start_date, end_date, ms_per_px,
+                lambda date, flag: self.plot_circle_graph(
+                    qp, date, QColor(255, 0, 0) if flag
+                    else QColor(0, 0, 0), c))
+
+    def render_image(self):
+        """
+        Render the whole chart in a QImage, at most 2**15 pixels wide.
+        """
+        width = int(min(self._width, 2 ** 15))
+        image = QImage(width, int(self._height), QImage.Format_ARGB32)
+        qp = QPainter()
+        qp.begin(image)
+        self.draw(qp, QRect(0, 0, width, int(self._height)))
+        qp.end()
+        return image
 
     def saveImg(self):
         imageFile = QFileDialog.getSaveFileName(
@@ -334,10 +339,10 @@ class GanttCanvas(QWidget):
         if imageFile:
             if str(imageFile[-4:]) != ".png":
                 imageFile += ".png"
-            self._image[0].save(str(imageFile))
+            self.render_image().save(str(imageFile))
 
     def saveImgToFile(self, file):
-        self._image[0].save(file)
+        self.render_image().save(file)
 
     def zoomDown(self):
         self._vwidth /= 1.2
@@ -347,38 +352,20 @@ class GanttCanvas(QWidget):
         self._update()
 
     def zoomUp(self):
-        self._vwidth *= 1.2
+        # Maximum width of a QWidget.
+        self._vwidth = min(self._vwidth * 1.2, QWIDGETSIZE_MAX - 40)
         self._width = self._vwidth + 40
         self._update()
 
-    def create_qimage(self):
-        total_width = 0
-        images = []
-        while total_width < self._width:
-            w = min(self._width - total_width, 2 ** 15)
-            image = QImage(w, self._height, QImage.Format_ARGB32)
-            image.fill(QColor(235, 235, 235, 255))
-            total_width += w
-            images.append(image)
-        return images
-
     def _update(self):
-        QWidget.setFixedWidth(self, self._width)
-        QWidget.setFixedHeight(self, self._height)
+        QWidget.setFixedWidth(self, int(self._width))
+        QWidget.setFixedHeight(self, int(self._height))
         QWidget.setSizePolicy(self,
                               QSizePolicy.Fixed,
                               QSizePolicy.Fixed)
 
         QWidget.updateGeometry(self)
-
-        qp = QPainter()
-        self._image = self.create_qimage()
-        for image in self._image:
-            qp.begin(self._image[0])
-            #qp.setRenderHint(QPainter.Antialiasing)
-            self.plot_gantt(
-                None, qp, self._sim, self._start_date, self._end_date)
-            qp.end()
+        self.update()
 
     def configure(self):
         gc = GanttConfigure(self._sim, self._start_date, self._end_date)
@@ -0,0 +1,227 @@
+"""
+Interval index of a simulation trace for the Gantt chart.
+
+The monitor events of each processor and task are converted once into sorted NumPy arrays of execution segments
+(start, end, speed and a color key) and markers (activations, deadlines, terminations). The segments of a row do not
+overlap, so both the starts and the ends are sorted and the segments visible in a time window are found with two
+binary searches. When more than one segment falls in a pixel, the visible segments are aggregated so that the number
+of drawn rectangles is bounded by the width of the window in pixels.
+
+This module does not depend on Qt.
+"""
+import numpy as np
+
+from simso.core import JobEvent, ProcEvent
+
+# Color key of the overhead segments, the other keys are task identifiers.
+OVERHEAD = -1
+
+
+class Segments:
+    """
+    Non overlapping segments of a Gantt row, sorted by start date.
+    """
+    __slots__ = ("start", "end", "speed", "key")
+
+    def __init__(self, start, end, speed, key):
+        self.start = np.asarray(start, dtype=float)
+        self.end = np.asarray(end, dtype=float)
+        self.speed = np.asarray(speed, dtype=float)
+        self.key = np.asarray(key, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.start)
+
+    def window(self, t0: float, t1: float):
+        """
+        Segments that intersect [t0, t1], clipped to the window.
+        :return: (start, end, speed, key) arrays
+        """
+        first = np.searchsorted(self.end, t0, side="right")
+        last = np.searchsorted(self.start, t1, side="left")
+        return (np.clip(self.start[first:last], t0, t1), np.clip(self.end[first:last], t0, t1),
+                self.speed[first:last], self.key[first:last])
+
+    def visible(self, t0: float, t1: float, ms_per_px: float):
+        """
+        Segments to draw in [t0, t1] at a zoom of ms_per_px. Consecutive segments with the same key and speed
+        separated by less than a pixel are merged, and if several segments still start in the same pixel, they are
+        drawn as a single segment with the key and speed of the first one.
+        :return: (start, end, speed, key) arrays
+        """
+        start, end, speed, key = self.window(t0, t1)
+        if len(start) < 2 or ms_per_px <= 0:
+            return start, end, speed, key
+
+        # Merge the segments separated by gaps smaller than a pixel.
+        new = np.empty(len(start), dtype=bool)
+        new[0] = True
+        new[1:] = ((start[1:] - end[:-1] >= ms_per_px) | (key[1:] != key[:-1]) | (speed[1:] != speed[:-1]))
+        first = np.flatnonzero(new)
+        start, end, speed, key = start[first], np.maximum.reduceat(end, first), speed[first], key[first]
+
+        # One segment per pixel column.
+        column = np.floor((start - t0) / ms_per_px)
+        new = np.empty(len(start), dtype=bool)
+        new[0] = True
+        new[1:] = column[1:] != column[:-1]
+        if not new.all():
+            first = np.flatnonzero(new)
+            start, end, speed, key = start[first], np.maximum.reduceat(end, first), speed[first], key[first]
+
+        return start, end, speed, key
+
+
+class Markers:
+    """
+    Sorted dates of a Gantt row, with a flag for each one (missed deadline, aborted job).
+    """
+    __slots__ = ("date", "flag")
+
+    def __init__(self, date, flag=None):
+        self.date = np.asarray(date, dtype=float)
+        order = np.argsort(self.date, kind="stable")
+        self.date = self.date[order]
+        self.flag = (np.zeros(len(self.date), dtype=bool) if flag is None
+                     else np.asarray(flag, dtype=bool)[order])
+
+    def __len__(self):
+        return len(self.date)
+
+    def window(self, t0: float, t1: float):
+        """
+        Markers in [t0, t1].
+        :return: (date, flag) arrays
+        """
+        first = np.searchsorted(self.date, t0, side="left")
+        last = np.searchsorted(self.date, t1, side="right")
+        return self.date[first:last], self.flag[first:last]
+
+
+class ProcessorRow:
+    """
+    Execution (key of the task) and overhead segments of a processor.
+    """
+    def __init__(self, processor, cycles_per_ms):
+        self.name = processor.name
+        starts, ends, speeds, keys = [], [], [], []
+        changes, changes_speed = [0.0], [1.0]
+
+        key, x1, speed = None, 0.0, 1.0
+        for t, evt in processor.monitor:
+            date = t / float(cycles_per_ms)
+            nkey, nspeed = key, speed
+            if evt.event == ProcEvent.RUN:
+                nkey = evt.args.task.identifier
+            elif evt.event == ProcEvent.OVERHEAD:
+                nkey = OVERHEAD
+            elif evt.event == ProcEvent.IDLE:
+                nkey = None
+            elif evt.event == ProcEvent.SPEED:
+                nspeed = evt.args
+                changes.append(date)
+                changes_speed.append(nspeed)
+
+            if nkey != key or nspeed != speed:
+                if key is not None and date > x1:
+                    starts.append(x1)
+                    ends.append(date)
+                    speeds.append(speed)
+                    keys.append(key)
+                key, speed, x1 = nkey, nspeed, date
+
+        self.segments = Segments(starts, ends, speeds, keys)
+        # Open segment at the end of the trace, drawn up to the end of the window.
+        self.open_segment = (x1, speed, key) if key is not None else None
+        self._changes = np.asarray(changes)
+        self._changes_speed = np.asarray(changes_speed)
+
+    def speed_at(self, dates):
+        """ Speed of the processor at each date """
+        return self._changes_speed[np.searchsorted(self._changes, dates, side="right") - 1]
+
+
+class TaskRow:
+    """
+    Execution segments of the jobs of a task, and its activations, deadlines, terminations and aborts.
+    """
+    def __init__(self, task, cycles_per_ms, processor_rows):
+        self.name = task.name
+        self.identifier = task.identifier
+        starts, ends, cpus = [], [], []
+        activations, deadlines, missed = [], [], []
+        terminations, aborted = [], []
+
+        x1, cpu = None, None
+        for t, evt in task.monitor:
+            date = t / float(cycles_per_ms)
+            if evt.event == JobEvent.ACTIVATE:
+                job = evt.job
+                activations.append(date)
+                deadlines.append(date + task.deadline)
+                job_end = job.end_date or float("inf")
+                missed.append(job_end > job.absolute_deadline * cycles_per_ms or job.aborted)
+                continue
+
+            if x1 is not None and x1 < date:
+                starts.append(x1)
+                ends.append(date)
+                cpus.append(cpu)
+            x1 = None
+            if evt.event == JobEvent.EXECUTE:
+                x1, cpu = date, evt.cpu
+            elif evt.event == JobEvent.TERMINATED:
+                terminations.append(date)
+                aborted.append(False)
+            elif evt.event == JobEvent.ABORTED:
+                terminations.append(date)
+                aborted.append(True)
+
+        # The speed of a segment is the speed of its processor when it starts.
+        speeds = np.ones(len(starts))
+        for proc, row in processor_rows.items():
+            selected = np.array([c is proc for c in cpus], dtype=bool)
+            if selected.any():
+                speeds[selected] = row.speed_at(np.asarray(starts)[selected])
+
+        self.segments = Segments(starts, ends, speeds, np.full(len(starts), task.identifier))
+        # Open segment at the end of the trace, drawn up to the end of the window.
+        self.open_segment = None
+        if x1 is not None:
+            speed = float(processor_rows[cpu].speed_at(x1)) if cpu in processor_rows else 1.0
+            self.open_segment = (x1, speed, task.identifier)
+        self.activations = Markers(activations)
+        self.deadlines = Markers(deadlines, missed)
+        self.terminations = Markers(terminations, aborted)
+
+
+class GanttIndex:
+    """
+    Interval index of the processors and tasks of a simulation, built once from the monitor trace.
+    """
+    def __init__(self, sim):
+        """
+        :param sim: SimSo model simulated with the monitor trace
+        """
+        self.cycles_per_ms = sim.cycles_per_ms
+        self.processors = {proc: ProcessorRow(proc, sim.cycles_per_ms) for proc in sim.processors}
+        self.tasks = {task: TaskRow(task, sim.cycles_per_ms, self.processors) for task in sim.task_list}
+
+    def row(self, item):
+        """ Row of a processor or a task """
+        return self.processors.get(item) or self.tasks[item]
+
+    def visible(self, item, t0: float, t1: float, ms_per_px: float):
+        """
+        Segments of a row to draw in [t0, t1], including the segment still open at the end of the trace.
+        :return: (start, end, speed, key) arrays
+        """
+        row = self.row(item)
+        start, end, speed, key = row.segments.visible(t0, t1, ms_per_px)
+        if row.open_segment is not None and row.open_segment[0] < t1:
+            x1, open_speed, open_key = row.open_segment
+            start = np.append(start, max(x1, t0))
+            end = np.append(end, t1)
+            speed = np.append(speed, open_speed)
+            key = np.append(key, open_key)
+        return start, end, speed, key
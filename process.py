@@ -3,20 +3,21 @@
 import pandas as pd
 import numpy as np
 import sys
-from argparse import ArgumentParser, FileType
+from argparse import ArgumentParser
+from utils.results import read_events, events_tables
 
 
 def get_args(options):
     """ Command line arguments """
     parser = ArgumentParser()
-    parser.add_argument("file", nargs="?", default=sys.stdin, type=FileType('r'), help="File with results.")
+    parser.add_argument("files", nargs="*", type=str, help="Files with recorded events (events test), the other tests read stdin.")
     parser.add_argument("--test", type=str, choices=options, default=options[0], help="Test to process.")
     parser.add_argument("--sum", action="store_true", default=False);
     return parser.parse_args()
 
 
 def main():
-    options = ["slack", "sched", "sched2"]
+    options = ["slack", "sched", "sched2", "events"]
 
     args = get_args(options)
 
@@ -36,6 +37,9 @@ def main():
     elif args.test == options[2]:
         df = pd.read_csv(sys.stdin, sep='\t')
         print(df.to_markdown())
+    elif args.test == options[3]:
+        df = pd.concat([read_events(f) for f in args.files], ignore_index=True)
+        print(events_tables(df, args.sum))
 
 if __name__ == '__main__':
     main()
@@ -5,6 +5,7 @@ from argparse import ArgumentParser, FileType
 from schedtests import rta, rta_uf, rta2, rta2u, rta3, rta3u, rta4, rta4u, rta4a, het2, het2u, josephp, josephp_u
 from utils.files import get_from_file
 from utils.rts import mixrange
+from utils.profiling import set_profiling
 import math
 import sys
 
@@ -58,10 +59,13 @@ def get_args():
 def main():
     args = get_args()
 
+    # The ceil and floor counts are the output of this script.
+    set_profiling(True)
+
     try:
         print("Method\tCC")
         for rts in get_from_file(args.file, mixrange(args.rts)):
-            analyze_rts(rts["tasks"])
+            analyze_rts(rts["ptasks"])
     except KeyboardInterrupt:
         sys.exit(1)
 
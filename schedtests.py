@@ -1,22 +1,13 @@
 import math
+from utils.profiling import counted_global, cc_count
 
-def josephp(rts: list, verbose=True):
-    """ Calcula el WCRT de cada tarea del str y evalua la planificabilidad """
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
+ceil = counted_global(globals(), "ceil", math.ceil)
+floor = counted_global(globals(), "floor", math.floor)
 
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
 
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+def josephp(rts: list, verbose=True):
+    """ Calcula el WCRT de cada tarea del str y evalua la planificabilidad """
+    cc_start = cc_count(ceil, floor)
 
 
     schedulable = True
@@ -38,28 +29,60 @@ def josephp(rts: list, verbose=True):
         task["R"] = r
 
     if verbose:
-        print("JYP\t{0:}".format(floor.counter + ceil.counter))
+        print("JYP\t{0:}".format(cc_count(ceil, floor) - cc_start))
 
     return schedulable
 
 
-def josephp_u(rts: list, verbose=True):
-    """ Calcula el WCRT de cada tarea del str y evalua la planificabilidad """
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
+def josephp_batch(c, t, d):
+    """
+    Joseph & Pandya RTA over a batch of task sets with the same number of tasks. Row k of the 2-D integer or float
+    arrays c, t and d holds the task set k, sorted by priority. The fixed point is iterated for all the task sets at
+    once, masking the ones that already converged. The results are the same that josephp gives for each task set.
+    :param c: wcet matrix
+    :param t: period matrix
+    :param d: deadline matrix
+    :return: schedulability vector and wcrt matrix
+    """
+    import numpy as np
+
+    n_rts, n_tasks = c.shape
+    integer = np.issubdtype(c.dtype, np.integer) and np.issubdtype(t.dtype, np.integer)
+    schedulable = np.ones(n_rts, dtype=bool)
+    wcrt = np.ones((n_rts, n_tasks), dtype=c.dtype)
+    wcrt[:, 0] = c[:, 0]
+
+    for i in range(1, n_tasks):
+        # only the task sets still schedulable are analyzed
+        active = np.flatnonzero(schedulable)
+        r = np.ones(len(active), dtype=c.dtype)
+        hc, ht = c[active, :i], t[active, :i]
+
+        while len(active):
+            if integer:
+                w = c[active, i] + ((-(-r[:, np.newaxis] // ht)) * hc).sum(axis=1)
+            else:
+                # same float operations and summation order as josephp
+                w = np.zeros(len(active))
+                for j in range(i):
+                    w += np.ceil(r / ht[:, j]) * hc[:, j]
+                w = c[active, i] + w
+            pending = w != r
+            r = w
+            wcrt[active, i] = r
+
+            missed = pending & (r > d[active, i])
+            schedulable[active[missed]] = False
 
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
+            pending &= ~missed
+            active, r, hc, ht = active[pending], r[pending], hc[pending], ht[pending]
 
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    return schedulable, wcrt
+
+
+def josephp_u(rts: list, verbose=True):
+    """ Calcula el WCRT de cada tarea del str y evalua la planificabilidad """
+    cc_start = cc_count(ceil, floor)
 
 
     schedulable = True
@@ -89,27 +112,13 @@ def josephp_u(rts: list, verbose=True):
         task["R"] = r
 
     if verbose:
-        print("JYPu\t{0:}".format(floor.counter + ceil.counter))
+        print("JYPu\t{0:}".format(cc_count(ceil, floor) - cc_start))
 
     return schedulable
 
 
 def rta(rts, verbose=True):
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    cc_start = cc_count(ceil, floor)
 
 
     wcrt = [0] * len(rts)
@@ -159,7 +168,7 @@ def rta(rts, verbose=True):
             break
 
     if verbose:
-        print("RTA1\t{0:}".format(floor.counter + ceil.counter))
+        print("RTA1\t{0:}".format(cc_count(ceil, floor) - cc_start))
 
     return [schedulable, wcrt, ceils, loops, for_loops, while_loops]
 
@@ -169,21 +178,7 @@ def rta_uf(rts, verbose=True):
     RTA con la modificación en el orden de las tareas el sumatoria (por FU)
     """
 
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    cc_start = cc_count(ceil, floor)
 
 
     wcrt = [0] * len(rts)
@@ -240,27 +235,13 @@ def rta_uf(rts, verbose=True):
             break
 
     if verbose:
-        print("RTA1u\t{0:}".format(floor.counter + ceil.counter))
+        print("RTA1u\t{0:}".format(cc_count(ceil, floor) - cc_start))
 
     return [schedulable, wcrt, ceils, loops, for_loops, while_loops]
 
 
 def rta2(rts):
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    cc_start = cc_count(ceil, floor)
 
 
     wcrt = [0] * len(rts)
@@ -314,26 +295,12 @@ def rta2(rts):
             wcrt[idx] = 0
             break
 
-    print("RTA2\t{0:}".format(floor.counter + ceil.counter))
+    print("RTA2\t{0:}".format(cc_count(ceil, floor) - cc_start))
     return [schedulable, wcrt, ceils, loops, for_loops, while_loops]
 
 
 def rta2u(rts):
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    cc_start = cc_count(ceil, floor)
 
 
     wcrt = [0] * len(rts)
@@ -394,26 +361,12 @@ def rta2u(rts):
             wcrt[idx] = 0
             break
 
-    print("RTA2u\t{0:}".format(floor.counter + ceil.counter))
+    print("RTA2u\t{0:}".format(cc_count(ceil, floor) - cc_start))
     return [schedulable, wcrt, ceils, loops, for_loops, while_loops]
 
 
 def rta3(rts):
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    cc_start = cc_count(ceil, floor)
 
 
     wcrt = [0] * len(rts)
@@ -472,26 +425,12 @@ def rta3(rts):
             wcrt[idx] = 0
             break
 
-    print("RTA3\t{0:}".format(floor.counter + ceil.counter))
+    print("RTA3\t{0:}".format(cc_count(ceil, floor) - cc_start))
     return [schedulable, wcrt, ceils, loops, for_loops, while_loops]
 
 
 def rta4(rts):
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    cc_start = cc_count(ceil, floor)
 
 
     wcrt = [0] * len(rts)
@@ -555,26 +494,12 @@ def rta4(rts):
             wcrt[idx] = 0
             break
 
-    print("RTA4\t{0:}".format(floor.counter + ceil.counter))
+    print("RTA4\t{0:}".format(cc_count(ceil, floor) - cc_start))
     return [schedulable, wcrt, ceils, loops, for_loops, while_loops]
 
 
 def het2(rts):
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    cc_start = cc_count(ceil, floor)
 
 
     def workload(i, b, n):
@@ -625,26 +550,12 @@ def het2(rts):
             break
         wcrt[idx] = w + task["C"]
 
-    print("HET2\t{0:}".format(floor.counter + ceil.counter))
+    print("HET2\t{0:}".format(cc_count(ceil, floor) - cc_start))
     return [schedulable, wcrt, ceils, loops, for_loops, while_loops]
 
 
 def het2u(rts):
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    cc_start = cc_count(ceil, floor)
 
 
     def workload(i, b, n):
@@ -700,26 +611,12 @@ def het2u(rts):
             break
         wcrt[idx] = w + task["C"]
 
-    print("HET2u\t{0:}".format(floor.counter + ceil.counter))
+    print("HET2u\t{0:}".format(cc_count(ceil, floor) - cc_start))
     return [schedulable, wcrt, ceils, loops, for_loops, while_loops]
 
 
 def rta3u(rts):
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    cc_start = cc_count(ceil, floor)
 
 
     wcrt = [0] * len(rts)
@@ -784,27 +681,13 @@ def rta3u(rts):
             wcrt[idx] = 0
             break
 
-    print("RTA3u\t{0:}".format(floor.counter + ceil.counter))
+    print("RTA3u\t{0:}".format(cc_count(ceil, floor) - cc_start))
     return [schedulable, wcrt, ceils, loops, for_loops, while_loops]
 
 
 
 def rta4u(rts):
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    cc_start = cc_count(ceil, floor)
 
 
     wcrt = [0] * len(rts)
@@ -874,26 +757,12 @@ def rta4u(rts):
             wcrt[idx] = 0
             break
 
-    print("RTA4u\t{0:}".format(floor.counter + ceil.counter))
+    print("RTA4u\t{0:}".format(cc_count(ceil, floor) - cc_start))
     return [schedulable, wcrt, ceils, loops, for_loops, while_loops]
 
 
 def rta4a(rts):
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    cc_start = cc_count(ceil, floor)
 
 
     wcrt = [0] * len(rts)
@@ -963,26 +832,12 @@ def rta4a(rts):
             wcrt[idx] = 0
             break
 
-    print("RTA4a\t{0:}".format(floor.counter + ceil.counter))
+    print("RTA4a\t{0:}".format(cc_count(ceil, floor) - cc_start))
     return [schedulable, wcrt, ceils, loops, for_loops, while_loops]
 
 
 def rta8(rts):
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
+    cc_start = cc_count(ceil, floor)
 
 
     wcrt = [0] * len(rts)
@@ -1052,5 +907,5 @@ def rta8(rts):
             wcrt[idx] = 0
             break
 
-    print("RTA8\t{0:}".format(floor.counter + ceil.counter))
+    print("RTA8\t{0:}".format(cc_count(ceil, floor) - cc_start))
     return [schedulable, wcrt, ceils, loops, for_loops, while_loops]
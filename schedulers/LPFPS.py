@@ -6,6 +6,7 @@ Systems" by Youngsoo Shin and Kiyoung Choi.
 """
 from simso.core import Scheduler
 from schedulers.MissedDeadlineException import MissedDeadlineException
+from utils.readyqueue import PriorityBitmapReadyQueue
 import sys
 import math
 
@@ -13,7 +14,7 @@ import math
 class LPFPS(Scheduler):
 
     def init(self):
-        self._ready_list = []
+        self._ready_list = PriorityBitmapReadyQueue(lambda job: job.period, [task.period for task in self.task_list])
         self._early_activation = sys.maxsize
         self._energy = 0
         self._cpu = self.data["cpu"]
@@ -42,7 +43,7 @@ class LPFPS(Scheduler):
         job.cpu.set_speed(1.0)
         self._cpu.set_lvl(job.cpu.speed)
 
-        self._energy += job.computation_time * self._cpu.curlvl[3]
+        self._energy += self._cpu.consume(job.computation_time)
 
         self.print('E', job)
 
@@ -53,7 +54,7 @@ class LPFPS(Scheduler):
     def schedule(self, cpu):
         if self._ready_list:
             # Ready job with the highest priority (lowest period)
-            job = min(self._ready_list, key=lambda x: x.period)
+            job = self._ready_list.first()
 
             if len(self._ready_list) == 1:
                 # Compute new speed ratio
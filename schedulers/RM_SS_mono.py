@@ -4,36 +4,50 @@ Rate Monotic algorithm for uniprocessor architectures -- with Slack Stealing.
 from simso.core import Scheduler
 from schedulers.MissedDeadlineException import MissedDeadlineException
 from slack.SlackUtils import reduce_slacks, multiple_slack_calc, get_minimum_slack
+from slack.SlackCache import SlackCache
+from slack.SlackTime import SlackClock
 from utils.rts import calculate_k
+from utils.readyqueue import PriorityBitmapReadyQueue
 
 
 class RM_SS_mono(Scheduler):
 
     def init(self):
-        self.ready_list = []
+        self.ready_list = PriorityBitmapReadyQueue(lambda job: job.period, [task.period for task in self.task_list])
         self.min_slack = 0
         self.idle_start = 0
         self._last_activation_time = -1
 
+        # Time base of the slack values, ms or integer cycles.
+        self._clock = SlackClock(self.sim, self.data.get("integer_time", False))
+        self._exact = self._clock.integer
+        # Event recorder, the events are printed if there is none.
+        self._results = self.data.get("results")
+
         calculate_k(self.data["rts"]["ptasks"])
 
         # Required fields for slack stealing simulation.
         for ptask in self.data["rts"]["ptasks"]:
             ptask["start_exec_time"] = 0
-            ptask["ss"] = {'slack': ptask["k"], 'ttma': 0, 'di': 0, 'start_exec_time': 0, 'last_psi': 0,
-                           'last_slack': 0, 'ii': 0}
+            ptask["ss"] = {'slack': self._clock.from_ms(ptask["k"]), 'ttma': 0, 'di': 0, 'start_exec_time': 0,
+                           'last_psi': 0, 'last_slack': 0, 'ii': 0}
             for ss_method in self.data["ss_methods"]:
-                ptask["ss"][ss_method] = {'a': ptask["C"], 'b': ptask["T"], 'c': 0}
+                ptask["ss"][ss_method] = {'a': self._clock.from_ms(ptask["C"]), 'b': self._clock.from_ms(ptask["T"]),
+                                          'c': 0}
 
         for atask in self.data["rts"]["atasks"]:
             atask["start_exec_time"] = 0
 
+        # Data shared by every slack calculation.
+        self._slack_cache = SlackCache(self.task_list, self.data.get("slack_log"),
+                                       self._clock.cycles_per_ms if self._exact else None, self._results)
+
         # Calculate slack at t=0
         for task in self.task_list:
             task.data["ss"]["slack"], task.data["ss"]["ttma"] = self._calc_slack(0, task)
 
         # Find the system minimum slack and the time at which it occurs
-        self.min_slack, _, _ = get_minimum_slack(self.task_list)
+        self.min_slack, _, _ = get_minimum_slack(self.task_list, self._exact)
 
     def on_activate(self, job):
         self._print('A', job)
@@ -44,23 +58,23 @@ class RM_SS_mono(Scheduler):
 
     def on_terminated(self, job):
         # current simulation time
-        tc = self.sim.now() / self.sim.cycles_per_ms
+        tc = self._clock.now()
 
         # verify deadline
         if job.exceeded_deadline:
             raise MissedDeadlineException(tc, job)
 
-        # executed time in ms since last execution
-        job_runtime = (self.sim.now() - job.task.data["ss"]["start_exec_time"]) / self.sim.cycles_per_ms
+        # executed time since last execution
+        job_runtime = self._clock.since(job.task.data["ss"]["start_exec_time"])
 
         # decrement higher priority tasks slack
-        reduce_slacks(self.task_list[:(job.task.identifier - 1)], job_runtime, tc)
+        reduce_slacks(self.task_list[:(job.task.identifier - 1)], job_runtime, tc, self._exact)
 
         # Calculate this task new slack.
         job.task.data["ss"]["slack"], job.task.data["ss"]["ttma"] = self._calc_slack(tc, job.task)
 
         # Find the system minimum slack and the time at which it occurs.
-        self.min_slack, _, _ = get_minimum_slack(self.task_list)
+        self.min_slack, _, _ = get_minimum_slack(self.task_list, self._exact)
 
         # Log event.
         self._print('E', job)
@@ -71,30 +85,30 @@ class RM_SS_mono(Scheduler):
 
     def schedule(self, cpu):
         # Current simulation time
-        tc = self.sim.now() / self.sim.cycles_per_ms
+        tc = self._clock.now()
         job = cpu.running
 
         if len(self.ready_list) > 0:
             if cpu.running:
-                # Current job executed time in ms.
-                job_runtime = (self.sim.now() - cpu.running.task.data["ss"]["start_exec_time"]) / self.sim.cycles_per_ms
+                # Current job executed time.
+                job_runtime = self._clock.since(cpu.running.task.data["ss"]["start_exec_time"])
                 # Decrement higher priority tasks' slack.
-                reduce_slacks(self.task_list[:(cpu.running.task.identifier - 1)], job_runtime, tc)
+                reduce_slacks(self.task_list[:(cpu.running.task.identifier - 1)], job_runtime, tc, self._exact)
             else:
                 # compute idle time
                 if self.idle_start > 0:
                     # Compute the idle time.
-                    elapsed_idle_time = tc / self.sim.cycles_per_ms
+                    elapsed_idle_time = self._clock.since(self.idle_start)
                     # Reduce tasks' slacks
-                    reduce_slacks(self.task_list, elapsed_idle_time, tc)
+                    reduce_slacks(self.task_list, elapsed_idle_time, tc, self._exact)
                     # Reset the idle start time.
                     self.idle_start = 0
 
             # Find the system minimum slack and the time at which it occurs
-            self.min_slack, _, _ = get_minimum_slack(self.task_list)
+            self.min_slack, _, _ = get_minimum_slack(self.task_list, self._exact)
 
             # Select the ready job with the highest priority (lowest period).
-            job = min(self.ready_list, key=lambda x: x.period)
+            job = self.ready_list.first()
             # Update the execution start time.
             job.task.data["ss"]["start_exec_time"] = self.sim.now()
         else:
@@ -107,10 +121,16 @@ class RM_SS_mono(Scheduler):
         return job, cpu
 
     def _print(self, event, job):
+        if self._results is not None:
+            self._results.record_job(self.sim.now() / self.sim.cycles_per_ms, job, event,
+                                     slack=self._clock.ms(job.task.data["ss"]["slack"]),
+                                     ttma=self._clock.ms(job.task.data["ss"]["ttma"]),
+                                     cpu_level=job.cpu.speed)
+            return
         print("{:03.2f}\t{}\t{}\t{}".format(
             self.sim.now() / self.sim.cycles_per_ms, job.name, event,
-            '\t'.join(["{:03.2f}".format(task.data["ss"]["slack"]) for task in self.task_list])))
+            '\t'.join(["{:03.2f}".format(self._clock.ms(task.data["ss"]["slack"])) for task in self.task_list])))
 
     def _calc_slack(self, tc, task):
-        ss_result = multiple_slack_calc(tc, task, self.task_list, self.data["ss_methods"])
+        ss_result = multiple_slack_calc(tc, task, self.task_list, self.data["ss_methods"], self._slack_cache)
         return ss_result["slack"], ss_result["ttma"]
@@ -8,13 +8,14 @@ from schedulers.MissedDeadlineException import MissedDeadlineException
 from slack.SlackUtils import reduce_slacks, multiple_slack_calc, get_minimum_slack
 from utils.rts import calculate_k
 from schedtests import josephp
+from utils.readyqueue import PriorityBitmapReadyQueue
 import copy
 
 
 class RM_SS_mono_e(Scheduler):
 
     def init(self):
-        self.ready_list = []
+        self.ready_list = PriorityBitmapReadyQueue(lambda job: job.period, [task.period for task in self.task_list])
         self.min_slack = 0
         self.min_slack_t = 0
         self.idle_start = 0
@@ -96,7 +97,7 @@ class RM_SS_mono_e(Scheduler):
         # Find the system minimum slack and the time at which it occurs
         self.min_slack, self.min_slack_t = get_minimum_slack(self.task_list)
 
-        self._energy += job.computation_time * self._cpu.curlvl[3]
+        self._energy += self._cpu.consume(job.computation_time)
 
         self.print('E', job)
 
@@ -123,7 +124,7 @@ class RM_SS_mono_e(Scheduler):
                 elapsed_idle_time = (self.sim.now() - self.idle_start) / self.sim.cycles_per_ms
                 t = self.sim.now() / self.sim.cycles_per_ms
                 reduce_slacks(self.task_list, elapsed_idle_time, t)
-                self._energy += elapsed_idle_time * self._cpu.curlvl[3]
+                self._energy += self._cpu.consume(elapsed_idle_time)
                 self.idle_start = 0
 
                 # Find the system minimum slack and the time at which it occurs
@@ -136,7 +137,7 @@ class RM_SS_mono_e(Scheduler):
 
         if self.ready_list:
             # ready job with the highest priority (lowest period)
-            job = min(self.ready_list, key=lambda x: x.period)
+            job = self.ready_list.first()
 
             # update execution start time
             job.task.data["ss"]["start_exec_time"] = self.sim.now()
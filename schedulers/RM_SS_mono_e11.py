@@ -9,14 +9,22 @@ import sys
 from simso.core import Scheduler, Timer
 from schedulers.MissedDeadlineException import MissedDeadlineException
 from slack.SlackUtils import reduce_slacks, multiple_slack_calc, get_minimum_slack
+from slack.SlackCache import SlackCache
+from slack.SlackTime import SlackClock
 from utils.rts import calculate_k, rta
 from math import isclose
+from utils.readyqueue import PriorityBitmapReadyQueue
 
 
 class RM_SS_mono_e11(Scheduler):
 
     def init(self):
-        self.ready_list = []
+        self.ready_list = PriorityBitmapReadyQueue(lambda job: job.period, [task.period for task in self.task_list])
+        # Time base of the slack values, ms or integer cycles.
+        self._clock = SlackClock(self.sim, self.data.get("integer_time", False))
+        self._exact = self._clock.integer
+        # Event recorder, the events are printed if there is none.
+        self._results = self.data.get("results")
         self.min_slack = 0
         self.min_slack_t = 0
         self.min_slack_s = 0
@@ -44,14 +52,19 @@ class RM_SS_mono_e11(Scheduler):
             ptask["ss"] = {'slack': 0, 'ttma': 0, 'di': 0}
             ptask["dvs"] = {'a': ptask["C"], 'b': 0, 'bp': 0, 'brun': False}
             for ss_method in self.data["ss_methods"]:
-                ptask["ss"][ss_method] = {'a': ptask["C"], 'b': ptask["T"], 'c': 0}
+                ptask["ss"][ss_method] = {'a': self._clock.from_ms(ptask["C"]),
+                                          'b': self._clock.from_ms(ptask["T"]), 'c': 0}
+
+        # Data shared by every slack calculation.
+        self._slack_cache = SlackCache(self.task_list, self.data.get("slack_log"),
+                                       self._clock.cycles_per_ms if self._exact else None, self._results)
 
         # Calculate slack at t=0
         for task in self.task_list:
             task.data["ss"]["slack"], task.data["ss"]["ttma"] = self._calc_slack(0, task)
 
         # Find the system minimum slack and the time at which it occurs
-        self.min_slack, self.min_slack_t, self.min_slack_task = get_minimum_slack(self.task_list)
+        self.min_slack, self.min_slack_t, self.min_slack_task = get_minimum_slack(self.task_list, self._exact)
 
         self.f_zero = (self.min_slack_t - self.min_slack) / self.min_slack_t
         self.f_min = self.f_zero
@@ -77,21 +90,21 @@ class RM_SS_mono_e11(Scheduler):
 
     def on_terminated(self, job):
         # Current simulation time.
-        tc = self.sim.now() / self.sim.cycles_per_ms
+        tc = self._clock.now()
         # Verify deadline.
         if job.exceeded_deadline:
             #raise MissedDeadlineException(tc, job)
-            print("{:03.2f}\t{}\tDEADLINE MISS".format(tc, job.name))
-        # Executed time in ms since last execution.
-        job_runtime = (self.sim.now() - job.task.data["ss"]["start_exec_time"]) / self.sim.cycles_per_ms
+            print("{:03.2f}\t{}\tDEADLINE MISS".format(self._clock.ms(tc), job.name))
+        # Executed time since last execution.
+        job_runtime = self._clock.since(job.task.data["ss"]["start_exec_time"])
         # Decrement higher priority tasks' slack.
-        reduce_slacks(self.task_list[:(job.task.identifier - 1)], job_runtime, tc)
+        reduce_slacks(self.task_list[:(job.task.identifier - 1)], job_runtime, tc, self._exact)
         # Calculate this task new slack.
         job.task.data["ss"]["slack"], job.task.data["ss"]["ttma"] = self._calc_slack(tc, job.task)
         # Find the system minimum slack and the time at which it occurs.
-        self.min_slack, self.min_slack_t, min_slack_task = get_minimum_slack(self.task_list)
+        self.min_slack, self.min_slack_t, min_slack_task = get_minimum_slack(self.task_list, self._exact)
         # Compute energy consumption.
-        self._energy += job.computation_time * self._cpu.curlvl[3]
+        self._energy += self._cpu.consume(job.computation_time)
         if job.task == self._icf_task:
             self._icf_calc_flag = True
         # Log event.
@@ -103,30 +116,30 @@ class RM_SS_mono_e11(Scheduler):
 
     def schedule(self, cpu):
         # Current simulation time
-        tc = self.sim.now() / self.sim.cycles_per_ms
+        tc = self._clock.now()
         job = cpu.running
 
         if len(self.ready_list) > 0:
             if cpu.running:
-                # Current job executed time in ms.
-                job_runtime = (self.sim.now() - cpu.running.task.data["ss"]["start_exec_time"]) / self.sim.cycles_per_ms
+                # Current job executed time.
+                job_runtime = self._clock.since(cpu.running.task.data["ss"]["start_exec_time"])
                 # Check if the B part has ended
                 if self._finb is True:
-                    reduce_slacks(self.task_list, job_runtime, tc)
+                    reduce_slacks(self.task_list, job_runtime, tc, self._exact)
                     self._preempt = True
                     self._finb = False
                 else:
                     # Decrement higher priority tasks' slack.
-                    reduce_slacks(self.task_list[:(cpu.running.task.identifier - 1)], job_runtime, tc)
+                    reduce_slacks(self.task_list[:(cpu.running.task.identifier - 1)], job_runtime, tc, self._exact)
             else:
                 # compute idle time
                 if self.idle_start > 0:
                     # Compute the idle time.
-                    elapsed_idle_time = (self.sim.now() - self.idle_start) / self.sim.cycles_per_ms
+                    elapsed_idle_time = self._clock.since(self.idle_start)
                     # Reduce tasks' slacks
-                    reduce_slacks(self.task_list, elapsed_idle_time, tc)
+                    reduce_slacks(self.task_list, elapsed_idle_time, tc, self._exact)
                     # Record energy consumption
-                    self._energy += elapsed_idle_time * self._cpu.curlvl[3]
+                    self._energy += self._cpu.consume(self._clock.ms(elapsed_idle_time))
                     #  Restore the CPU v/f
                     self._restore_speed()
                     # Reset the idle start time.
@@ -135,10 +148,10 @@ class RM_SS_mono_e11(Scheduler):
                     self._icf_calc_flag = True
 
             # Find the system minimum slack and the time at which it occurs
-            self.min_slack, self.min_slack_t, self.min_slack_task = get_minimum_slack(self.task_list)
+            self.min_slack, self.min_slack_t, self.min_slack_task = get_minimum_slack(self.task_list, self._exact)
 
             # Select the ready job with the highest priority (lowest period).
-            job = min(self.ready_list, key=lambda x: x.period)
+            job = self.ready_list.first()
             # Update the execution start time.
             job.task.data["ss"]["start_exec_time"] = self.sim.now()
 
@@ -146,7 +159,8 @@ class RM_SS_mono_e11(Scheduler):
             if self._icf_calc_flag: # or isclose(tc, self._icf_t, rel_tol=0.0005):
                 prev_icf_t = self._icf_t
                 self._update_speed(tc)
-                print("new icf {} - {} - {}".format(tc, self._icf_t, self.min_slack_task.name))
+                if self._results is None:
+                    print("new icf {} - {} - {}".format(self._clock.ms(tc), self._clock.ms(self._icf_t), self.min_slack_task.name))
                 self._icf_calc_flag = False
                 self._icf_task = self.min_slack_task
 
@@ -172,12 +186,18 @@ class RM_SS_mono_e11(Scheduler):
         return job, cpu
 
     def _print(self, event, job):
+        if self._results is not None:
+            self._results.record_job(self.sim.now() / self.sim.cycles_per_ms, job, event,
+                                     slack=self._clock.ms(job.task.data["ss"]["slack"]),
+                                     ttma=self._clock.ms(job.task.data["ss"]["ttma"]),
+                                     cpu_level=job.cpu.speed, energy=self._energy)
+            return
         print("{:03.5f}\t{}\t{}\t{:1.5f}\t{:1.3f}\t{}".format(
             self.sim.now() / self.sim.cycles_per_ms, job.name, event, self.f_min, self._energy,
-            '\t'.join(["{:03.2f}".format(task.data["ss"]["slack"]) for task in self.task_list])))
+            '\t'.join(["{:03.2f}".format(self._clock.ms(task.data["ss"]["slack"])) for task in self.task_list])))
 
     def _calc_slack(self, tc, task):
-        ss_result = multiple_slack_calc(tc, task, self.task_list, self.data["ss_methods"])
+        ss_result = multiple_slack_calc(tc, task, self.task_list, self.data["ss_methods"], self._slack_cache)
         return ss_result["slack"], ss_result["ttma"]
 
     def _update_speed(self, t):
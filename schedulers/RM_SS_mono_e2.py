@@ -8,13 +8,14 @@ from schedulers.MissedDeadlineException import MissedDeadlineException
 from slack.SlackUtils import reduce_slacks, multiple_slack_calc, get_minimum_slack
 from utils.rts import calculate_k
 from schedtests import josephp
+from utils.readyqueue import PriorityBitmapReadyQueue
 import copy
 
 
 class RM_SS_mono_e2(Scheduler):
 
     def init(self):
-        self.ready_list = []
+        self.ready_list = PriorityBitmapReadyQueue(lambda job: job.period, [task.period for task in self.task_list])
         self.min_slack = 0
         self.min_slack_t = 0
         self.idle_start = 0
@@ -96,7 +97,7 @@ class RM_SS_mono_e2(Scheduler):
         # Find the system minimum slack and the time at which it occurs.
         self.min_slack, self.min_slack_t = get_minimum_slack(self.task_list)
         # Compute energy consumption.
-        self._energy += job.computation_time * self._cpu.curlvl[3]
+        self._energy += self._cpu.consume(job.computation_time)
         # Log event.
         self.print('E', job)
         # Remove the job from the CPU and reschedule
@@ -129,7 +130,7 @@ class RM_SS_mono_e2(Scheduler):
                 # Compute the idle time.
                 elapsed_idle_time = (self.sim.now() - self.idle_start) / self.sim.cycles_per_ms
                 reduce_slacks(self.task_list, elapsed_idle_time, tc)
-                self._energy += elapsed_idle_time * self._cpu.curlvl[3]
+                self._energy += self._cpu.consume(elapsed_idle_time)
                 # Find the system minimum slack and the time at which it occurs
                 self.min_slack, self.min_slack_t = get_minimum_slack(self.task_list)
                 #  Restore the CPU v/f
@@ -151,7 +152,7 @@ class RM_SS_mono_e2(Scheduler):
         if self.ready_list:
             if preempt:
                 # Select the ready job with the highest priority (lowest period).
-                job = min(self.ready_list, key=lambda x: x.period)
+                job = self.ready_list.first()
                 # Update the execution start time.
                 job.task.data["ss"]["start_exec_time"] = self.sim.now()
                 self.print('S', job)
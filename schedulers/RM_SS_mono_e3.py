@@ -6,15 +6,16 @@ import sys
 from simso.core import Scheduler, Timer
 from schedulers.MissedDeadlineException import MissedDeadlineException
 from slack.SlackUtils import reduce_slacks, multiple_slack_calc, get_minimum_slack
-from utils.rts import calculate_k, uf, rta
+from utils.rts import calculate_k, uf, min_feasible_lvl
 from schedtests import josephp
+from utils.readyqueue import PriorityBitmapReadyQueue
 import copy
 
 
 class RM_SS_mono_e3(Scheduler):
 
     def init(self):
-        self.ready_list = []
+        self.ready_list = PriorityBitmapReadyQueue(lambda job: job.period, [task.period for task in self.task_list])
         self.min_slack = 0
         self.min_slack_t = 0
         self.idle_start = 0
@@ -25,12 +26,10 @@ class RM_SS_mono_e3(Scheduler):
         self._lvlz = None
 
         # Find the minimum v/f level in which the RTS is schedulable.
-        for lvl in self._cpu.lvls:
-            if rta(self.data["params"]["rts"]["ptasks"], lvl[5]):
-                self._lvlz = lvl
-                for task in self.task_list:
-                    task.data["C"] = task.data["C"] * lvl[5]
-                break
+        self._lvlz = min_feasible_lvl(self.data["params"]["rts"]["ptasks"], self._cpu.lvls)
+        if self._lvlz is not None:
+            for task in self.task_list:
+                task.data["C"] = task.data["C"] * self._lvlz[5]
 
         # Required fields for slack stealing.
         for ptask in self.data["params"]["rts"]["ptasks"]:
@@ -80,7 +79,7 @@ class RM_SS_mono_e3(Scheduler):
         # Find the system minimum slack and the time at which it occurs.
         self.min_slack, self.min_slack_t = get_minimum_slack(self.task_list)
         # Compute energy consumption.
-        self._energy += job.computation_time * self._cpu.curlvl[3]
+        self._energy += self._cpu.consume(job.computation_time)
         # Log event.
         self.print('E', job)
         # Remove the job from the CPU and reschedule
@@ -110,7 +109,7 @@ class RM_SS_mono_e3(Scheduler):
                 # Compute the idle time.
                 elapsed_idle_time = (self.sim.now() - self.idle_start) / self.sim.cycles_per_ms
                 reduce_slacks(self.task_list, elapsed_idle_time, tc)
-                self._energy += elapsed_idle_time * self._cpu.curlvl[3]
+                self._energy += self._cpu.consume(elapsed_idle_time)
                 # Find the system minimum slack and the time at which it occurs
                 self.min_slack, self.min_slack_t = get_minimum_slack(self.task_list)
                 # Restore the CPU v/f
@@ -133,7 +132,7 @@ class RM_SS_mono_e3(Scheduler):
         if self.ready_list:
             if preempt:
                 # Select the ready job with the highest priority (lowest period).
-                job = min(self.ready_list, key=lambda x: x.period)
+                job = self.ready_list.first()
                 # Update the execution start time.
                 job.task.data["ss"]["start_exec_time"] = self.sim.now()
                 self.print('S', job)
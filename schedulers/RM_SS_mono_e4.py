@@ -6,13 +6,21 @@ import sys
 from simso.core import Scheduler, Timer
 from schedulers.MissedDeadlineException import MissedDeadlineException
 from slack.SlackUtils import reduce_slacks, multiple_slack_calc, get_minimum_slack
-from utils.rts import calculate_k, rta
+from slack.SlackCache import SlackCache
+from slack.SlackTime import SlackClock
+from utils.rts import calculate_k, min_feasible_lvl
+from utils.readyqueue import PriorityBitmapReadyQueue
 
 
 class RM_SS_mono_e4(Scheduler):
 
     def init(self):
-        self.ready_list = []
+        self.ready_list = PriorityBitmapReadyQueue(lambda job: job.period, [task.period for task in self.task_list])
+        # Time base of the slack values, ms or integer cycles.
+        self._clock = SlackClock(self.sim, self.data.get("integer_time", False))
+        self._exact = self._clock.integer
+        # Event recorder, the events are printed if there is none.
+        self._results = self.data.get("results")
         self.min_slack = 0
         self.min_slack_t = 0
         self.idle_start = 0
@@ -25,10 +33,7 @@ class RM_SS_mono_e4(Scheduler):
         self._finb = False
 
         # Found the minimum V/F level in which the periodic tasks are schedulable.
-        for lvl in self._cpu.lvls:
-            if rta(self.data["rts"]["ptasks"], lvl[5]):
-                self._lvlz = lvl
-                break
+        self._lvlz = min_feasible_lvl(self.data["rts"]["ptasks"], self._cpu.lvls)
 
         if self._lvlz is None:
             print("No schedulable.")
@@ -46,17 +51,22 @@ class RM_SS_mono_e4(Scheduler):
             ptask["ss"] = {'slack': 0, 'ttma': 0, 'di': 0}
             ptask["dvs"] = {'a': ptask["C"], 'b': 0, 'brun': False}
             for ss_method in self.data["ss_methods"]:
-                ptask["ss"][ss_method] = {'a': ptask["C"], 'b': ptask["T"], 'c': 0}
+                ptask["ss"][ss_method] = {'a': self._clock.from_ms(ptask["C"]),
+                                          'b': self._clock.from_ms(ptask["T"]), 'c': 0}
 
         for atask in self.data["rts"]["atasks"]:
             atask["start_exec_time"] = 0
 
+        # Data shared by every slack calculation.
+        self._slack_cache = SlackCache(self.task_list, self.data.get("slack_log"),
+                                       self._clock.cycles_per_ms if self._exact else None, self._results)
+
         # Calculate slack at t=0
         for task in self.task_list:
             task.data["ss"]["slack"], task.data["ss"]["ttma"] = self._calc_slack(0, task)
 
         # Find the system minimum slack and the time at which it occurs
-        self.min_slack, self.min_slack_t, self.min_slack_task = get_minimum_slack(self.task_list)
+        self.min_slack, self.min_slack_t, self.min_slack_task = get_minimum_slack(self.task_list, self._exact)
 
         # Select the minimum CPU v/f
         self._update_speed()
@@ -73,25 +83,25 @@ class RM_SS_mono_e4(Scheduler):
 
     def on_terminated(self, job):
         # Current simulation time.
-        tc = self.sim.now() / self.sim.cycles_per_ms
+        tc = self._clock.now()
         # Verify deadline.
         if job.exceeded_deadline:
             #raise MissedDeadlineException(tc, job)
-            print("{:03.2f}\t{}\tDEADLINE MISS".format(tc, job.name))
+            print("{:03.2f}\t{}\tDEADLINE MISS".format(self._clock.ms(tc), job.name))
         if job.task == self.min_slack_task:
             self._update_icf = True
-        # Executed time in ms since last execution.
-        job_runtime = (self.sim.now() - job.task.data["ss"]["start_exec_time"]) / self.sim.cycles_per_ms
+        # Executed time since last execution.
+        job_runtime = self._clock.since(job.task.data["ss"]["start_exec_time"])
         # Decrement higher priority tasks' slack.
-        reduce_slacks(self.task_list[:(job.task.identifier - 1)], job_runtime, tc)
+        reduce_slacks(self.task_list[:(job.task.identifier - 1)], job_runtime, tc, self._exact)
         # Calculate this task new slack.
         job.task.data["ss"]["slack"], job.task.data["ss"]["ttma"] = self._calc_slack(tc, job.task)
         # Find the system minimum slack and the time at which it occurs.
-        self.min_slack, self.min_slack_t, min_slack_task = get_minimum_slack(self.task_list)
+        self.min_slack, self.min_slack_t, min_slack_task = get_minimum_slack(self.task_list, self._exact)
         if self._update_icf is True:
             self.min_slack_task = min_slack_task
         # Compute energy consumption.
-        self._energy += job.computation_time * self._cpu.curlvl[3]
+        self._energy += self._cpu.consume(job.computation_time)
         # Log event.
         self._print('E', job)
         # Remove the job from the CPU and reschedule
@@ -100,33 +110,33 @@ class RM_SS_mono_e4(Scheduler):
 
     def schedule(self, cpu):
         # Current simulation time
-        tc = self.sim.now() / self.sim.cycles_per_ms
+        tc = self._clock.now()
         job = None
 
         if cpu.running:
-            # Current job executed time in ms.
-            job_runtime = (self.sim.now() - cpu.running.task.data["ss"]["start_exec_time"]) / self.sim.cycles_per_ms
+            # Current job executed time.
+            job_runtime = self._clock.since(cpu.running.task.data["ss"]["start_exec_time"])
             # Check if the B part has ended
             if self._finb is True:
-                reduce_slacks(self.task_list, job_runtime, tc)
+                reduce_slacks(self.task_list, job_runtime, tc, self._exact)
                 self._preempt = True
                 self._finb = False
             else:
                 # Decrement higher priority tasks' slack.
-                reduce_slacks(self.task_list[:(cpu.running.task.identifier - 1)], job_runtime, tc)
+                reduce_slacks(self.task_list[:(cpu.running.task.identifier - 1)], job_runtime, tc, self._exact)
             # Find the system minimum slack and the time at which it occurs
-            self.min_slack, self.min_slack_t, _ = get_minimum_slack(self.task_list)
+            self.min_slack, self.min_slack_t, _ = get_minimum_slack(self.task_list, self._exact)
         else:
             # compute idle time
             if self.idle_start > 0:
                 # Compute the idle time.
-                elapsed_idle_time = (self.sim.now() - self.idle_start) / self.sim.cycles_per_ms
+                elapsed_idle_time = self._clock.since(self.idle_start)
                 # Reduce tasks' slacks
-                reduce_slacks(self.task_list, elapsed_idle_time, tc)
+                reduce_slacks(self.task_list, elapsed_idle_time, tc, self._exact)
                 # Record energy consumption
-                self._energy += elapsed_idle_time * self._cpu.curlvl[3]
+                self._energy += self._cpu.consume(self._clock.ms(elapsed_idle_time))
                 # Find the system minimum slack and the time at which it occurs
-                self.min_slack, self.min_slack_t, _ = get_minimum_slack(self.task_list)
+                self.min_slack, self.min_slack_t, _ = get_minimum_slack(self.task_list, self._exact)
                 #  Restore the CPU v/f
                 self._restore_speed()
                 # Reset the idle start time.
@@ -140,7 +150,7 @@ class RM_SS_mono_e4(Scheduler):
         if len(self.ready_list) > 0:
             if self._preempt:
                 # Select the ready job with the highest priority (lowest period).
-                job = min(self.ready_list, key=lambda x: x.period)
+                job = self.ready_list.first()
                 # Update the execution start time.
                 job.task.data["ss"]["start_exec_time"] = self.sim.now()
                 self._print('S', job)
@@ -164,12 +174,18 @@ class RM_SS_mono_e4(Scheduler):
         return job, cpu
 
     def _print(self, event, job):
+        if self._results is not None:
+            self._results.record_job(self.sim.now() / self.sim.cycles_per_ms, job, event,
+                                     slack=self._clock.ms(job.task.data["ss"]["slack"]),
+                                     ttma=self._clock.ms(job.task.data["ss"]["ttma"]),
+                                     cpu_level=job.cpu.speed, energy=self._energy)
+            return
         print("{:03.2f}\t{}\t{}\t{:1.3f}\t{:1.3f}\t{:1.3f}\t{}\t{:1.3f}".format(
             self.sim.now() / self.sim.cycles_per_ms, job.name, event,
             self.f_min, job.cpu.speed, self._cpu.curlvl[6], self._cpu.curlvl[0], self._energy))
 
     def _calc_slack(self, tc, task):
-        ss_result = multiple_slack_calc(tc, task, self.task_list, self.data["ss_methods"])
+        ss_result = multiple_slack_calc(tc, task, self.task_list, self.data["ss_methods"], self._slack_cache)
         return ss_result["slack"], ss_result["ttma"]
 
     def _update_speed(self):
@@ -177,7 +193,7 @@ class RM_SS_mono_e4(Scheduler):
         Update the V/F level of the CPU.
         :return: None
         """
-        tc = self.sim.now() / self.sim.cycles_per_ms
+        tc = self._clock.now()
         self.f_min = ((self.min_slack_t - tc - self.min_slack) / (self.min_slack_t - tc)) * self._lvlz[6]
         self._cpu.set_lvl(self.f_min)
         self.processors[0].set_speed(self._cpu.curlvl[6])
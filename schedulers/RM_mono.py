@@ -2,12 +2,13 @@
 Rate Monotic algorithm for uniprocessor architectures.
 """
 from simso.core import Scheduler
+from utils.readyqueue import PriorityBitmapReadyQueue
 
 
 class RM_mono(Scheduler):
 
     def init(self):
-        self._ready_list = []
+        self._ready_list = PriorityBitmapReadyQueue(lambda job: job.period, [task.period for task in self.task_list])
         self._energy = 0
         self._cpu = self.data["cpu"]
         self._cpu.set_lvl(1.0)
@@ -22,7 +23,7 @@ class RM_mono(Scheduler):
     def on_terminated(self, job):
         self._ready_list.remove(job)
 
-        self._energy += job.computation_time * self._cpu.curlvl[3]
+        self._energy += self._cpu.consume(job.computation_time)
 
         self.print('E', job)
 
@@ -31,7 +32,7 @@ class RM_mono(Scheduler):
     def schedule(self, cpu):
         if self._ready_list:
             # job with the highest priority
-            job = min(self._ready_list, key=lambda x: x.period)
+            job = self._ready_list.first()
             self.print('S', job)
         else:
             job = None
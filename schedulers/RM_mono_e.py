@@ -2,12 +2,13 @@
 Rate Monotic algorithm for uniprocessor architectures with energy consumption.
 """
 from simso.core import Scheduler
+from utils.readyqueue import PriorityBitmapReadyQueue
 
 
 class RM_mono_e(Scheduler):
 
     def init(self):
-        self._ready_list = []
+        self._ready_list = PriorityBitmapReadyQueue(lambda job: job.period, [task.period for task in self.task_list])
         self.idle_start = 0
         self._energy = 0
         self._cpu = self.data["params"]["cpu"]
@@ -17,7 +18,7 @@ class RM_mono_e(Scheduler):
         # compute idle time
         if job.cpu.running is None and self.idle_start > 0:
             elapsed_idle_time = (self.sim.now() - self.idle_start) / self.sim.cycles_per_ms
-            self._energy += elapsed_idle_time * self._cpu.curlvl[3]
+            self._energy += self._cpu.consume(elapsed_idle_time)
             self.idle_start = 0
             self._cpu.set_lvl(1.0)
 
@@ -30,7 +31,7 @@ class RM_mono_e(Scheduler):
     def on_terminated(self, job):
         self._ready_list.remove(job)
 
-        self._energy += job.computation_time * self._cpu.curlvl[3]
+        self._energy += self._cpu.consume(job.computation_time)
 
         self.print('E', job)
 
@@ -39,7 +40,7 @@ class RM_mono_e(Scheduler):
     def schedule(self, cpu):
         if self._ready_list:
             # job with the highest priority
-            job = min(self._ready_list, key=lambda x: x.period)
+            job = self._ready_list.first()
             self.print('S', job)
         else:
             # idle time start
@@ -1,11 +1,13 @@
 from argparse import ArgumentParser, FileType
 from utils.files import get_from_file
-from utils.rts import mixrange
+from utils.rts import mixrange, lcm
 from utils.cpu import Cpu
+from utils.readyqueue import HeapReadyQueue, PriorityBitmapReadyQueue
 from enum import Enum
 from llist import dllist
 from math import ceil
 from functools import total_ordering
+from heapq import heappush, heappop
 import json
 import math
 import sys
@@ -25,15 +27,85 @@ class EventType(Enum):
 
 
 class Event:
+    __slots__ = ("time", "type", "value")
+
     def __init__(self, time, type, value):
         self.time = time
         self.type = type
         self.value = value
 
 
+class HeapEventQueue:
+    """
+    Binary heap of events keyed on (time, type, insertion order). Events with the same time and type are served
+    in reverse insertion order, exactly as the linked-list queue does.
+    """
+    def __init__(self):
+        self._heap = []
+        self._counter = 0
+
+    def insert(self, event):
+        self._counter -= 1
+        heappush(self._heap, (event.time, event.type.value, self._counter, event))
+
+    def pop(self):
+        return heappop(self._heap)[3]
+
+    def first(self):
+        return self._heap[0][3]
+
+    def __iter__(self):
+        return (entry[3] for entry in self._heap)
+
+    def __len__(self):
+        return len(self._heap)
+
+
+class DllistEventQueue:
+    """
+    Sorted doubly linked list of events. Insertion walks the list linearly.
+    """
+    def __init__(self):
+        self._list = dllist()
+
+    def insert(self, event):
+        tmpnode = None
+
+        for node in self._list.iternodes():
+            if node.value.time >= event.time:
+                tmpnode = node
+                break
+
+        while tmpnode and tmpnode.value.time == event.time:
+            if tmpnode.value.type >= event.type:
+                break
+            tmpnode = tmpnode.next
+
+        self._list.insert(event, tmpnode)
+
+    def pop(self):
+        return self._list.popleft()
+
+    def first(self):
+        return self._list.first.value
+
+    def __iter__(self):
+        return iter(self._list)
+
+    def __len__(self):
+        return len(self._list)
+
+
 class Scheduler:
+    # the scheduler calculates the slacks with the slack methods
+    slack_stealing = False
+
     def __init__(self, configuration):
         self._configuration = configuration
+        self.ready_list = []
+        self.current_job = None
+        self.last_schedule_time = 0
+        self.idle = False
 
     def arrival(self, time, task):
         pass
@@ -44,11 +116,26 @@ class Scheduler:
     def schedule(self, time):
         pass
 
+    def cycle_state(self, boundary):
+        """ Ready jobs, current job, idle flag and last schedule time, with times relative to a boundary """
+        ready = sorted((job.task.id, job.instantiation_time - boundary, job.runtime) for job in self.ready_list)
+        return (ready, self.current_job.task.id if self.current_job else 0, self.idle,
+                self.last_schedule_time - boundary)
+
+    def add_energy(self, energy):
+        """ Account the energy of skipped hyperperiods """
+        pass
+
+    @property
+    def energy(self):
+        return 0
+
 
 class LLF_mono(Scheduler):
     def __init__(self, configuration):
         super().__init__(configuration)
-        self.ready_list = []
+        # the laxity of every job decreases at the same rate, so their order only depends on the laxity at t=0
+        self.ready_list = HeapReadyQueue(lambda job: job.current_laxity(0))
         self.current_job = None
         self.last_schedule_time = 0
         self.idle = False
@@ -69,7 +156,7 @@ class LLF_mono(Scheduler):
         if self.current_job:
             self.current_job.runtime += slice
         if self.ready_list:
-            job = min(self.ready_list, key=lambda x: x.current_laxity(time))
+            job = self.ready_list.first()
             self.current_job = job
             self.idle = False
         else:
@@ -81,7 +168,7 @@ class LLF_mono(Scheduler):
 class EDF_mono(Scheduler):
     def __init__(self, configuration):
         super().__init__(configuration)
-        self.ready_list = []
+        self.ready_list = HeapReadyQueue(lambda job: job.absolute_deadline)
         self.current_job = None
         self.last_schedule_time = 0
         self.idle = False
@@ -102,7 +189,7 @@ class EDF_mono(Scheduler):
         if self.current_job:
             self.current_job.runtime += slice
         if self.ready_list:
-            job = min(self.ready_list, key=lambda x: x.absolute_deadline)
+            job = self.ready_list.first()
             self.current_job = job
             self.idle = False
         else:
@@ -114,7 +201,8 @@ class EDF_mono(Scheduler):
 class RM_mono(Scheduler):
     def __init__(self, configuration):
         super().__init__(configuration)
-        self.ready_list = []
+        self.ready_list = PriorityBitmapReadyQueue(lambda job: job.task.t,
+                                                   [task.t for task in configuration["tasks"]])
         self.current_job = None
         self.last_schedule_time = 0
         self.idle = False
@@ -135,7 +223,7 @@ class RM_mono(Scheduler):
         if self.current_job:
             self.current_job.runtime += slice
         if self.ready_list:
-            job = min(self.ready_list, key=lambda x: x.task.t)
+            job = self.ready_list.first()
             self.current_job = job
             self.idle = False
         else:
@@ -145,9 +233,12 @@ class RM_mono(Scheduler):
 
 
 class RM_SS_mono(Scheduler):
+    slack_stealing = True
+
     def __init__(self, configuration):
         super().__init__(configuration)
-        self.ready_list = []
+        self.ready_list = PriorityBitmapReadyQueue(lambda job: job.task.t,
+                                                   [task.t for task in configuration["tasks"]])
         self.current_job = None
         self.last_schedule_time = 0
         self.idle = False
@@ -178,7 +269,7 @@ class RM_SS_mono(Scheduler):
             if self.idle:
                 reduce_slacks(self._configuration["tasks"], slice, time)
         if self.ready_list:
-            job = min(self.ready_list, key=lambda x: x.task.t)
+            job = self.ready_list.first()
             self.current_job = job
             self.idle = False
         else:
@@ -190,7 +281,8 @@ class RM_SS_mono(Scheduler):
 class LPFPS(Scheduler):
     def __init__(self, configuration):
         super().__init__(configuration)
-        self.ready_list = []
+        self.ready_list = PriorityBitmapReadyQueue(lambda job: job.task.t,
+                                                   [task.t for task in configuration["tasks"]])
         self.current_job = None
         self.last_schedule_time = 0
         self.idle = False
@@ -204,9 +296,12 @@ class LPFPS(Scheduler):
         job.runtime += slice
         self.ready_list.remove(job)
         self.current_job = None
-        self._energy += slice * self._configuration["cpu"].curlvl[3]
+        self._energy += self._configuration["cpu"].consume(slice)
         self._configuration["cpu"].set_lvl(1.0)
 
+    def add_energy(self, energy):
+        self._energy += energy
+
     def schedule(self, time):
         job = None
         slice = time - self.last_schedule_time
@@ -214,7 +309,7 @@ class LPFPS(Scheduler):
         if self.current_job:
             self.current_job.runtime += slice
         if self.ready_list:
-            job = min(self.ready_list, key=lambda x: x.task.t)
+            job = self.ready_list.first()
             if len(self.ready_list) == 1:
                 # Compute new speed ratio
                 ratio = job.runtime_left() / (self._configuration["sim"].next_arrival() - time)
@@ -237,155 +332,66 @@ class LPFPS(Scheduler):
 
 
 class Job:
-    def __init__(self, task, t, id):
-        self._task = task
-        self._id = id
-        self._counter = 0
-        self._runtime = 0
-        self._instantiation_time = t
+    __slots__ = ("task", "id", "runtime", "instantiation_time")
 
-    @property
-    def instantiation_time(self):
-        return self._instantiation_time
+    def __init__(self, task, t, id):
+        self.task = task
+        self.id = id
+        self.runtime = 0
+        self.instantiation_time = t
 
     @property
     def absolute_deadline(self):
-        return self._instantiation_time + self._task.d
-
-    @property
-    def task(self):
-        return self._task
-
-    @property
-    def runtime(self):
-        return self._runtime
-
-    @runtime.setter
-    def runtime(self, runtime):
-        self._runtime = runtime
+        return self.instantiation_time + self.task.d
 
     def runtime_left(self):
         return self.task.c - self.runtime
 
     def current_laxity(self, t):
-        return self.absolute_deadline - (t + self.task.c)
+        return self.instantiation_time + self.task.d - (t + self.task.c)
 
     def __str__(self):
-        return "{}_{}".format(self.task, self._id)
+        return "{}_{}".format(self.task, self.id)
 
 
 class Task:
-    def __init__(self, data):
-        self._id = data["nro"]
-        self._c = data["C"]
-        self._t = data["T"]
-        self._d = data["D"]
-        self._r = 0
-        self._k = 0
-        self._y = 0
-        self._a = self._c
-        self._b = self._t
-        self._di = 0
-        self._ttma = 0
-        self._job = None
-        self._last_job = None
-        self._job_counter = 0
-
-    @property
-    def id(self):
-        return self._id
-
-    @property
-    def c(self):
-        return self._c
-
-    @property
-    def t(self):
-        return self._t
-
-    @property
-    def d(self):
-        return self._d
-
-    @property
-    def k(self):
-        return self._k
-
-    @k.setter
-    def k(self, k):
-        self._k = k
-
-    @property
-    def r(self):
-        return self._r
+    __slots__ = ("id", "c", "t", "d", "r", "k", "a", "b", "di", "ttma", "slack", "job", "last_job", "job_counter")
 
-    @r.setter
-    def r(self, r):
-        self._r = r
+    def __init__(self, data):
+        self.id = data["nro"]
+        self.c = data["C"]
+        self.t = data["T"]
+        self.d = data["D"]
+        self.r = 0
+        self.k = 0
+        self.a = self.c
+        self.b = self.t
+        self.di = 0
+        self.ttma = 0
+        self.slack = 0
+        self.job = None
+        self.last_job = None
+        self.job_counter = 0
 
     @property
     def y(self):
-        return self._d - self._r
-
-    @property
-    def a(self):
-        return self._a
-
-    @a.setter
-    def a(self, a):
-        self._a = a
-
-    @property
-    def b(self):
-        return self._b
-
-    @b.setter
-    def b(self, b):
-        self._b = b
-
-    @property
-    def di(self):
-        return self._di
-
-    @di.setter
-    def di(self, di):
-        self._di = di
-
-    @property
-    def ttma(self):
-        return self._ttma
-
-    @ttma.setter
-    def ttma(self, ttma):
-        self._ttma = ttma
+        return self.d - self.r
 
     @property
     def laxity(self):
-        return self._d - self._c
-
-    @property
-    def slack(self):
-        return self._slack
-
-    @slack.setter
-    def slack(self, slack):
-        self._slack = slack
-
-    @property
-    def job(self):
-        return self._job
+        return self.d - self.c
 
     def new_job(self, t):
-        self._job_counter += 1
-        self._job = Job(self, t, self._job_counter)
-        return self._job
+        self.job_counter += 1
+        self.job = Job(self, t, self.job_counter)
+        return self.job
 
     def end_job(self):
-        self._last_job = self._job
-        self._job = None
+        self.last_job = self.job
+        self.job = None
 
     def __str__(self):
-        return "T_{}".format(self._id)
+        return "T_{}".format(self.id)
 
 
 def reduce_slacks(tasks, amount, t):
@@ -498,6 +504,11 @@ class SlackMethod:
     def telemetry(self):
         return {"ceils": self._ceil_counter, "floors": self._floor_counter}
 
+    def add_counts(self, ceils, floors):
+        """ Account the ceil and floor operations of skipped hyperperiods """
+        self._ceil_counter += ceils
+        self._floor_counter += floors
+
 
 class Fixed2Slack(SlackMethod):
     def __init__(self):
@@ -585,7 +596,7 @@ class Fixed2Slack(SlackMethod):
 
 class Simulator:
     def __init__(self, rts, args):
-        self._event_list = dllist()
+        self._event_list = event_queues[args.event_queue]()
         self._rts = rts
 
         self._ss_methods = []
@@ -594,10 +605,20 @@ class Simulator:
                 self._ss_methods.append(slack_methods[ss_method_name]())
 
         for task in self._rts:
-            self.insert_event(Event(0, EventType.ARRIVAL, task), self._event_list)
+            self.insert_event(Event(0, EventType.ARRIVAL, task))
 
         end_time = rts[-1].t * args.instance_count
-        self.insert_event(Event(end_time, EventType.END, None), self._event_list)
+        self.insert_event(Event(end_time, EventType.END, None))
+        self._end_time = end_time
+
+        # hyperperiod cycle detection
+        self._cycle_mode = self._detect_cycles = args.detect_cycles
+        self._verbose = args.verbose
+        self._hyperperiod = lcm([{"T": task.t} for task in rts]) if args.detect_cycles else 0
+        self._next_boundary = self._hyperperiod
+        self._boundary_state = None
+        self._boundary_counters = None
+        self._time_offset = 0
 
         self._cpu = None
         if args.cpu:
@@ -605,60 +626,124 @@ class Simulator:
 
         self._scheduler = schedulers[args.scheduler]({"sim": self, "tasks": rts, "ss_methods": self._ss_methods, "cpu": self._cpu})
         self._last_schedule_time = -1
+        self._event_count = 0
 
-    def insert_event(self, event, list: dllist):
-        tmpnode = None
-
-        for node in self._event_list.iternodes():
-            if node.value.time >= event.time:
-                tmpnode = node
-                break
-
-        while tmpnode and tmpnode.value.time == event.time:
-            if tmpnode.value.type >= event.type:
-                break
-            tmpnode = tmpnode.next
-
-        self._event_list.insert(event, tmpnode)
+    def insert_event(self, event):
+        self._event_list.insert(event)
 
     def sim(self):
         while self._event_list:
-            event = self._event_list.popleft()
+            if self._detect_cycles and self._event_list.first().time >= self._next_boundary:
+                self._check_cycle()
+
+            event = self._event_list.pop()
             now = event.time
+            self._event_count += 1
 
-            if event.type == EventType.END:
+            if event.type == EventType.END or now >= self._end_time:
                 break
 
             if event.type == EventType.ARRIVAL:
                 task = event.value
                 if now > self._last_schedule_time:
-                    self.insert_event(Event(now, EventType.SCHEDULE, None), self._event_list)
+                    self.insert_event(Event(now, EventType.SCHEDULE, None))
                     self._last_schedule_time = now
-                self.insert_event(Event(now + task.t, EventType.ARRIVAL, task), self._event_list)
+                self.insert_event(Event(now + task.t, EventType.ARRIVAL, task))
                 self._scheduler.arrival(now, task)
 
             if event.type == EventType.TERMINATED:
                 job = event.value
                 self._scheduler.terminated(now, job)
                 if now > self._last_schedule_time:
-                    self.insert_event(Event(now, EventType.SCHEDULE, None), self._event_list)
+                    self.insert_event(Event(now, EventType.SCHEDULE, None))
                     self._last_schedule_time = now
 
             if event.type == EventType.SCHEDULE:
-                next_event = self._event_list.first.value
+                next_event = self._event_list.first()
                 job = self._scheduler.schedule(now)
                 if job:
                     if next_event.time >= now + job.runtime_left():
-                        self.insert_event(Event(now + job.runtime_left(), EventType.TERMINATED, job), self._event_list)
-                print("{:5}\t{}\t{}\t{:.3f}\t{:.5f}".format(now, str(job if job else "E").ljust(10),
+                        self.insert_event(Event(now + job.runtime_left(), EventType.TERMINATED, job))
+                print("{:5}\t{}\t{}\t{:.3f}\t{:.5f}".format(now + self._time_offset, str(job if job else "E").ljust(10),
                                                 "\t".join([str(int(task.slack)) for task in self._rts]),
                                                 self._cpu.curlvl[6], self._scheduler.energy))
 
         for ss_method in self._ss_methods:
             print("{}: {}".format(ss_method.__class__.__name__, ss_method.telemetry()))
 
+        if self._cycle_mode:
+            jobs, energy, _ = self._counters()
+            print("Jobs: {}\tEnergy: {:.5f}".format(" ".join(str(count) for count in jobs), energy))
+
+    def _state(self, boundary):
+        """ System state with times relative to a hyperperiod boundary """
+        def event_key(event):
+            if isinstance(event.value, Task):
+                return event.value.id, 0
+            if isinstance(event.value, Job):
+                return event.value.task.id, event.value.runtime
+            return 0, 0
+
+        events = sorted((event.time - boundary, event.type.value, event_key(event)) for event in self._event_list
+                        if event.type != EventType.END)
+
+        tasks = []
+        for task in self._rts:
+            job = task.job
+            state = [task.slack, (job.instantiation_time - boundary, job.runtime) if job else None]
+            # the slack stealing fields are only updated (and read) by the slack methods
+            if self._ss_methods and self._scheduler.slack_stealing:
+                state += [task.ttma - boundary, task.di - boundary, task.a - (boundary // task.t) * task.c,
+                          task.b - boundary]
+            tasks.append(tuple(state))
+
+        return (events, tasks, self._scheduler.cycle_state(boundary), self._last_schedule_time - boundary,
+                tuple(self._cpu.curlvl) if self._cpu else None)
+
+    def _counters(self):
+        """ Per-task job counters, consumed energy and ceil and floor counters of each slack method """
+        return ([task.job_counter for task in self._rts], self._scheduler.energy,
+                [ss_method.telemetry() for ss_method in self._ss_methods])
+
+    def _check_cycle(self):
+        """
+        Compare the system state with the one of the previous hyperperiod boundary. If they are equal the schedule is
+        periodic from then on, so the remaining full hyperperiods are skipped: their job counters, energy and slack
+        method counters are extrapolated, and the rest of the simulation is run with its times shifted.
+        """
+        boundary = self._next_boundary
+        self._next_boundary += self._hyperperiod
+
+        state = self._state(boundary)
+        counters = self._counters()
+
+        if state == self._boundary_state:
+            self._detect_cycles = False
+            skip = (self._end_time - boundary) // self._hyperperiod
+            if skip > 0:
+                jobs, energy, ss_counters = counters
+                prev_jobs, prev_energy, prev_ss_counters = self._boundary_counters
+                for task, count, prev_count in zip(self._rts, jobs, prev_jobs):
+                    task.job_counter += skip * (count - prev_count)
+                self._scheduler.add_energy(skip * (energy - prev_energy))
+                for ss_method, counts, prev_counts in zip(self._ss_methods, ss_counters, prev_ss_counters):
+                    ss_method.add_counts(skip * (counts["ceils"] - prev_counts["ceils"]),
+                                         skip * (counts["floors"] - prev_counts["floors"]))
+                self._end_time -= skip * self._hyperperiod
+                self._time_offset += skip * self._hyperperiod
+                if self._verbose:
+                    print("Cycle detected at t={0:}, {1:} hyperperiods skipped".format(boundary, skip),
+                          file=sys.stderr)
+
+        self._boundary_state = state
+        self._boundary_counters = counters
+
     def next_arrival(self):
-        return self._event_list.first.value.time
+        return self._event_list.first().time
+
+    @property
+    def event_count(self):
+        return self._event_count
 
 
 schedulers = {"RM_mono": RM_mono,
@@ -671,6 +756,26 @@ schedulers = {"RM_mono": RM_mono,
 slack_methods = {"Fixed2": Fixed2Slack}
 
 
+event_queues = {"heap": HeapEventQueue,
+                "dllist": DllistEventQueue}
+
+
+def create_rts(jrts: dict) -> list:
+    """ Build the task list of a rts and calculate its wcrt, k and initial slack values """
+    rts = []
+    for ptask in jrts["ptasks"]:
+        rts.append(Task(ptask))
+    rta(rts)
+    calculate_k(rts)
+    slack = slack_methods["Fixed2"]()
+    # Calculate slack at t=0
+    for task in rts:
+        result = slack.calculate_slack(task, rts, 0)
+        task.slack = result["slack"]
+        task.ttma = result["ttma"]
+    return rts
+
+
 def get_args():
     """ Command line arguments """
     parser = ArgumentParser(description="Simulate a RTS.")
@@ -684,6 +789,8 @@ def get_args():
     parser.add_argument("--stop-on-error", default=False, action="store_true", help="Stop and exit the simulation if an error is detected.")
     parser.add_argument("--verbose", default=False, action="store_true", help="Show progress information on stderr.")
     parser.add_argument("--cpu", type=FileType('r'), help="CPU model.")
+    parser.add_argument("--event-queue", type=str, choices=event_queues.keys(), default="heap", help="Event list implementation.")
+    parser.add_argument("--detect-cycles", default=False, action="store_true", help="Skip the remaining hyperperiods once the schedule repeats.")
     return parser.parse_args()
 
 
@@ -695,19 +802,7 @@ def main():
     for jrts in get_from_file(args.file, mixrange(args.rts)):
         if args.verbose:
             print("Simulating RTS {0:}".format(jrts["id"]), file=sys.stderr)
-        rts = []
-        for ptask in jrts["ptasks"]:
-            rts.append(Task(ptask))
-        rta(rts)
-        calculate_k(rts)
-        slack = slack_methods["Fixed2"]()
-        # Calculate slack at t=0
-        for task in rts:
-            result = slack.calculate_slack(task, rts, 0)
-            task.slack = result["slack"]
-            task.ttma = result["ttma"]
-
-        sim = Simulator(rts, args)
+        sim = Simulator(create_rts(jrts), args)
         sim.sim()
 
 
@@ -70,6 +70,12 @@ class Configuration(object):
             self.proc_data_fields = {}
             self.memory_access_time = 100
             self._scheduler_info = SchedulerInfo()
+        # Trace backend (see simso.core.TraceSink) and its parameters.
+        self.trace = "monitor"
+        self.trace_size = 1000
+        self.trace_file = None
+        # Simulation engine: "simpy" or "event" (see simso.core.EventModel).
+        self.engine = "simpy"
         self.calc_penalty_cache()
         self._set_filename(filename)
 
@@ -128,6 +134,8 @@ class Configuration(object):
             "Cycles / ms must be a positive number."
         assert self.memory_access_time >= 0, \
             "The memory access time must be a positive number."
+        assert self.engine in ("simpy", "event"), \
+            "Unknown simulation engine."
 
     def check_scheduler(self):
         cls = self._scheduler_info.get_cls()
@@ -297,13 +305,14 @@ class Configuration(object):
         return task
 
     def add_processor(self, name, identifier, cs_overhead=0,
-                      cl_overhead=0, migration_overhead=0, speed=1.0):
+                      cl_overhead=0, migration_overhead=0, speed=1.0,
+                      power_model=None):
         """
         Helper method to create a ProcInfo and add it to the list of
         processors.
         """
         proc = ProcInfo(
             identifier, name, cs_overhead, cl_overhead, migration_overhead,
-            speed)
+            speed, power_model=power_model)
         self.proc_info_list.append(proc)
         return proc
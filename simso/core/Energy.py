@@ -0,0 +1,93 @@
+# coding=utf-8
+
+
+class EnergyMeter(object):
+    """
+    Energy meter of a processor. The power of the current speed is integrated
+    between consecutive state changes (speed changes and jobs starting or
+    stopping on the processor), so the cost of the meter is constant per
+    event and it does not depend on the trace backend.
+
+    The power model is an object with:
+        - `power(speed)`: power at a normalized speed.
+        - `idle_power`: power in the power down mode (speed 0).
+        - `transition_latency`: duration of a speed change, in ms.
+        - `transition_energy`: energy of a speed change.
+
+    The energy unit is the power unit times ms. The interval between two
+    state changes is charged to the running job, or to the idle energy if
+    no job is running (idle time and overheads).
+    """
+    def __init__(self, model, power_model, speed):
+        self._model = model
+        self._power_model = power_model
+        self._cycles_per_ms = float(model.cycles_per_ms)
+        self._last = 0
+        self._job = None
+        self._speed = speed
+        self._power = self._speed_power(speed)
+        self.total = 0
+        self.idle = 0
+        self.transitions = 0
+        self.transition_energy = 0
+        self.jobs = {}
+
+    def _speed_power(self, speed):
+        if speed > 0:
+            return self._power_model.power(speed)
+        return self._power_model.idle_power
+
+    def update(self):
+        """
+        Charge the energy consumed since the last state change.
+        """
+        now = self._model.now()
+        if now != self._last:
+            energy = (now - self._last) / self._cycles_per_ms * self._power
+            self.total += energy
+            if self._job is not None:
+                self.jobs[self._job] = self.jobs.get(self._job, 0) + energy
+            else:
+                self.idle += energy
+            self._last = now
+
+    def run(self, job):
+        """
+        Set the job running on the processor, None if it is idle.
+        """
+        self.update()
+        self._job = job
+
+    def set_speed(self, speed):
+        """
+        Change the speed of the processor, a speed change to a different
+        power costs a transition.
+
+        Returns the latency of the transition in ms.
+        """
+        self.update()
+        power = self._speed_power(speed)
+        self._speed = speed
+        if power == self._power:
+            return 0
+        self._power = power
+        self.transitions += 1
+        self.transition_energy += self._power_model.transition_energy
+        self.total += self._power_model.transition_energy
+        return self._power_model.transition_latency
+
+    @property
+    def power(self):
+        """
+        Current power.
+        """
+        return self._power
+
+    def task_energy(self):
+        """
+        Energy of each task.
+        """
+        tasks = {}
+        for job, energy in self.jobs.items():
+            tasks[job.task] = tasks.get(job.task, 0) + energy
+        return tasks
@@ -0,0 +1,439 @@
+# coding=utf-8
+
+"""
+Fast-forward simulation engine, selected with `engine = "event"` in the
+:class:`Configuration <simso.configuration.Configuration>`.
+
+The SimPy engine runs every processor, task, job and timer as a process
+generator, and it evaluates the `waituntil` conditions of the processors
+after every step. This engine keeps the clock and the event list of the
+SimPy simulation, but its notices are typed events: each notice names the
+handler that continues its object (release of a job, end of an execution
+slice, expiration of a timer, next state of a processor), so the tasks, jobs
+and timers are plain objects that are never run as processes. A continuation
+due at the current date is run at once when no other notice or condition
+would be served before it, which skips most of the zero length holds of the
+processors.
+
+The events of a same date are handled in the order of the SimPy engine, so
+the schedulers (`on_activate`, `on_terminated`, `schedule` and their timers)
+take the same decisions with both engines. The engine is meant for the
+deterministic execution time models such as `wcet`.
+"""
+
+from heapq import heappop, heappush
+from math import ceil
+
+from simso.core.Job import Job
+from simso.core.Model import Model
+from simso.core.Processor import Processor, RESCHED, ACTIVATE, TERMINATE, \
+    TIMER, SPEED
+from simso.core.ProcEvent import ProcRunEvent, ProcIdleEvent, \
+    ProcOverheadEvent, ProcCxtSaveEvent, ProcCxtLoadEvent, ProcSpeedEvent
+from simso.core.Task import PTask, SporadicTask, ATask
+from simso.core.Timer import InstanceTimer
+
+
+# Events of the processors, each one continues Processor.run after a yield.
+CPU_LOOP, CPU_LOAD, CPU_LOADED, CPU_WAKE, CPU_SAVED, CPU_EVENT, \
+    CPU_ACTIVATED, CPU_TERMINATED, CPU_TIMER, CPU_SCHEDULE, CPU_DECIDE = \
+    range(11)
+
+# Events of the jobs, timers and tasks.
+JOB_RELEASE, JOB_EXECUTE, JOB_SLICE_END, TIMER_START, TIMER_EXPIRE, \
+    TASK_START, TASK_RELEASE, SPORADIC_START, SPORADIC_RELEASE, \
+    APERIODIC_START, TASK_END = range(11, 22)
+
+
+class EventProcessor(Processor):
+    """
+    Processor of the event engine. The states of :meth:`Processor.run
+    <simso.core.Processor.Processor.run>` are the events of the processor.
+    """
+    def __init__(self, model, proc_info):
+        Processor.__init__(self, model, proc_info)
+        self._job = None
+        self._timer = None
+        self._decisions = None
+
+    def step(self, event):
+        """
+        Continue the processor from an event, until it holds or waits.
+        """
+        sim = self._model
+        while True:
+            if event == CPU_LOOP:
+                if self._evts:
+                    event = CPU_EVENT
+                    continue
+                job = self._running
+                self._job = job
+                if job:
+                    event = CPU_LOAD
+                    if not sim.wait_until(self, event,
+                                          lambda: job.context_ok):
+                        return
+                else:
+                    self.monitor.observe(ProcIdleEvent())
+                    event = CPU_WAKE
+                    if not sim.wait_until(self, event, lambda: self._evts):
+                        return
+
+            elif event == CPU_LOAD:
+                self.monitor.observe(ProcCxtLoadEvent())
+                event = CPU_LOADED
+                if not sim.hold(self, event, self.cl_overhead):
+                    return
+
+            elif event == CPU_LOADED:
+                job = self._job
+                self.monitor.observe(ProcCxtLoadEvent(terminated=True))
+                job.interruptReset()
+                sim.reactivate(job)
+                self.monitor.observe(ProcRunEvent(job))
+                if self._energy_meter:
+                    self._energy_meter.run(job)
+                job.context_ok = False
+                event = CPU_WAKE
+                if not sim.wait_until(self, event, lambda: self._evts):
+                    return
+
+            elif event == CPU_WAKE:
+                job = self._job
+                if job:
+                    self.interrupt(job)
+                    if self._energy_meter:
+                        self._energy_meter.run(None)
+                    self.monitor.observe(ProcCxtSaveEvent())
+                    event = CPU_SAVED
+                    if not sim.hold(self, event, self.cs_overhead):
+                        return
+                else:
+                    event = CPU_EVENT
+
+            elif event == CPU_SAVED:
+                self.monitor.observe(ProcCxtSaveEvent(terminated=True))
+                self._job.context_ok = True
+                event = CPU_EVENT
+
+            elif event == CPU_EVENT:
+                evt = self._evts.popleft()
+                event = CPU_LOOP
+                if evt[0] == RESCHED:
+                    if any(x[0] != RESCHED for x in self._evts):
+                        self._evts.append(evt)
+                        continue
+
+                if evt[0] == ACTIVATE:
+                    self.sched.on_activate(evt[1])
+                    self.monitor.observe(ProcOverheadEvent("JobActivation"))
+                    self.sched.monitor_begin_activate(self)
+                    event = CPU_ACTIVATED
+                    if not sim.hold(self, event,
+                                    self.sched.overhead_activate):
+                        return
+                elif evt[0] == TERMINATE:
+                    self.sched.on_terminated(evt[1])
+                    self.monitor.observe(ProcOverheadEvent("JobTermination"))
+                    self.sched.monitor_begin_terminate(self)
+                    event = CPU_TERMINATED
+                    if not sim.hold(self, event,
+                                    self.sched.overhead_terminate):
+                        return
+                elif evt[0] == TIMER:
+                    self.timer_monitor.observe(None)
+                    if evt[1].overhead > 0:
+                        self._timer = evt[1]
+                        event = CPU_TIMER
+                        if not sim.hold(self, event, evt[1].overhead):
+                            return
+                    else:
+                        evt[1].call_handler()
+                elif evt[0] == SPEED:
+                    self.monitor.observe(ProcSpeedEvent(evt[1]))
+                    self._speed = evt[1]
+                    if self._energy_meter:
+                        latency = self._energy_meter.set_speed(evt[1])
+                        if latency > 0:
+                            # The processor is stalled during the transition.
+                            if not sim.hold(self, event, int(
+                                    latency * sim.cycles_per_ms)):
+                                return
+                elif evt[0] == RESCHED:
+                    self.monitor.observe(ProcOverheadEvent("Scheduling"))
+                    self.sched.monitor_begin_schedule(self)
+                    event = CPU_SCHEDULE
+                    if not sim.wait_until(self, event, self.sched.get_lock):
+                        return
+
+            elif event == CPU_ACTIVATED:
+                self.sched.monitor_end_activate(self)
+                event = CPU_LOOP
+
+            elif event == CPU_TERMINATED:
+                self.sched.monitor_end_terminate(self)
+                event = CPU_LOOP
+
+            elif event == CPU_TIMER:
+                self._timer.call_handler()
+                event = CPU_LOOP
+
+            elif event == CPU_SCHEDULE:
+                self._decisions = self.sched.schedule(self)
+                event = CPU_DECIDE
+                if not sim.hold(self, event, self.sched.overhead):
+                    return
+
+            elif event == CPU_DECIDE:
+                self._apply_decisions(self._decisions)
+                self.sched.release_lock()
+                self.sched.monitor_end_schedule(self)
+                event = CPU_LOOP
+
+
+class EventModel(Model):
+    """
+    Model simulated by the fast-forward engine. It has the interface of
+    :class:`Model <simso.core.Model.Model>`: the tasks, jobs and timers
+    start with `activate`, the processors continue the jobs with
+    `reactivate` and the tasks abort them with `cancel`, but these calls
+    post typed events instead of stepping process generators.
+    """
+    processor_class = EventProcessor
+
+    def activate(self, obj, process, at='undefined', delay='undefined',
+                 prior=False):
+        """
+        Start a processor, task, job or timer. The process generator is not
+        used, the first event depends on the class of the object.
+        """
+        if not obj._terminated and not obj._nextTime:
+            if at == 'undefined':
+                at = self._t
+            if delay == 'undefined':
+                zeit = max(self._t, at)
+            else:
+                zeit = max(self._t, self._t + delay)
+            obj._next_event = self._first_event(obj)
+            self._post(obj, zeit, prior)
+
+    def reactivate(self, obj, at='undefined', delay='undefined',
+                   prior=False):
+        """
+        Continue a holding, waiting or passive object from its next event.
+        """
+        if not obj._terminated:
+            self._unpost(obj)
+            if at == 'undefined':
+                at = self._t
+            if delay == 'undefined':
+                zeit = max(self._t, at)
+            else:
+                zeit = max(self._t, self._t + delay)
+            self._post(obj, zeit, prior)
+
+    @staticmethod
+    def _first_event(obj):
+        if isinstance(obj, EventProcessor):
+            return CPU_LOOP
+        if isinstance(obj, Job):
+            return JOB_RELEASE
+        if isinstance(obj, InstanceTimer):
+            return TIMER_START
+        if isinstance(obj, PTask):
+            return TASK_START
+        if isinstance(obj, SporadicTask):
+            return SPORADIC_START
+        if isinstance(obj, ATask):
+            return APERIODIC_START
+        raise TypeError("The event engine can not simulate {}."
+                        .format(type(obj).__name__))
+
+    def _post(self, what, at, prior=False):
+        """
+        Post the next event of what at date at. The notices are sorted by
+        date and, at the same date, prior notices go first in reverse order
+        of posting and the others in order of posting.
+        """
+        what._nextTime = at
+        self._sortpr -= 1
+        what._rec = [at, self._sortpr if prior else -self._sortpr, what,
+                     False, what._next_event]
+        heappush(self._timestamps, what._rec)
+
+    def _resume_now(self, obj, event, prior):
+        """
+        Continue obj with event at the current date. Returns True if the
+        caller can run the event at once, since its notice would be the next
+        one served.
+        """
+        if not self.condQ and (prior or not self._timestamps or
+                               self._timestamps[0][0] > self._t):
+            return True
+        obj._next_event = event
+        self._post(obj, self._t, prior)
+        return False
+
+    def hold(self, obj, event, delay):
+        """
+        Continue obj with event after delay cycles. Returns True if the
+        caller must run the event at once.
+        """
+        obj.interruptLeft = delay
+        obj._inInterrupt = False
+        obj.interruptCause = None
+        if delay == 0:
+            return self._resume_now(obj, event, False)
+        obj._next_event = event
+        self._post(obj, self._t + delay)
+        return False
+
+    def wait_until(self, obj, event, cond):
+        """
+        Continue obj with event when cond() is true, it is tested after each
+        event. Returns True if the caller must run the event at once.
+        """
+        if cond():
+            return self._resume_now(obj, event, True)
+        obj.cond = cond
+        obj._next_event = event
+        obj._nextTime = None
+        self.condQ.append(obj)
+        return False
+
+    @staticmethod
+    def _passivate(obj, event):
+        obj._next_event = event
+        obj._nextTime = None
+
+    def step(self):
+        """
+        Handle the next event.
+        """
+        timestamps = self._timestamps
+        while True:
+            if not timestamps:
+                return None
+            notice = heappop(timestamps)
+            if not notice[3]:
+                break
+
+        self._t = notice[0]
+        obj = notice[2]
+        obj._rec = None
+        self._handlers[notice[4]](self, obj, notice[4])
+
+        # Continue the objects whose condition is now true.
+        if self.condQ:
+            i = 0
+            while i < len(self.condQ):
+                obj = self.condQ[i]
+                if obj.cond():
+                    self.condQ.pop(i)
+                    self.reactivate(obj)
+                else:
+                    i += 1
+
+        if timestamps:
+            return timestamps[0][0]
+        return None
+
+    def _processor_event(self, cpu, event):
+        cpu.step(event)
+
+    def _job_release(self, job, event):
+        """ Notify the OS and wait an execute order. """
+        job._start_date = self._t
+        job.task.cpu.activate(job)
+        self._passivate(job, JOB_EXECUTE)
+
+    def _job_execute(self, job, event):
+        """ Execute order, or interrupt before the job was executed. """
+        if job.interrupted():
+            job.interruptReset()
+            self._job_wait(job)
+        else:
+            job._on_execute()
+            self._job_slice(job, job._etm.get_ret(job))
+
+    def _job_slice_end(self, job, event):
+        """ End of an execution slice, or preemption. """
+        if job.interrupted():
+            job._on_preempted()
+            job.interruptReset()
+            self._job_wait(job)
+        else:
+            self._job_slice(job, job._etm.get_ret(job))
+
+    def _job_slice(self, job, ret):
+        # ret is a duration lower than the remaining execution time.
+        if ret > 0:
+            self.hold(job, JOB_SLICE_END, int(ceil(ret)))
+        else:
+            job._on_terminated()
+            self._terminate(job)
+
+    def _job_wait(self, job):
+        if job.end_date is None:
+            self._passivate(job, JOB_EXECUTE)
+        else:
+            self._terminate(job)
+
+    def _timer_start(self, timer, event):
+        timer.running = True
+        if self.hold(timer, TIMER_EXPIRE, timer.delay):
+            self._timer_expire(timer, TIMER_EXPIRE)
+
+    def _timer_expire(self, timer, event):
+        while not timer.interrupted() and timer.running:
+            if timer.cpu:
+                timer.cpu.timer(timer)
+            else:
+                timer.call_handler()
+            if timer.one_shot or not timer.running:
+                break
+            if not self.hold(timer, TIMER_EXPIRE, timer.delay):
+                return
+        self._terminate(timer)
+
+    def _task_start(self, task, event):
+        task._init()
+        if self.hold(task, TASK_RELEASE, int(
+                task._task_info.activation_date * self._cycles_per_ms)):
+            self._task_release(task, TASK_RELEASE)
+
+    def _task_release(self, task, event):
+        task.create_job()
+        while self.hold(task, TASK_RELEASE,
+                        int(task.period * self._cycles_per_ms)):
+            task.create_job()
+
+    def _sporadic_start(self, task, event):
+        task._init()
+        task._dates = iter(task.list_activation_dates)
+        self._sporadic_next(task)
+
+    def _sporadic_release(self, task, event):
+        task.create_job()
+        self._sporadic_next(task)
+
+    def _sporadic_next(self, task):
+        for date in task._dates:
+            if not self.hold(task, SPORADIC_RELEASE,
+                             int(date * self._cycles_per_ms) - self._t):
+                return
+            task.create_job()
+        self._terminate(task)
+
+    def _aperiodic_start(self, task, event):
+        # The jobs are created by the task that precedes it.
+        task._init()
+        self._passivate(task, TASK_END)
+
+    def _task_end(self, task, event):
+        self._terminate(task)
+
+    _handlers = [_processor_event] * 11 + [
+        _job_release, _job_execute, _job_slice_end, _timer_start,
+        _timer_expire, _task_start, _task_release, _sporadic_start,
+        _sporadic_release, _aperiodic_start, _task_end]
@@ -1,7 +1,5 @@
 # coding=utf-8
 
-from SimPy.Simulation import Monitor
-
 
 class Logger(object):
     """
@@ -13,7 +11,7 @@ class Logger(object):
             - `sim`: The :class:`model <simso.core.Model.Model>` object.
         """
         self.sim = sim
-        self._logs = Monitor(name="Logs", sim=sim)
+        self._logs = sim.trace_backend.sink("Logs")
 
     def log(self, msg, kernel=False):
         """
@@ -29,6 +27,7 @@ class Logger(object):
     @property
     def logs(self):
         """
-        The logs, a SimPy Monitor object.
+        The logs, a SimPy Monitor or a :mod:`trace sink \
+        <simso.core.TraceSink>`.
         """
         return self._logs
@@ -6,6 +6,7 @@ from simso.core.Task import Task
 from simso.core.Timer import Timer
 from simso.core.etm import execution_time_models
 from simso.core.Logger import Logger
+from simso.core.TraceSink import trace_backends
 from simso.core.results import Results
 
 
@@ -13,7 +14,19 @@ class Model(Simulation):
     """
     Main class for the simulation. It instantiate the various components
     required by the simulation and run it.
+
+    The `engine` attribute of the configuration selects the simulation
+    engine: "simpy" for this class, "event" for the fast-forward
+    :class:`EventModel <simso.core.EventModel.EventModel>`.
     """
+    # Class of the processors, the engines define their own.
+    processor_class = Processor
+
+    def __new__(cls, configuration, callback=None):
+        if cls is Model and configuration.engine == "event":
+            from simso.core.EventModel import EventModel
+            cls = EventModel
+        return Simulation.__new__(cls)
 
     def __init__(self, configuration, callback=None):
         """
@@ -27,6 +40,8 @@ class Model(Simulation):
         Methods:
         """
         Simulation.__init__(self)
+        self._trace_backend = trace_backends[configuration.trace](
+            self, configuration)
         self._logger = Logger(self)
         task_info_list = configuration.task_info_list
         proc_info_list = configuration.proc_info_list
@@ -54,7 +69,7 @@ class Model(Simulation):
 
         self._processors = []
         for proc_info in proc_info_list:
-            proc = Processor(self, proc_info)
+            proc = self.processor_class(self, proc_info)
             proc.caches = proc_info.caches
             self._processors.append(proc)
 
@@ -87,6 +102,14 @@ class Model(Simulation):
     def logger(self):
         return self._logger
 
+    @property
+    def trace_backend(self):
+        """
+        The trace backend, it creates the sinks of the logger, the tasks, the
+        processors and the scheduler.
+        """
+        return self._trace_backend
+
     @property
     def cycles_per_ms(self):
         """
@@ -144,6 +167,12 @@ class Model(Simulation):
         finally:
             self._etm.update()
 
+            for cpu in self._processors:
+                if cpu.energy_meter:
+                    cpu.energy_meter.update()
+
             if self.now() > 0:
                 self.results = Results(self)
                 self.results.end()
+
+            self._trace_backend.close()
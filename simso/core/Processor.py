@@ -1,7 +1,8 @@
 # coding=utf-8
 
 from collections import deque
-from SimPy.Simulation import Process, Monitor, hold, waituntil
+from SimPy.Simulation import Process, hold, waituntil
+from simso.core.Energy import EnergyMeter
 from simso.core.ProcEvent import ProcRunEvent, ProcIdleEvent, \
     ProcOverheadEvent, ProcCxtSaveEvent, ProcCxtLoadEvent, ProcSpeedEvent
 
@@ -16,7 +17,7 @@ SPEED = 6
 
 class ProcInfo(object):
     def __init__(self, identifier, name, cs_overhead=0, cl_overhead=0,
-                 migration_overhead=0, speed=1.0, data=None):
+                 migration_overhead=0, speed=1.0, data=None, power_model=None):
         self.identifier = identifier
         self.name = name
         self.penalty = 0
@@ -28,6 +29,7 @@ class ProcInfo(object):
             data = {}
         self.data = data
         self.speed = speed
+        self.power_model = power_model
 
     def add_cache(self, cache):
         self.caches.append(cache)
@@ -62,16 +64,20 @@ class Processor(Process):
         self.was_running = None
         self._evts = deque([])
         self.sched = model.scheduler
-        self.monitor = Monitor(name="Monitor" + proc_info.name, sim=model)
+        self.monitor = model.trace_backend.sink("Monitor" + proc_info.name)
         self._caches = []
         self._penalty = proc_info.penalty
         self._cs_overhead = proc_info.cs_overhead
         self._cl_overhead = proc_info.cl_overhead
         self._migration_overhead = proc_info.migration_overhead
         self.set_caches(proc_info.caches)
-        self.timer_monitor = Monitor(name="Monitor Timer" + proc_info.name,
-                                     sim=model)
+        self.timer_monitor = model.trace_backend.sink(
+            "Monitor Timer" + proc_info.name)
         self._speed = proc_info.speed
+        self._energy_meter = None
+        if proc_info.power_model is not None:
+            self._energy_meter = EnergyMeter(model, proc_info.power_model,
+                                             self._speed)
 
     def resched(self):
         """
@@ -102,6 +108,14 @@ class Processor(Process):
     def speed(self):
         return self._speed
 
+    @property
+    def energy_meter(self):
+        """
+        The :class:`EnergyMeter <simso.core.Energy.EnergyMeter>` of the
+        processor, None if it has no power model.
+        """
+        return self._energy_meter
+
     def is_running(self):
         """
         Return True if a job is currently running on that processor.
@@ -143,6 +157,42 @@ class Processor(Process):
         """
         return self._running
 
+    def _apply_decisions(self, decisions):
+        """
+        Send the jobs to the processors chosen by the scheduler.
+        """
+        if type(decisions) is not list:
+            decisions = [decisions]
+        decisions = [d for d in decisions if d is not None]
+
+        for job, cpu in decisions:
+            # If there is nothing to change, simply ignore:
+            if cpu.running == job:
+                continue
+
+            # If trying to execute a terminated job, warn and ignore:
+            if job is not None and not job.is_active():
+                print("Can't schedule a terminated job! ({})"
+                      .format(job.name))
+                continue
+
+            # if the job was running somewhere else, stop it.
+            if job and job.cpu.running == job:
+                job.cpu.preempt()
+
+            # Send that job to processor cpu.
+            cpu.preempt(job)
+
+            if job:
+                job.task.cpu = cpu
+
+        # Forbid to run a job simultaneously on 2 or more processors.
+        running_tasks = [
+            cpu.running.name
+            for cpu in self._model.processors if cpu.running]
+        assert len(set(running_tasks)) == len(running_tasks), \
+            "Try to run a job on 2 processors simultaneously!"
+
     def run(self):
         while True:
             if not self._evts:
@@ -155,6 +205,8 @@ class Processor(Process):
                     job.interruptReset()
                     self.sim.reactivate(job)
                     self.monitor.observe(ProcRunEvent(job))
+                    if self._energy_meter:
+                        self._energy_meter.run(job)
                     job.context_ok = False
                 else:
                     self.monitor.observe(ProcIdleEvent())
@@ -163,6 +215,8 @@ class Processor(Process):
                 yield waituntil, self, lambda: self._evts
                 if job:
                     self.interrupt(job)
+                    if self._energy_meter:
+                        self._energy_meter.run(None)
                     self.monitor.observe(ProcCxtSaveEvent())
                     yield hold, self, self.cs_overhead  # overhead save context
                     self.monitor.observe(ProcCxtSaveEvent(terminated=True))
@@ -195,43 +249,19 @@ class Processor(Process):
             elif evt[0] == SPEED:
                 self.monitor.observe(ProcSpeedEvent(evt[1]))
                 self._speed = evt[1]
+                if self._energy_meter:
+                    latency = self._energy_meter.set_speed(evt[1])
+                    if latency > 0:
+                        # The processor is stalled during the transition.
+                        yield hold, self, int(latency *
+                                              self._model.cycles_per_ms)
             elif evt[0] == RESCHED:
                 self.monitor.observe(ProcOverheadEvent("Scheduling"))
                 self.sched.monitor_begin_schedule(self)
                 yield waituntil, self, self.sched.get_lock
                 decisions = self.sched.schedule(self)
                 yield hold, self, self.sched.overhead  # overhead scheduling
-                if type(decisions) is not list:
-                    decisions = [decisions]
-                decisions = [d for d in decisions if d is not None]
-
-                for job, cpu in decisions:
-                    # If there is nothing to change, simply ignore:
-                    if cpu.running == job:
-                        continue
-
-                    # If trying to execute a terminated job, warn and ignore:
-                    if job is not None and not job.is_active():
-                        print("Can't schedule a terminated job! ({})"
-                              .format(job.name))
-                        continue
-
-                    # if the job was running somewhere else, stop it.
-                    if job and job.cpu.running == job:
-                        job.cpu.preempt()
-
-                    # Send that job to processor cpu.
-                    cpu.preempt(job)
-
-                    if job:
-                        job.task.cpu = cpu
-
-                # Forbid to run a job simultaneously on 2 or more processors.
-                running_tasks = [
-                    cpu.running.name
-                    for cpu in self._model.processors if cpu.running]
-                assert len(set(running_tasks)) == len(running_tasks), \
-                    "Try to run a job on 2 processors simultaneously!"
+                self._apply_decisions(decisions)
 
                 self.sched.release_lock()
                 self.sched.monitor_end_schedule(self)
@@ -10,7 +10,6 @@ from simso.core.SchedulerEvent import SchedulerBeginScheduleEvent, \
     SchedulerEndScheduleEvent, SchedulerBeginActivateEvent, \
     SchedulerEndActivateEvent, SchedulerBeginTerminateEvent, \
     SchedulerEndTerminateEvent
-from SimPy.Simulation import Monitor
 
 
 class SchedulerInfo(object):
@@ -145,7 +144,7 @@ class Scheduler(object):
         self.overhead_activate = scheduler_info.overhead_activate
         self.overhead_terminate = scheduler_info.overhead_terminate
         self.data = scheduler_info.data
-        self.monitor = Monitor(name="MonitorScheduler", sim=sim)
+        self.monitor = sim.trace_backend.sink("MonitorScheduler")
 
     def init(self):
         """
@@ -1,7 +1,7 @@
 # coding=utf-8
 
 from collections import deque
-from SimPy.Simulation import Process, Monitor, hold, passivate
+from SimPy.Simulation import Process, hold, passivate
 from simso.core.Job import Job
 from simso.core.Timer import Timer
 from .CSDP import CSDP
@@ -130,8 +130,8 @@ class GenericTask(Process):
         Process.__init__(self, name=task_info.name, sim=sim)
         self.name = task_info.name
         self._task_info = task_info
-        self._monitor = Monitor(name="Monitor" + self.name + "_states",
-                                sim=sim)
+        self._monitor = sim.trace_backend.sink(
+            "Monitor" + self.name + "_states")
         self._activations_fifo = deque([])
         self._sim = sim
         self.cpu = None
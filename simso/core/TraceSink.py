@@ -0,0 +1,265 @@
+# coding=utf-8
+
+"""
+Trace sinks. A sink receives the observations of a monitored object (the
+logger, a task, a processor or the scheduler) and has the same interface as a
+SimPy Monitor: `observe`, iteration over [date, value] pairs, `len` and
+indexing.
+
+The sinks of a simulation are created by a trace backend, selected with the
+`trace` attribute of the :class:`Configuration
+<simso.configuration.Configuration>`:
+
+    - `monitor`: SimPy Monitors, every observation is kept in memory.
+    - `null`: every observation is discarded.
+    - `ring`: only the last `trace_size` observations of each sink are kept.
+    - `binary`: observations are streamed to the file `trace_file`, see \
+    :func:`read_trace` for its format.
+"""
+
+from collections import deque
+import struct
+
+from SimPy.Simulation import Monitor
+from simso.core.JobEvent import JobEvent
+from simso.core.ProcEvent import ProcEvent
+from simso.core.SchedulerEvent import SchedulerEvent
+
+
+class NullSink(object):
+    """
+    Sink that discards every observation.
+    """
+    def observe(self, y, t=None):
+        return
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+    def __getitem__(self, index):
+        raise IndexError(index)
+
+
+class RingBufferSink(object):
+    """
+    Sink that keeps the last `size` observations.
+    """
+    def __init__(self, sim, size):
+        """
+        Args:
+            - `sim`: :class:`Model <simso.core.Model>` instance.
+            - `size`: Maximum number of observations kept.
+        """
+        self._sim = sim
+        self._buffer = deque(maxlen=size)
+
+    def observe(self, y, t=None):
+        self._buffer.append([self._sim.now() if t is None else t, y])
+
+    def __iter__(self):
+        return iter(self._buffer)
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def __getitem__(self, index):
+        return self._buffer[index]
+
+
+# Binary trace records: date, channel, kind, event, three integer arguments
+# and a float argument. Log messages and channel names follow their record,
+# with their length in the first integer argument.
+_MAGIC = b"SIMSOTR1"
+_RECORD = struct.Struct("<qHBBiiid")
+
+KIND_NONE, KIND_JOB, KIND_PROC, KIND_SCHEDULER, KIND_LOG, KIND_CHANNEL, \
+    KIND_OTHER = range(7)
+
+_overheads = ["CS", "CL", "Scheduling", "JobActivation", "JobTermination"]
+
+
+def _identifier(obj):
+    return -1 if obj is None else obj.identifier
+
+
+def _job_number(job):
+    return int(job.name.rsplit("_", 1)[1])
+
+
+class BinaryFileSink(object):
+    """
+    Sink that writes every observation to a binary trace file. Nothing is
+    kept in memory.
+    """
+    def __init__(self, sim, f, channel):
+        """
+        Args:
+            - `sim`: :class:`Model <simso.core.Model>` instance.
+            - `f`: Trace file, opened in binary mode.
+            - `channel`: Channel number of the sink in the file.
+        """
+        self._sim = sim
+        self._f = f
+        self._channel = channel
+
+    def observe(self, y, t=None):
+        if t is None:
+            t = self._sim.now()
+        extra = b""
+
+        if y is None:
+            record = (KIND_NONE, 0, 0, 0, 0, 0.0)
+        elif isinstance(y, JobEvent):
+            record = (KIND_JOB, y.event, y.job.task.identifier,
+                      _job_number(y.job), _identifier(y.cpu), y.speed)
+        elif isinstance(y, ProcEvent):
+            if y.event == ProcEvent.RUN:
+                record = (KIND_PROC, y.event, y.args.task.identifier,
+                          _job_number(y.args), 0, 0.0)
+            elif y.event == ProcEvent.OVERHEAD:
+                overhead = _overheads.index(y.args) \
+                    if y.args in _overheads else -1
+                record = (KIND_PROC, y.event, overhead, 0,
+                          int(getattr(y, "terminated", False)), 0.0)
+            elif y.event == ProcEvent.SPEED:
+                record = (KIND_PROC, y.event, 0, 0, 0, y.args)
+            else:
+                record = (KIND_PROC, y.event, 0, 0, 0, 0.0)
+        elif isinstance(y, SchedulerEvent):
+            record = (KIND_SCHEDULER, y.event, _identifier(y.cpu), 0, 0, 0.0)
+        elif isinstance(y, tuple) and len(y) == 2 and isinstance(y[0], str):
+            # logger message
+            extra = y[0].encode("utf-8")
+            record = (KIND_LOG, int(y[1]), len(extra), 0, 0, 0.0)
+        else:
+            extra = repr(y).encode("utf-8")
+            record = (KIND_OTHER, 0, len(extra), 0, 0, 0.0)
+
+        self._f.write(_RECORD.pack(int(t), self._channel, *record))
+        if extra:
+            self._f.write(extra)
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+    def __getitem__(self, index):
+        raise IndexError(index)
+
+
+class MonitorTrace(object):
+    """
+    Keep every observation in SimPy Monitors.
+    """
+    def __init__(self, sim, configuration):
+        self._sim = sim
+
+    def sink(self, name):
+        return Monitor(name=name, sim=self._sim)
+
+    def close(self):
+        return
+
+
+class NullTrace(object):
+    """
+    Discard every observation.
+    """
+    def __init__(self, sim, configuration):
+        self._sink = NullSink()
+
+    def sink(self, name):
+        return self._sink
+
+    def close(self):
+        return
+
+
+class RingBufferTrace(object):
+    """
+    Keep the last `configuration.trace_size` observations of each sink.
+    """
+    def __init__(self, sim, configuration):
+        self._sim = sim
+        self._size = configuration.trace_size
+
+    def sink(self, name):
+        return RingBufferSink(self._sim, self._size)
+
+    def close(self):
+        return
+
+
+class BinaryFileTrace(object):
+    """
+    Stream every observation to the file `configuration.trace_file`.
+    """
+    def __init__(self, sim, configuration):
+        self._sim = sim
+        self._f = open(configuration.trace_file, "wb")
+        self._f.write(_MAGIC)
+        self._channels = 0
+
+    def sink(self, name):
+        channel = self._channels
+        self._channels += 1
+        encoded = name.encode("utf-8")
+        self._f.write(_RECORD.pack(0, channel, KIND_CHANNEL, 0, len(encoded),
+                                   0, 0, 0.0))
+        self._f.write(encoded)
+        return BinaryFileSink(self._sim, self._f, channel)
+
+    def close(self):
+        self._f.close()
+
+
+trace_backends = {
+    "monitor": MonitorTrace,
+    "null": NullTrace,
+    "ring": RingBufferTrace,
+    "binary": BinaryFileTrace
+}
+
+
+def read_trace(path):
+    """
+    Read a binary trace file.
+
+    Args:
+        - `path`: Trace file path.
+
+    Yield a tuple (channel name, date, kind, event, a, b, c, value, text) for
+    each observation. The meaning of a, b, c and value depends on the kind:
+
+        - `KIND_JOB`: task identifier, job number, processor identifier \
+        (-1 if none) and speed.
+        - `KIND_PROC`: task identifier and job number for RUN events, the \
+        overhead type (an index of `CS`, `CL`, `Scheduling`, \
+        `JobActivation`, `JobTermination`) and the terminated flag for \
+        OVERHEAD events, the speed in value for SPEED events.
+        - `KIND_SCHEDULER`: processor identifier.
+        - `KIND_LOG`: the message is in text and the kernel flag in event.
+        - `KIND_OTHER`: the representation of the observed value is in text.
+        - `KIND_NONE`: no argument.
+    """
+    channels = {}
+    with open(path, "rb") as f:
+        if f.read(len(_MAGIC)) != _MAGIC:
+            raise ValueError("{} is not a trace file".format(path))
+        while True:
+            data = f.read(_RECORD.size)
+            if len(data) < _RECORD.size:
+                break
+            t, channel, kind, event, a, b, c, value = _RECORD.unpack(data)
+            text = None
+            if kind in (KIND_LOG, KIND_OTHER, KIND_CHANNEL):
+                text = f.read(a).decode("utf-8")
+            if kind == KIND_CHANNEL:
+                channels[channel] = text
+                continue
+            yield (channels[channel], t, kind, event, a, b, c, value, text)
@@ -1,3 +1,5 @@
+from collections import deque
+from heapq import merge
 from simso.core.ProcEvent import ProcEvent
 from simso.core.JobEvent import JobEvent
 from simso.core.SchedulerEvent import SchedulerEvent
@@ -29,28 +31,61 @@ class SchedulerR(object):
         self.terminate_count = 0
 
 
+class EnergyR(object):
+    """
+    Add the energy consumption measured by the energy meters of the
+    processors: total, idle and transition energy, number of speed
+    transitions, and the energy of each job and task. The meters integrate
+    the whole simulation, the observation window does not apply.
+    """
+    def __init__(self):
+        self.total = 0
+        self.idle = 0
+        self.transitions = 0
+        self.transition_energy = 0
+        self.jobs = {}
+        self.tasks = {}
+
+    def add_meter(self, meter):
+        self.total += meter.total
+        self.idle += meter.idle
+        self.transitions += meter.transitions
+        self.transition_energy += meter.transition_energy
+        for job, energy in meter.jobs.items():
+            self.jobs[job] = self.jobs.get(job, 0) + energy
+        for task, energy in meter.task_energy().items():
+            self.tasks[task] = self.tasks.get(task, 0) + energy
+
+
 class TaskR(object):
     """
     Add a set of metrics to a task. These metrics include: task_migrations,
     abortion count, etc.
 
     The attribute jobs contains a list of JobR, sorted by activation date.
+
+    The number of EXECUTE events of each processor is shared by the TaskR of
+    a simulation (`executions`), other_executed compares it with its value
+    when the task was preempted.
     """
-    def __init__(self, task, delta_preemption=100):
+    def __init__(self, task, delta_preemption=100, executions=None):
         self.task = task
         self.delta_preemption = delta_preemption
         self.jobs = []
-        self.waiting_jobs = []
+        self.waiting_jobs = deque()
         self.resumptions = []
         self.task_migrations = []
         self.abort_count = 0
         self.execute_date = None
         self.preempt_date = None
         self.cpu = None
-        self.other_executed = False
+        self.executions = executions if executions is not None else {}
+        self._preempt_executions = None
+        self.energy = 0
 
-    def add_job(self, date, job):
+    def add_job(self, date, job, energy=0):
         jobr = JobR(date, job)
+        jobr.energy = energy
         self.jobs.append(jobr)
         self.waiting_jobs.append(jobr)
         if len(self.waiting_jobs) == 1:
@@ -60,7 +95,7 @@ class TaskR(object):
         if self.waiting_jobs:
             self.preempt(date)
             self.waiting_jobs[0].terminate(date)
-            self.waiting_jobs.pop(0)
+            self.waiting_jobs.popleft()
             if self.waiting_jobs:
                 self.waiting_jobs[0].start(date)
             self.preempt_date = None
@@ -69,7 +104,7 @@ class TaskR(object):
         if self.waiting_jobs:
             self.preempt(date)
             self.waiting_jobs[0].abort(date)
-            self.waiting_jobs.pop(0)
+            self.waiting_jobs.popleft()
             self.abort_count += 1
             if self.waiting_jobs:
                 self.waiting_jobs[0].start(date)
@@ -104,7 +139,16 @@ class TaskR(object):
             self.waiting_jobs[0].add_exec_time(date - self.execute_date)
         self.execute_date = None
         self.preempt_date = date
-        self.other_executed = False
+        self._preempt_executions = self.executions.get(self.cpu, 0)
+
+    @property
+    def other_executed(self):
+        """
+        True if another task executed on the processor of the task since it
+        was preempted.
+        """
+        return bool(self.preempt_date) and \
+            self.executions.get(self.cpu, 0) > self._preempt_executions
 
     @property
     def resumption_count(self):
@@ -158,6 +202,7 @@ class JobR(object):
         self.response_time = None
         self.start_date = None
         self.absolute_deadline = job.absolute_deadline_cycles
+        self.energy = 0
 
     def terminate(self, date):
         self.end_date = date
@@ -203,6 +248,8 @@ class Results(object):
         - `scheduler`: a SchedulerR instance.
         - `processors`: a dictionary of ProcessorR where the key is the \
             original Processor.
+        - `energy`: an EnergyR instance, None if no processor has a power \
+            model.
 
     .
     """
@@ -216,37 +263,42 @@ class Results(object):
         self.processors = {}
         self.total_timers = 0
         self.timers = None
+        self.energy = None
 
     def end(self):
         self._analyze()
 
     def tasks_event(self):
         """
-        Generator of the tasks events sorted by their date.
+        Generator of the tasks events sorted by their date, a heap merge of
+        the task monitors on the event ids.
         """
-        monitors = {}
-        indices = {}
-        for task in self.model.task_list:
-            monitors[task] = task.monitor
-            indices[task] = 0
-
-        while True:
-            m = None
-            for task in self.model.task_list:
-                if indices[task] < len(monitors[task]):
-                    evt = monitors[task][indices[task]]
-                    if m is None or evt[1].id_ < m[0][1].id_:
-                        m = (evt, task)
-            if m is None:
-                break
-            indices[m[1]] += 1
-            yield m
+        def events(task):
+            for evt in task.monitor:
+                yield evt[1].id_, evt, task
+
+        for _, evt, task in merge(*[events(task)
+                                    for task in self.model.task_list]):
+            yield evt, task
+
+    def _generate_energy(self):
+        meters = [proc.energy_meter for proc in self.model.processors
+                  if proc.energy_meter]
+        if not meters:
+            self.energy = None
+            return
+        self.energy = EnergyR()
+        for meter in meters:
+            self.energy.add_meter(meter)
 
     def _generate_tasks(self):
         self.tasks = {}
+        executions = {}
 
         for task in self.model.task_list:
-            self.tasks[task] = TaskR(task)
+            self.tasks[task] = TaskR(task, executions=executions)
+            if self.energy is not None:
+                self.tasks[task].energy = self.energy.tasks.get(task, 0)
 
         for evt, task in self.tasks_event():
             if (evt[0] < self.observation_window[0] or
@@ -255,16 +307,17 @@ class Results(object):
                 # maybe be stored...
                 continue
             if evt[1].event == JobEvent.ACTIVATE:
-                self.tasks[task].add_job(evt[0], evt[1].job)
+                energy = 0
+                if self.energy is not None:
+                    energy = self.energy.jobs.get(evt[1].job, 0)
+                self.tasks[task].add_job(evt[0], evt[1].job, energy)
             elif evt[1].event == JobEvent.TERMINATED:
                 self.tasks[task].terminate_job(evt[0])
             elif evt[1].event == JobEvent.ABORTED:
                 self.tasks[task].abort_job(evt[0])
             elif evt[1].event == JobEvent.EXECUTE:
                 self.tasks[task].execute(evt[0], evt[1].cpu)
-                for rt in self.tasks.values():
-                    if rt.preempt_date and evt[1].cpu == rt.cpu:
-                        rt.other_executed = True
+                executions[evt[1].cpu] = executions.get(evt[1].cpu, 0) + 1
             elif evt[1].event == JobEvent.PREEMPTED:
                 self.tasks[task].preempt(evt[0])
 
@@ -325,6 +378,7 @@ class Results(object):
                 self.timers[proc] += 1
 
     def _analyze(self):
+        self._generate_energy()
         self._generate_tasks()
         self._generate_scheduler()
         self._generate_processors()
@@ -1,15 +1,41 @@
 from simso.core import Scheduler, Timer
 from simso.schedulers import scheduler
 
-@scheduler("simso.schedulers.LLF")
+@scheduler("simso.schedulers.LLF",
+    required_fields = [
+        {'name' : 'event_driven', 'type' : 'bool', 'default' : 'False'}
+    ]
+)
 class LLF(Scheduler):
-    """Least Laxity First"""
+    """
+    Least Laxity First
+
+    By default a periodic timer sorts the jobs again every millisecond. With
+    the event_driven field, a one-shot timer is armed at the first tick of the
+    same 1 ms grid where the laxity of a waiting job drops below the laxity of
+    a running job, as the order of the jobs can not change before. The event
+    driven mode calls the scheduler only on those ticks, and only charges its
+    timer overhead on them, while the periodic timer charges .001 ms on every
+    tick: both modes take the same decisions only when their timer overheads
+    are 0.
+    """
+    # Overhead of the one-shot timer handler of the event driven mode, in ms.
+    event_timer_overhead = 0
+
     def init(self):
         self.ready_list = []
-        self.timer = Timer(self.sim, LLF.update,
-                           (self, self.processors[0]), 1, one_shot=False,
-                           cpu=self.processors[0], overhead=.001)
-        self.timer.start()
+        event_driven = self.data.get('event_driven') if self.data else False
+        if isinstance(event_driven, str):
+            event_driven = event_driven.lower() in ('true', '1')
+        self.event_driven = bool(event_driven)
+        self.tick = int(self.sim.cycles_per_ms)
+        if self.event_driven:
+            self.timer = None
+        else:
+            self.timer = Timer(self.sim, LLF.update,
+                               (self, self.processors[0]), 1, one_shot=False,
+                               cpu=self.processors[0], overhead=.001)
+            self.timer.start()
 
     def update(self, cpu):
         if self.ready_list:
@@ -23,6 +49,45 @@ class LLF(Scheduler):
         self.ready_list.remove(job)
         self.update(job.cpu)
 
+    def next_tick(self, m):
+        """
+        First tick of the 1 ms grid where the laxity of a waiting job is lower
+        than the laxity of the last running job (the m-th job), None if there
+        are no waiting jobs. The laxity of the running jobs is constant and
+        the laxity of the waiting jobs decreases with time.
+        """
+        if len(self.ready_list) <= m:
+            return None
+        last = self.ready_list[m - 1]
+        laxity = last.laxity
+        now = self.sim.now()
+        date = None
+        for job in self.ready_list[m:]:
+            crossing = now + job.laxity - laxity
+            if job.task.identifier < last.task.identifier:
+                # Ties are broken by the task identifier.
+                tick = -(-crossing // self.tick) * self.tick
+            else:
+                tick = (crossing // self.tick + 1) * self.tick
+            if date is None or tick < date:
+                date = tick
+        # The current tick is already decided.
+        return int(max(date, (now // self.tick + 1) * self.tick))
+
+    def arm_timer(self, m):
+        if self.timer:
+            self.timer.stop()
+            self.timer = None
+
+        date = self.next_tick(m)
+        if date is not None:
+            self.timer = Timer(self.sim, LLF.update,
+                               (self, self.processors[0]),
+                               date - self.sim.now(), one_shot=True,
+                               cpu=self.processors[0], in_ms=False,
+                               overhead=self.event_timer_overhead * self.tick)
+            self.timer.start()
+
     def schedule(self, cpu):
         decisions = []
         if self.ready_list:
@@ -42,4 +107,7 @@ class LLF(Scheduler):
                     proc = next(l)
                     decisions.append((job, proc))
 
+        if self.event_driven:
+            self.arm_timer(len(self.processors))
+
         return decisions
@@ -1,52 +1,36 @@
 #!python
 
-from argparse import ArgumentParser, FileType
+from argparse import ArgumentParser, FileType, Namespace
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from copy import deepcopy
 from utils.files import get_from_file
 from utils.rts import mixrange
 from schedtests import josephp
 from simso.configuration import Configuration
 from simso.core import Model
+from simso.core.TraceSink import trace_backends
+from simso.core.results import Results
 from slack.SlackExceptions import NegativeSlackException, DifferentSlackException
+from slack.SlackReplay import SlackLog, verify_slack_log
+from slack import SlackUtils
 from utils.cpu import Cpu
+from utils.profiling import WallProfiler, set_profiling
+from utils.results import EventRecorder
+import io
 import sys
 import json
+import time
 
 
-class SinkLogger(object):
-    """
-    Simple logger. Every message is discarded.
-    """
-    def __init__(self, sim):
-        return
-
-    def log(self, msg, kernel=False):
-        return
-
-    @property
-    def logs(self):
-        return
-
-
-class SinkMonitor(list):
-    """
-    Simple monitor. Every observation is discarded.
-    """
-    def __init__(self):
-        return
-
-    def observe(self, y,t = None):
-        return
-
-    def __len__(self):
-        return 0
-
-
-def create_configuration(rts, instance_count, scheduler):
+def create_configuration(rts, instance_count, scheduler, power_model=None):
     """
     TODO: add description
     :param rts:
     :param instance_count:
     :param scheduler:
+    :param power_model: power model of the processor (a Cpu), for its energy meter
     :return:
     """
     # Create a SimSo configuration object.
@@ -68,7 +52,7 @@ def create_configuration(rts, instance_count, scheduler):
                                list_activation_dates=[atask["a"]])
 
     # Add a processor.
-    configuration.add_processor(name="CPU 1", identifier=1)
+    configuration.add_processor(name="CPU 1", identifier=1, power_model=power_model)
 
     # Add a scheduler.
     configuration.scheduler_info.clas = scheduler
@@ -79,6 +63,60 @@ def create_configuration(rts, instance_count, scheduler):
     return configuration
 
 
+def profile_model(profiler, model, ss_methods):
+    """
+    Measure the wall-clock time of a SimSo model: the whole simulation, each engine step, each step of the process
+    generators (processors, tasks, jobs and timers), the scheduler callbacks, the slack methods, the trace sinks and
+    the results analysis. The patches are undone by profiler.restore().
+    :param profiler: WallProfiler
+    :param model: SimSo model
+    :param ss_methods: slack methods used by the scheduler
+    :return: None
+    """
+    profiler.patch(model, "run_model", "Model.run_model")
+    profiler.patch(model, "step", "engine.step")
+
+    def measured_activate(activate):
+        def activate_process(obj, process, *args, **kwargs):
+            name = "{}.{}".format(type(obj).__name__, process.__name__)
+            return activate(obj, profiler.wrap_generator(name, process), *args, **kwargs)
+        return activate_process
+
+    profiler.patch(model, "activate", replacement=measured_activate)
+
+    scheduler = model.scheduler
+    for callback in ["init", "on_activate", "on_terminated", "schedule"]:
+        profiler.patch(scheduler, callback, "{}.{}".format(type(scheduler).__name__, callback))
+
+    for method in set(ss_methods or []):
+        if method in SlackUtils._slack_methods:
+            profiler.patch(SlackUtils._slack_methods, method, "slack.{}".format(method))
+
+    # The null trace shares a single sink.
+    sinks = [scheduler.monitor, model.logger.logs] + [task.monitor for task in model.task_list]
+    for proc in model.processors:
+        sinks += [proc.monitor, proc.timer_monitor]
+    for sink in {id(sink): sink for sink in sinks}.values():
+        profiler.patch(sink, "observe", "trace.observe")
+
+    profiler.patch(Results, "_analyze", "Results._analyze")
+
+
+def print_energy(energy):
+    """
+    Print the energy measured by the processor energy meter: the energy of each task, the idle energy, the speed
+    transitions and the total.
+    :param energy: EnergyR of the simulation results
+    :return: None
+    """
+    jobs = Counter(job.task for job in energy.jobs)
+    for task, task_energy in sorted(energy.tasks.items(), key=lambda item: item[0].identifier):
+        print("Energy\t{}\t{}\t{:.3f}".format(task.name, jobs[task], task_energy))
+    print("Energy\tidle\t-\t{:.3f}".format(energy.idle))
+    print("Energy\ttransitions\t{}\t{:.3f}".format(energy.transitions, energy.transition_energy))
+    print("Energy\ttotal\t-\t{:.3f}".format(energy.total))
+
+
 def run_simulation(rts, args):
     """
     Simulate an rts
@@ -93,7 +131,7 @@ def run_simulation(rts, args):
     # Do not simulate if only schedulable systems are required.
     if not rts["schedulable"]:
         if args.only_schedulable:
-            return True
+            return {"error": False}
 
     params = {
         "rts": rts,
@@ -101,16 +139,38 @@ def run_simulation(rts, args):
         "ss_methods": args.ss_methods,
         "scheduler": args.scheduler,
         "gantt": args.gantt,
-        "cpu": Cpu(json.load(args.cpu))
+        "cpu": Cpu(deepcopy(args.cpu)),
+        "integer_time": args.integer_time
     }
 
+    # Record the slack calculations to replay them with the methods to verify.
+    if args.verify_methods:
+        params["slack_log"] = SlackLog()
+
+    # Record the scheduler events and slack calculations instead of printing them.
+    if args.results_file:
+        # The ceil and floor counts of the slack calculations are recorded too.
+        set_profiling(True)
+        params["results"] = EventRecorder(args.results_file.format(id=rts["id"]), rts["id"])
+
     result = {
         "error": False,
     }
 
+    profiler = WallProfiler() if args.profile or args.profile_stacks else None
+
     try:
         # Create SimSo configuration.
-        cfg = create_configuration(params["rts"], params["instance_count"], params["scheduler"])
+        cfg = create_configuration(params["rts"], params["instance_count"], params["scheduler"], params["cpu"])
+
+        # Trace backend, the gantt needs the full trace.
+        cfg.trace = "monitor" if params["gantt"] else args.trace
+        cfg.trace_size = args.trace_size
+        if args.trace_file:
+            cfg.trace_file = args.trace_file.format(id=rts["id"])
+
+        # Simulation engine, the event engine does not run the jobs as SimPy processes.
+        cfg.engine = args.engine
 
         # Creates a SimSo model.
         model = Model(cfg)
@@ -118,17 +178,26 @@ def run_simulation(rts, args):
         # Parameters needed by the scheduler
         model.scheduler.data = params
 
-        # Discard trace information to reduce memory footprint.
-        if not params["gantt"]:
-            model._logger = SinkLogger(model)
-            for task in model.scheduler.task_list:
-                task._monitor = SinkMonitor()
-            for cpu in model.scheduler.processors:
-                cpu.monitor = SinkMonitor()
+        if profiler:
+            profile_model(profiler, model, params["ss_methods"])
 
         # Run the simulation.
         model.run_model()
 
+        if args.energy and model.results:
+            print_energy(model.results.energy)
+
+        # Replay the slack calculations, each method in its own process unless the rts are already simulated in a
+        # process pool.
+        if args.verify_methods:
+            divergences = verify_slack_log(params["slack_log"], args.verify_methods,
+                                           len(args.verify_methods) if args.jobs == 1 else 1)
+            if divergences:
+                first = min(divergences, key=lambda d: d["record"])
+                raise DifferentSlackException(first["tc"], first["task"], first["method"], [
+                    (args.ss_methods[0], {"slack": first["reference"][0], "ttma": first["reference"][1], "cc": "-"}),
+                    (first["method"], {"slack": first["result"][0], "ttma": first["result"][1], "cc": "-"})])
+
     except (NegativeSlackException, DifferentSlackException) as exc:
         result["error"] = True
         result["error_msg"] = str(exc)
@@ -142,14 +211,17 @@ def run_simulation(rts, args):
         result["error_msg"] = str(exc)
 
     finally:
+        if "results" in params:
+            params["results"].close()
+        if profiler:
+            profiler.restore()
+            if args.profile:
+                print("Profile of RTS {0}\n{1}".format(rts["id"], profiler.summary()), file=sys.stderr)
+            if args.profile_stacks:
+                profiler.write_folded(args.profile_stacks.format(id=rts["id"]))
         if params["gantt"]:
             result["model"] = model
 
-    if result["error"]:
-        print("Error: RTS {0}, {1}".format(rts["id"], result["error_msg"]), file=sys.stderr)
-        if args.stop_on_error:
-            sys.exit(1)
-
     if args.gantt:
         from gui.gantt import create_gantt_window
         from PyQt5.QtWidgets import QApplication
@@ -160,6 +232,89 @@ def run_simulation(rts, args):
     return result
 
 
+def simulation_worker(rts, args):
+    """
+    Simulate an rts inside a pool worker. The scheduler output is captured and sent back with a compact result
+    record, so the SimSo model never leaves the worker process.
+    :param rts: task set
+    :param args: parameters
+    :return: result record
+    """
+    output = io.StringIO()
+    with redirect_stdout(output):
+        result = run_simulation(rts, args)
+    return {"id": rts["id"], "error": result["error"], "error_msg": result.get("error_msg", ""),
+            "output": output.getvalue()}
+
+
+def run_parallel(rts_list, args):
+    """
+    Simulate the rts in a pool of args.jobs processes. Results are printed in input order.
+    :param rts_list: iterable of task sets
+    :param args: parameters
+    :return: True if any simulation failed
+    """
+    # Only picklable parameters are sent to the workers.
+    worker_args = Namespace(**vars(args))
+    worker_args.file = None
+    worker_args.gantt = False
+
+    error = False
+    count = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        rts_iter = iter(rts_list)
+        pending = deque()
+        read_error = None
+
+        def submit_next():
+            # An error reading the input stops the submissions, it is raised once the results of the rts read
+            # before it are printed, as in the sequential mode.
+            nonlocal rts_iter, read_error
+            try:
+                rts = next(rts_iter, None)
+            except Exception as exc:
+                rts, rts_iter, read_error = None, iter(()), exc
+            if rts is not None:
+                pending.append(executor.submit(simulation_worker, rts, worker_args))
+
+        # Keep a bounded window of submitted work, so the input file is read lazily.
+        for _ in range(args.jobs * 2):
+            submit_next()
+
+        while pending:
+            result = pending.popleft().result()
+            submit_next()
+            count += 1
+
+            if args.verbose:
+                print("Simulated RTS {0:}".format(result["id"]), file=sys.stderr)
+            sys.stdout.write(result["output"])
+
+            if result["error"]:
+                error = True
+                print("Error: RTS {0}, {1}".format(result["id"], result["error_msg"]), file=sys.stderr)
+                if args.stop_on_error:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+
+        if read_error is not None and not (error and args.stop_on_error):
+            raise read_error
+
+    elapsed = time.perf_counter() - start
+    print("Simulated {0:} RTS in {1:.3f} s ({2:.2f} RTS/s)".format(count, elapsed, count / elapsed if elapsed else 0),
+          file=sys.stderr)
+
+    return error
+
+
+def json_file(path):
+    """ Load a json file given as command line argument """
+    with open(path) as f:
+        return json.load(f)
+
+
 def get_args():
     """ Command line arguments """
     parser = ArgumentParser(description="Simulate a RTS.")
@@ -172,8 +327,24 @@ def get_args():
     parser.add_argument("--gantt", action="store_true", default=False, help="Show scheduling gantt.")
     parser.add_argument("--stop-on-error", default=False, action="store_true", help="Stop and exit the simulation if an error is detected.")
     parser.add_argument("--verbose", default=False, action="store_true", help="Show progress information on stderr.")
-    parser.add_argument("--cpu", type=FileType('r'), help="CPU model.")
-    return parser.parse_args()
+    parser.add_argument("--cpu", type=json_file, help="CPU model.")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of simulation processes.")
+    parser.add_argument("--integer-time", default=False, action="store_true", help="Slack Stealing with integer times in cycles.")
+    parser.add_argument("--verify-methods", nargs='+', type=str, help="Slack Stealing methods replayed against the first of --ss-methods after each simulation.")
+    parser.add_argument("--trace", type=str, choices=trace_backends.keys(), default="null", help="Trace backend.")
+    parser.add_argument("--trace-size", type=int, default=1000, help="Observations kept per monitor by the ring trace.")
+    parser.add_argument("--trace-file", type=str, help="Binary trace file, {id} is replaced by the RTS id.")
+    parser.add_argument("--engine", type=str, choices=["simpy", "event"], default="simpy", help="Simulation engine, event is the fast-forward engine without SimPy processes.")
+    parser.add_argument("--energy", default=False, action="store_true", help="Print the energy of each task measured by the processor energy meter.")
+    parser.add_argument("--profile", default=False, action="store_true", help="Print the wall-clock time of the scheduler callbacks, slack methods and simulation engine on stderr.")
+    parser.add_argument("--profile-stacks", type=str, help="Write the profiled stacks in folded format for flamegraphs, {id} is replaced by the RTS id.")
+    parser.add_argument("--results-file", type=str, help="Record the events in a .npz, .parquet or .feather file instead of printing them, {id} is replaced by the RTS id. The ceil and floor counts of each slack calculation are recorded in the cc column, which enables their counting.")
+    args = parser.parse_args()
+    if args.trace == "binary" and not args.trace_file:
+        parser.error("--trace binary requires --trace-file")
+    if args.results_file and not args.results_file.endswith((".npz", ".parquet", ".feather", ".arrow")):
+        parser.error("--results-file must be a .npz, .parquet or .feather file")
+    return args
 
 
 def main():
@@ -183,13 +354,19 @@ def main():
     try:
         error = False
 
+        # Simulate the selected rts in a process pool.
+        if args.jobs > 1 and not args.gantt:
+            if run_parallel(get_from_file(args.file, mixrange(args.rts)), args):
+                sys.exit(1)
+            return
+
         # Simulate the selected rts from the specified file.
         for rts in get_from_file(args.file, mixrange(args.rts)):
             if args.verbose:
                 print("Simulating RTS {0:}".format(rts["id"]), file=sys.stderr)
             sim_result = run_simulation(rts, args)
             error |= sim_result["error"]
-            if error:
+            if sim_result["error"]:
                 print("Error: RTS {0}, {1}".format(rts["id"], sim_result["error_msg"]), file=sys.stderr)
                 if args.stop_on_error:
                     sys.exit(1)
@@ -0,0 +1,42 @@
+from slack.SlackTime import CycleTask, EPSILON
+
+
+class SlackCache:
+    """
+    Slack stealing data that does not change along a simulation. It should be built once, after the slack fields
+    of the tasks are initialized, and passed to every slack calculation. If a SlackLog is given, every slack
+    calculation is recorded in it, and if an EventRecorder is given, the result of each method is recorded in it. If
+    cycles_per_ms is given, the slack methods work with integer times in cycles on views of the tasks (see SlackTime).
+    """
+    def __init__(self, task_list, log=None, cycles_per_ms=None, recorder=None):
+        self.integer = cycles_per_ms is not None
+        if self.integer:
+            task_list = [CycleTask(task, cycles_per_ms) for task in task_list]
+
+        # step over a fixed point, and time unit of the task parameters
+        self.epsilon = 1 if self.integer else EPSILON
+        self.unit = cycles_per_ms if self.integer else 1
+
+        # task list sorted by period (RM)
+        self.tasks = sorted(task_list, key=lambda x: x.period)
+
+        self.log = log
+        self.recorder = recorder
+        if log is not None:
+            log.bind(self.tasks, self.epsilon, self.unit)
+
+        # tasks with higher or equal priority, indexed by task identifier
+        self.hp = [self.tasks[:i] for i in range(len(self.tasks) + 1)]
+
+        self._states = {}
+
+    def states(self, method):
+        """
+        (task, method state) pairs of the tasks with higher or equal priority, indexed by task identifier.
+        :param method: slack method name
+        :return: list of lists of pairs
+        """
+        if method not in self._states:
+            pairs = [(task, task.data["ss"][method]) for task in self.tasks]
+            self._states[method] = [pairs[:i] for i in range(len(pairs) + 1)]
+        return self._states[method]
@@ -1,19 +1,12 @@
 import math
+from slack.SlackCache import SlackCache
+from utils.profiling import counted_global, cc_count
 
-def get_slack(task, task_list, tc):
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
+ceil = counted_global(globals(), "ceil", math.ceil)
 
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
 
-    ceil.counter = 0
+def get_slack(task, task_list, tc, cache=None):
+    cc_start = cc_count(ceil)
 
     slack_calcs = 0
     points = []
@@ -23,13 +16,15 @@ def get_slack(task, task_list, tc):
 
     # if it is the max priority task, the slack is trivial
     if task.identifier == 1:
-        return {"slack": task.data["ss"]["di"] - tc - task.data["R"], "ttma": task.data["ss"]["di"], "cc": ceil.counter}
+        return {"slack": task.data["ss"]["di"] - tc - task.data["R"], "ttma": task.data["ss"]["di"],
+                "cc": cc_count(ceil) - cc_start}
 
-    # sort the task list by period (RM)
-    tl = sorted(task_list, key=lambda x: x.period)
+    # task list sorted by period (RM)
+    if cache is None:
+        cache = SlackCache(task_list)
 
-    # immediate higher priority task
-    htasks = tl[:task.identifier]
+    # higher or equal priority tasks
+    htasks = cache.hp[task.identifier]
 
     kdavis = task.data["k"]
     wdavis1 = xi - tc
@@ -56,10 +51,14 @@ def get_slack(task, task_list, tc):
                 vimin = 0
             else:
                 for htask in htasks:
-                    vi1 = ceil((wdavis - xi - tc) / htask.period)
+                    xi1 = ceil(tc / htask.period) * htask.period - tc
+                    if cache.integer:
+                        # next arrival of htask at or after the end of the busy window
+                        vi1 = ceil((wdavis - xi1) / htask.period)
+                    else:
+                        vi1 = ceil((wdavis - xi - tc) / htask.period)
                     if vi1 < 0:
                         vi1 = 0
-                    xi1 = ceil(tc / htask.period) * htask.period - tc
                     vi = vi1 * htask.period + xi1 - wdavis
                     if vi < vimin:
                         vimin = vi
@@ -76,4 +75,4 @@ def get_slack(task, task_list, tc):
                 if wdavis1 == wdavis:
                     wdavis1 += e
 
-    return {"slack": kdavis - 1, "ttma": 0, "cc": ceil.counter}
+    return {"slack": kdavis - 1, "ttma": 0, "cc": cc_count(ceil) - cc_start}
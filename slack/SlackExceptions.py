@@ -1,9 +1,10 @@
 class NegativeSlackException(Exception):
-    def __init__(self, t, task, method):
+    def __init__(self, t, task, method, unit=1):
+        # unit: time units per ms of t and the slack, cycles_per_ms in integer-time mode
         if "ss" in task.data:
-            Exception.__init__(self, 'Negative slack! method {:s}, task {:s}, t={:f}, s={:f}'.format(method, task.job.name, t, task.data['ss']['slack']))
+            Exception.__init__(self, 'Negative slack! method {:s}, task {:s}, t={:f}, s={:f}'.format(method, task.job.name, t / unit, task.data['ss']['slack'] / unit))
         else:
-            Exception.__init__(self, 'Negative slack! method {:s}, task {:s}, t={:f}'.format(method, task.name, t))
+            Exception.__init__(self, 'Negative slack! method {:s}, task {:s}, t={:f}'.format(method, task.name, t / unit))
 
 
 class DifferentSlackException(Exception):
@@ -1,102 +1,93 @@
-def get_slack(task, task_list, tc):
-    import math
-
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
-
-    def slackcalc(task_list, tc, t, wc):
-        w = 0
-        for task in task_list:
-            b = task.data["ss"]["Fast"]["b"]
-            if (t > b) or (t <= (b - task.period)):
-                a_t = ceil(t / task.period)
-                task.data["ss"]["Fast"]["a"] = a_t * task.wcet
-                task.data["ss"]["Fast"]["b"] = a_t * task.period
-            w = w + task.data["ss"]["Fast"]["a"]
-        return t - tc - w + wc, w
-
-    def _loop(di, t1, task_list):
-        t1_tmp = t1
-        w = 0
-        cc = 0
-
-        for task in reversed(task_list):
-            if (t1_tmp <= task.data["ss"]["Fast"]["b"] - task.period) or (
-                    t1_tmp > task.data["ss"]["Fast"]["b"]):
-                _ceil = ceil(t1_tmp / task.period)
-                cc += 1
-                ceil_a = _ceil * task.wcet
-                ceil_b = _ceil * task.period
-
-                if ceil_a > task.data["ss"]["Fast"]["a"]:
-                    t1_tmp += ceil_a - task.data["ss"]["Fast"]["a"]
-                    if t1_tmp > di:
-                        break
-
-                task.data["ss"]["Fast"]["a"] = ceil_a
-                task.data["ss"]["Fast"]["b"] = ceil_b
-
-            w = w + task.data["ss"]["Fast"]["a"]
-
-        return w, t1_tmp, cc
-
-    def _heuristic(tc, wc, tmas, tmax, smax, di, tasks, htasks):
-        cc = 0
-        tmin = di
-        slack_calcs = 0
-
-        remain_htasks = []
-        points = []
-
-        for htask in htasks:
-            a1 = htask.data["ss"]["Fast"]["a"]
-            b1 = htask.data["ss"]["Fast"]["b"]
-
-            if tmas <= (b1 - htask.period):
-                a1 -= htask.wcet
-                b1 -= htask.period
-                htask.data["ss"]["Fast"]["a"] -= htask.wcet
-                htask.data["ss"]["Fast"]["b"] -= htask.period
-
-            if tmin > b1:
-                tmin = b1
-
-            if di > b1:
-                if b1 > tmas:
-                    if htask.data["ss"]["Fast"]["c"] != b1:
-                        slack_tmp, slackcalc_cc = slackcalc(tasks, tc, b1, wc)
-                        points.append(b1)
-                        cc += slackcalc_cc
-                        slack_calcs += 1
-
-                        if slack_tmp > smax:
-                            smax = slack_tmp
-                            tmax = b1
-                        else:
-                            if slack_tmp == smax:
-                                if tmax > b1:
-                                    tmax = b1
-
-                htask.data["ss"]["Fast"]["c"] = b1
-                remain_htasks.append(htask)
-
-        return tmin, tmax, smax, remain_htasks, cc, slack_calcs, points
-
-    ceil.counter = 0
-    floor.counter = 0
+import math
+from slack.SlackCache import SlackCache
+from utils.profiling import counted_global, cc_count
+
+ceil = counted_global(globals(), "ceil", math.ceil)
+floor = counted_global(globals(), "floor", math.floor)
+
+
+def slackcalc(task_states, tc, t, wc):
+    w = 0
+    for task, tss in task_states:
+        b = tss["b"]
+        if (t > b) or (t <= (b - task.period)):
+            a_t = ceil(t / task.period)
+            tss["a"] = a_t * task.wcet
+            tss["b"] = a_t * task.period
+        w = w + tss["a"]
+    return t - tc - w + wc, w
+
+
+def _loop(di, t1, task_states):
+    t1_tmp = t1
+    w = 0
+    cc = 0
+
+    for task, tss in reversed(task_states):
+        if (t1_tmp <= tss["b"] - task.period) or (t1_tmp > tss["b"]):
+            _ceil = ceil(t1_tmp / task.period)
+            cc += 1
+            ceil_a = _ceil * task.wcet
+            ceil_b = _ceil * task.period
+
+            if ceil_a > tss["a"]:
+                t1_tmp += ceil_a - tss["a"]
+                if t1_tmp > di:
+                    break
+
+            tss["a"] = ceil_a
+            tss["b"] = ceil_b
+
+        w = w + tss["a"]
+
+    return w, t1_tmp, cc
+
+
+def _heuristic(tc, wc, tmas, tmax, smax, di, task_states, htasks):
+    cc = 0
+    tmin = di
+    slack_calcs = 0
+
+    remain_htasks = []
+    points = []
+
+    for htask in htasks:
+        a1 = htask.data["ss"]["Fast"]["a"]
+        b1 = htask.data["ss"]["Fast"]["b"]
+
+        if tmas <= (b1 - htask.period):
+            a1 -= htask.wcet
+            b1 -= htask.period
+            htask.data["ss"]["Fast"]["a"] -= htask.wcet
+            htask.data["ss"]["Fast"]["b"] -= htask.period
+
+        if tmin > b1:
+            tmin = b1
+
+        if di > b1:
+            if b1 > tmas:
+                if htask.data["ss"]["Fast"]["c"] != b1:
+                    slack_tmp, slackcalc_cc = slackcalc(task_states, tc, b1, wc)
+                    points.append(b1)
+                    cc += slackcalc_cc
+                    slack_calcs += 1
+
+                    if slack_tmp > smax:
+                        smax = slack_tmp
+                        tmax = b1
+                    else:
+                        if slack_tmp == smax:
+                            if tmax > b1:
+                                tmax = b1
+
+            htask.data["ss"]["Fast"]["c"] = b1
+            remain_htasks.append(htask)
+
+    return tmin, tmax, smax, remain_htasks, cc, slack_calcs, points
+
+
+def get_slack(task, task_list, tc, cache=None):
+    cc_start = cc_count(ceil, floor)
 
     ss_points = []
 
@@ -108,11 +99,15 @@ def get_slack(task, task_list, tc):
 
     # if it is the max priority task, the slack is trivial
     if task.identifier == 1:
-        return {"slack": task.data["ss"]["di"] - tc - task.data["R"], "ttma": task.data["ss"]["di"], "cc": ceil.counter,
+        return {"slack": task.data["ss"]["di"] - tc - task.data["R"], "ttma": task.data["ss"]["di"],
+                "cc": cc_count(ceil, floor) - cc_start,
                 "theorems": [], "interval_length": 0, "slack_calcs": 0, "points": [], "interval": 0}
 
-    # sort the task list by period (RM)
-    tl = sorted(task_list, key=lambda x: x.period)
+    # task list sorted by period (RM)
+    if cache is None:
+        cache = SlackCache(task_list)
+    tl = cache.tasks
+    task_states = cache.states("Fast")[task.identifier]
 
     kmax = task.data["k"]
     tmax = task.data["ss"]["di"]
@@ -122,7 +117,8 @@ def get_slack(task, task_list, tc):
 
     # corollary 5 (theorem 13) for RM
     if htask.data["ss"]["di"] + htask.wcet >= task.data["ss"]["di"] >= htask.data["ss"]["ttma"]:
-        return {"slack": htask.data["ss"]["slack"] - task.wcet, "ttma": htask.data["ss"]["ttma"], "cc": ceil.counter,
+        return {"slack": htask.data["ss"]["slack"] - task.wcet, "ttma": htask.data["ss"]["ttma"],
+                "cc": cc_count(ceil, floor) - cc_start,
                 "theorems": [5], "interval_length": 0, "slack_calcs": 0, "points": [], "interval": 0}
 
     # theorem 10
@@ -130,7 +126,7 @@ def get_slack(task, task_list, tc):
 
     # workload at tc
     wc = 0
-    for task in tl[:task.identifier]:
+    for task in cache.hp[task.identifier]:
         a = floor(tc / task.deadline)
         wc += (a * task.wcet) + (task.job.actual_computation_time if task.job else 0)
 
@@ -146,7 +142,7 @@ def get_slack(task, task_list, tc):
         theorems.append(12)
 
     # calculate slack in deadline
-    k2, slackcalc_cc = slackcalc(tl[:task.identifier], tc, task.data["ss"]["di"], wc)
+    k2, slackcalc_cc = slackcalc(task_states, tc, task.data["ss"]["di"], wc)
     slack_calcs = 1
     ss_points.append(task.data["ss"]["di"])
 
@@ -164,12 +160,12 @@ def get_slack(task, task_list, tc):
     t1 = t = interval
 
     # higher priority tasks
-    htl = tl[:task.identifier - 1]
+    htl = cache.hp[task.identifier - 1]
     for htask in htl:
         htask.data["ss"]["Fast"]["c"] = 0
 
     # epsilon
-    e = 5 * 0.0000001
+    e = cache.epsilon
 
     #if task.job.name == "T_4_135":
         #breakpoint()
@@ -178,7 +174,7 @@ def get_slack(task, task_list, tc):
     while task.data["ss"]["di"] > t:
         t1bkp = t1
 
-        w, t1, loop_cc = _loop(task.data["ss"]["di"], t1, tl[:task.identifier])
+        w, t1, loop_cc = _loop(task.data["ss"]["di"], t1, task_states)
 
         #print("{0:}\tFast\t{1:} {2:} = _loop({3:}, {4:}, tasks)".format(task.job.name, w, t1, task.data["ss"]["di"], t1bkp))
 
@@ -200,7 +196,7 @@ def get_slack(task, task_list, tc):
                     tmax = tmas
 
                 tmax_arg = tmax
-                tmin, tmax, s, htl, heuristic_cc, heuristic_slack_calcs, points = _heuristic(tc, wc, tmas, tmax, kmax, task.data["ss"]["di"], tl[:task.identifier], htl)
+                tmin, tmax, s, htl, heuristic_cc, heuristic_slack_calcs, points = _heuristic(tc, wc, tmas, tmax, kmax, task.data["ss"]["di"], task_states, htl)
                 #print("{0:}\tFast\t{1:} {2:} {3:} {4:} = _heuristic(tmax={5:})".format(task.job.name, tmin, tmax, s, points, tmax_arg))
                 slack_calcs += heuristic_slack_calcs
                 ss_points.extend(points)
@@ -221,5 +217,5 @@ def get_slack(task, task_list, tc):
                     t1 = tmas
                 t = tmas
 
-    return {"slack": kmax, "ttma": tmax, "cc": ceil.counter + floor.counter, "theorems": theorems,
+    return {"slack": kmax, "ttma": tmax, "cc": cc_count(ceil, floor) - cc_start, "theorems": theorems,
             "interval_length": task.data["ss"]["di"] - interval, "slack_calcs": slack_calcs, "points": ss_points, "interval": interval}
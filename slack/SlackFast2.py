@@ -1,97 +1,92 @@
-def get_slack(task, task_list, tc):
-    import math
-
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
-
-    @cc_counter
-    def slackcalc(tasks, tc, t, wc):
-        w = 0
-        for task in tasks:
-            tss = task.data["ss"]["Fast2"]
-            task_wcet = task.data["C"]
-            b = tss["b"]
-            if (t <= (b - task.period)) or (b < t):
-                a_t = ceil(t / task.period)
-                tss["a"] = a_t * task_wcet
-                tss["b"] = a_t * task.period
-            w = w + tss["a"]
-        return t - tc - w + wc
-
-    def _loop(di, t1, tasks):
-        t1_tmp = t1
-        w = 0
-
-        for task in reversed(tasks):
-            task_wcet = task.data["C"]
-            tss = task.data["ss"]["Fast2"]
-            if (t1_tmp <= tss["b"] - task.period) or (tss["b"] < t1_tmp):
-                _ceil = ceil(t1_tmp / task.period)
-                ceil_a = _ceil * task_wcet
-                ceil_b = _ceil * task.period
-
-                if ceil_a > tss["a"]:
-                    t1_tmp += ceil_a - tss["a"]
-                    if t1_tmp > di:
-                        break
-
-                tss["a"] = ceil_a
-                tss["b"] = ceil_b
-
-            w = w + tss["a"]
-
-        return w, t1_tmp
-
-    def _heuristic(tc, wc, tmas, tmax, smax, tasks):
-        di = tasks[-1].data["ss"]["di"]
-        
-        tmin = di
-
-        points = []
-
-        for task in tasks[:-1]:
-            tss = task.data["ss"]["Fast2"]
+import math
+from slack.SlackCache import SlackCache
+from utils.profiling import counted_global, cc_count
+
+ceil = counted_global(globals(), "ceil", math.ceil)
+floor = counted_global(globals(), "floor", math.floor)
+
+
+def _slackcalc(task_states, tc, t, wc):
+    w = 0
+    for task, tss in task_states:
+        task_wcet = task.data["C"]
+        b = tss["b"]
+        if (t <= (b - task.period)) or (b < t):
+            a_t = ceil(t / task.period)
+            tss["a"] = a_t * task_wcet
+            tss["b"] = a_t * task.period
+        w = w + tss["a"]
+    return t - tc - w + wc
+
+
+slackcalc = counted_global(globals(), "slackcalc", _slackcalc)
+
+
+def _loop(di, t1, task_states):
+    t1_tmp = t1
+    w = 0
+
+    for task, tss in reversed(task_states):
+        task_wcet = task.data["C"]
+        if (t1_tmp <= tss["b"] - task.period) or (tss["b"] < t1_tmp):
+            _ceil = ceil(t1_tmp / task.period)
+            ceil_a = _ceil * task_wcet
+            ceil_b = _ceil * task.period
+
+            if ceil_a > tss["a"]:
+                t1_tmp += ceil_a - tss["a"]
+                if t1_tmp > di:
+                    break
+
+            tss["a"] = ceil_a
+            tss["b"] = ceil_b
+
+        w = w + tss["a"]
+
+    return w, t1_tmp
+
+
+def _heuristic(tc, wc, tmas, tmax, smax, task_states):
+    di = task_states[-1][0].data["ss"]["di"]
+
+    tmin = di
+
+    points = []
+
+    for task, tss in task_states[:-1]:
+        b = tss["b"]
+
+        task_wcet = task.data["C"]
+
+        if tmas <= (b - task.period):
+            tss["a"] -= task_wcet
+            tss["b"] -= task.period
             b = tss["b"]
 
-            task_wcet = task.data["C"]
+        if b < tmin:
+            tmin = b
 
-            if tmas <= (b - task.period):
-                tss["a"] -= task_wcet
-                tss["b"] -= task.period
-                b = tss["b"]
+        if tmas <= b < di:
+            if tss["c"] != b:
+                slack_tmp = slackcalc(task_states, tc, b, wc)
+                points.append(b)
 
-            if b < tmin:
-                tmin = b
+                if slack_tmp > smax:
+                    smax = slack_tmp
+                    tmax = b
+                else:
+                    if slack_tmp == smax:
+                        if tmax > b:
+                            tmax = b
 
-            if tmas <= b < di:
-                if tss["c"] != b:
-                    slack_tmp = slackcalc(tasks, tc, b, wc)
-                    points.append(b)
+                tss["c"] = b
 
-                    if slack_tmp > smax:
-                        smax = slack_tmp
-                        tmax = b
-                    else:
-                        if slack_tmp == smax:
-                            if tmax > b:
-                                tmax = b
+    return tmin, tmax, smax, points
 
-                    tss["c"] = b
 
-        return tmin, tmax, smax, points
+def get_slack(task, task_list, tc, cache=None):
+    cc_start = cc_count(ceil, floor)
+    calcs_start = cc_count(slackcalc)
 
     # collects the instants at which the slack is calculated
     ss_points = []
@@ -104,11 +99,15 @@ def get_slack(task, task_list, tc):
 
     # if it is the max priority task, the slack is trivial
     if task.identifier == 1:
-        return {"slack": task.data["ss"]["di"] - tc - task.data["R"], "ttma": task.data["ss"]["di"], "cc": ceil.counter,
+        return {"slack": task.data["ss"]["di"] - tc - task.data["R"], "ttma": task.data["ss"]["di"],
+                "cc": cc_count(ceil, floor) - cc_start,
                 "theorems": [], "interval_length": 0, "slack_calcs": 0, "points": [], "interval": 0}
 
-    # sort the task list by period (RM)
-    tl = sorted(task_list, key=lambda x: x.period)
+    # task list sorted by period (RM)
+    if cache is None:
+        cache = SlackCache(task_list)
+    tl = cache.tasks
+    task_states = cache.states("Fast2")[task.identifier]
 
     kmax = task.data["k"]
     tmax = task.data["ss"]["di"]
@@ -121,7 +120,8 @@ def get_slack(task, task_list, tc):
 
     # corollary 5 (theorem 13) for RM
     if htask.data["ss"]["di"] + htask_wcet >= task.data["ss"]["di"] >= htask.data["ss"]["ttma"]:
-        return {"slack": htask.data["ss"]["slack"] - task_wcet, "ttma": htask.data["ss"]["ttma"], "cc": ceil.counter,
+        return {"slack": htask.data["ss"]["slack"] - task_wcet, "ttma": htask.data["ss"]["ttma"],
+                "cc": cc_count(ceil, floor) - cc_start,
                 "theorems": [5], "interval_length": 0, "slack_calcs": 0, "points": [], "interval": 0}
 
     # theorem 10
@@ -129,7 +129,7 @@ def get_slack(task, task_list, tc):
 
     # workload at tc
     wc = 0
-    for task in tl[:task.identifier]:
+    for task in cache.hp[task.identifier]:
         a = floor(tc / task.deadline)
         wc += (a * task.data["C"])
         if task.job and task.job.computation_time > 0:
@@ -147,7 +147,7 @@ def get_slack(task, task_list, tc):
         theorems.append(12)
 
     # calculate slack in deadline
-    s = slackcalc(tl[:task.identifier], tc, task.data["ss"]["di"], wc)
+    s = slackcalc(task_states, tc, task.data["ss"]["di"], wc)
     ss_points.append(task.data["ss"]["di"])
 
     if s >= kmax:
@@ -164,15 +164,15 @@ def get_slack(task, task_list, tc):
     t1 = t = interval
 
     # higher priority tasks
-    for htask in tl[:task.identifier - 1]:
+    for htask in cache.hp[task.identifier - 1]:
         htask.data["ss"]["Fast2"]["c"] = 0
 
     # epsilon
-    e = 5 * 0.0000001
+    e = cache.epsilon
 
     # iterative section
     while t < task.data["ss"]["di"]:
-        w, t1 = _loop(task.data["ss"]["di"], t1, tl[:task.identifier])
+        w, t1 = _loop(task.data["ss"]["di"], t1, task_states)
 
         if t1 > task.data["ss"]["di"]:
             break
@@ -190,7 +190,7 @@ def get_slack(task, task_list, tc):
                     tmax = tmas
 
                 tmax_arg = tmax
-                tmin, tmax, s, points = _heuristic(tc, wc, tmas, tmax, kmax, tl[:task.identifier])
+                tmin, tmax, s, points = _heuristic(tc, wc, tmas, tmax, kmax, task_states)
                 #print("{0:}\tFast2\t{1:} {2:} {3:} {4:} = _heuristic(tc, wc, tmas, tmax={5:}, kmax, tasks)".format(task.job.name, tmin, tmax, s, points, tmax_arg))
                 ss_points.extend(points)
 
@@ -210,6 +210,6 @@ def get_slack(task, task_list, tc):
                     t1 = tmas
                 t = tmas
 
-    return {"slack": kmax, "ttma": tmax, "cc": ceil.counter + floor.counter, "theorems": theorems,
+    return {"slack": kmax, "ttma": tmax, "cc": cc_count(ceil, floor) - cc_start, "theorems": theorems,
             "interval_length": task.data["ss"]["di"] - interval, "interval": interval, 
-            "slack_calcs": slackcalc.counter, "points": ss_points}
+            "slack_calcs": cc_count(slackcalc) - calcs_start, "points": ss_points}
@@ -1,33 +1,22 @@
 import math
+from slack.SlackCache import SlackCache
+from utils.profiling import counted_global, cc_count
 
-def get_slack(task, task_list, tc):
+ceil = counted_global(globals(), "ceil", math.ceil)
+floor = counted_global(globals(), "floor", math.floor)
 
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
 
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
+def slackcalc(task_states, tc, t, wc):
+    w = 0
+    for task, tss in task_states:
+        a_t = ceil(t / task.period)
+        tss["a"] = a_t * task.wcet
+        w = w + tss["a"]
+    return t - tc - w + wc, w
 
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
 
-    def slackcalc(task_list, tc, t, wc):
-        w = 0
-        for task in task_list:
-            a_t = ceil(t / task.period)
-            task.data["ss"]["Fixed"]["a"] = a_t * task.wcet
-            w = w + task.data["ss"]["Fixed"]["a"]
-        return t - tc - w + wc, w
-
-    ceil.counter = 0
-    floor.counter = 0
+def get_slack(task, task_list, tc, cache=None):
+    cc_start = cc_count(ceil, floor)
 
     slack_calcs = 0
     points = []
@@ -38,11 +27,14 @@ def get_slack(task, task_list, tc):
     # if it is the max priority task, the slack is trivial
     if task.identifier == 1:
         return {"slack": task.data["ss"]["di"] - tc - task.wcet,
-                "ttma": task.data["ss"]["di"], "cc": ceil.counter, "interval_length": 0,
+                "ttma": task.data["ss"]["di"], "cc": cc_count(ceil, floor) - cc_start, "interval_length": 0,
                 "slack_calcs": slack_calcs, "interval": 0, "points": []}
 
-    # sort the task list by period (RM)
-    tl = sorted(task_list, key=lambda x: x.period)
+    # task list sorted by period (RM)
+    if cache is None:
+        cache = SlackCache(task_list)
+    tl = cache.tasks
+    task_states = cache.states("Fixed")[task.identifier]
 
     kmax = 0
     tmax = task.data["ss"]["di"]
@@ -53,7 +45,8 @@ def get_slack(task, task_list, tc):
     # corollary 2
     if (htask.data["ss"]["di"] + htask.wcet >= task.data["ss"]["di"]) and (task.data["ss"]["di"] >= htask.data["ss"]["ttma"]):
         return {"slack": htask.data["ss"]["slack"] - task.wcet, "ttma": htask.data["ss"]["ttma"],
-                "cc": ceil.counter, "interval_length": 0, "slack_calcs": slack_calcs, "interval": 0, "points": []}
+                "cc": cc_count(ceil, floor) - cc_start, "interval_length": 0, "slack_calcs": slack_calcs, "interval": 0,
+                "points": []}
 
     # theorem 3
     intervalo = xi + (task.deadline - task.data["R"]) + task.wcet
@@ -66,12 +59,12 @@ def get_slack(task, task_list, tc):
 
     # workload at t
     wc = 0
-    for task in tl[:task.identifier]:
+    for task in cache.hp[task.identifier]:
         a = floor(tc / task.deadline)
         wc += (a * task.wcet) + (task.job.actual_computation_time if task.job else 0)
 
     # calculate slack in deadline
-    k2, w = slackcalc(tl[:task.identifier], tc, task.data["ss"]["di"], wc)
+    k2, w = slackcalc(task_states, tc, task.data["ss"]["di"], wc)
     slack_calcs += 1
     points = [task.data["ss"]["di"]]
 
@@ -87,11 +80,11 @@ def get_slack(task, task_list, tc):
     slack_points = [(task.data["ss"]["di"], k2, w)]
 
     # calculate slack at arrival time of higher priority tasks
-    for htask in tl[:(task.identifier - 1)]:
+    for htask in cache.hp[task.identifier - 1]:
         ii = ceil(intervalo / htask.period) * htask.period
 
         while ii < task.data["ss"]["di"]:
-            k2, w = slackcalc(tl[:task.identifier], tc, ii, wc)
+            k2, w = slackcalc(task_states, tc, ii, wc)
             slack_calcs += 1
             points.append(ii)
             slack_points.append((ii, k2, w))
@@ -108,5 +101,5 @@ def get_slack(task, task_list, tc):
             # next arrival
             ii += htask.period
 
-    return {"slack": kmax, "ttma": tmax, "cc": ceil.counter + floor.counter,
+    return {"slack": kmax, "ttma": tmax, "cc": cc_count(ceil, floor) - cc_start,
             "interval_length": task.data["ss"]["di"] - intervalo, "slack_calcs": slack_calcs, "interval": intervalo, "points": []}
@@ -1,35 +1,25 @@
-def get_slack(task, task_list, tc):
-    import math
-
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
-
-    def slackcalc(task_list, tc, t, wc):
-        w = 0
-        for task in task_list:
-            b = task.data["ss"]["Fixed15"]["b"]
-            if (t > b) or (t <= (b - task.period)):
-                a_t = ceil(t / task.period)
-                task.data["ss"]["Fixed15"]["a"] = a_t * task.wcet
-                task.data["ss"]["Fixed15"]["b"] = a_t * task.period
-            w = w + task.data["ss"]["Fixed15"]["a"]
-        return t - tc - w + wc, w
-
-    ceil.counter = 0
-    floor.counter = 0
+import math
+from slack.SlackCache import SlackCache
+from utils.profiling import counted_global, cc_count
+
+ceil = counted_global(globals(), "ceil", math.ceil)
+floor = counted_global(globals(), "floor", math.floor)
+
+
+def slackcalc(task_states, tc, t, wc):
+    w = 0
+    for task, tss in task_states:
+        b = tss["b"]
+        if (t > b) or (t <= (b - task.period)):
+            a_t = ceil(t / task.period)
+            tss["a"] = a_t * task.wcet
+            tss["b"] = a_t * task.period
+        w = w + tss["a"]
+    return t - tc - w + wc, w
+
+
+def get_slack(task, task_list, tc, cache=None):
+    cc_start = cc_count(ceil, floor)
 
     slack_calcs = 0
 
@@ -38,10 +28,14 @@ def get_slack(task, task_list, tc):
 
     # if it is the max priority task, the slack is trivial
     if task.identifier == 1:
-        return {"slack": task.data["ss"]["di"] - tc - task.data["R"], "ttma": task.data["ss"]["di"], "cc": ceil.counter}
+        return {"slack": task.data["ss"]["di"] - tc - task.data["R"], "ttma": task.data["ss"]["di"],
+                "cc": cc_count(ceil, floor) - cc_start}
 
-    # sort the task list by period (RM)
-    tl = sorted(task_list, key=lambda x: x.period)
+    # task list sorted by period (RM)
+    if cache is None:
+        cache = SlackCache(task_list)
+    tl = cache.tasks
+    task_states = cache.states("Fixed15")[task.identifier]
 
     kmax = task.data["k"]
     tmax = task.data["ss"]["di"]
@@ -51,7 +45,8 @@ def get_slack(task, task_list, tc):
 
     # corollary 2
     if (htask.data["ss"]["di"] + htask.wcet >= task.data["ss"]["di"]) and (task.data["ss"]["di"] >= htask.data["ss"]["ttma"]):
-        return {"slack": htask.data["ss"]["slack"] - task.wcet, "ttma": htask.data["ss"]["ttma"], "cc": ceil.counter}
+        return {"slack": htask.data["ss"]["slack"] - task.wcet, "ttma": htask.data["ss"]["ttma"],
+                "cc": cc_count(ceil, floor) - cc_start}
 
     # theorem 3
     intervalo = xi + (task.deadline - task.data["R"]) + task.wcet
@@ -64,7 +59,7 @@ def get_slack(task, task_list, tc):
 
     # workload at t
     wc = 0
-    for task in tl[:task.identifier]:
+    for task in cache.hp[task.identifier]:
         a = floor(tc / task.deadline)
         wc += (a * task.wcet) + (task.job.actual_computation_time if task.job else 0)
 
@@ -73,7 +68,7 @@ def get_slack(task, task_list, tc):
         intervalo = task.data["ss"]["di"] - htask.period + htask.wcet
 
     # calculate slack in deadline
-    k2, w = slackcalc(tl[:task.identifier], tc, task.data["ss"]["di"], wc)
+    k2, w = slackcalc(task_states, tc, task.data["ss"]["di"], wc)
     slack_calcs += 1
     points = [task.data["ss"]["di"]]
 
@@ -89,13 +84,13 @@ def get_slack(task, task_list, tc):
     slack_points = [(task.data["ss"]["di"], k2, w)]
 
     # calculate slack at arrival time of higher priority tasks
-    for htask in tl[:(task.identifier - 1)]:
+    for htask in cache.hp[task.identifier - 1]:
         ii = ceil(intervalo / htask.period) * htask.period
 
         htask_slack_points = []
 
         while ii < task.data["ss"]["di"]:
-            k2, w = slackcalc(tl[:task.identifier], tc, ii, wc)
+            k2, w = slackcalc(task_states, tc, ii, wc)
             slack_calcs += 1
 
             points.append(ii)
@@ -114,4 +109,4 @@ def get_slack(task, task_list, tc):
             # next arrival
             ii += htask.period
 
-    return {"slack": kmax, "ttma": tmax, "cc": ceil.counter + floor.counter}
+    return {"slack": kmax, "ttma": tmax, "cc": cc_count(ceil, floor) - cc_start}
@@ -1,37 +1,29 @@
 import math
+from slack.SlackCache import SlackCache
+from utils.profiling import counted_global, cc_count
 
-def get_slack(task, task_list, tc):
-
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
-
-    @cc_counter
-    def slackcalc(task_list, tc, t, wc):
-        w = 0
-        for task in task_list:
-            b = task.data["ss"]["Fixed2"]["b"]
-            if (t > b) or (t <= (b - task.period)):
-                a_t = ceil(t / task.period)
-                task.data["ss"]["Fixed2"]["a"] = a_t * task.data["C"]
-                task.data["ss"]["Fixed2"]["b"] = a_t * task.period
-            w = w + task.data["ss"]["Fixed2"]["a"]
-        return t - tc - w + wc, w
-
-    ceil.counter = 0
-    floor.counter = 0
+ceil = counted_global(globals(), "ceil", math.ceil)
+floor = counted_global(globals(), "floor", math.floor)
+
+
+def _slackcalc(task_states, tc, t, wc):
+    w = 0
+    for task, tss in task_states:
+        b = tss["b"]
+        if (t > b) or (t <= (b - task.period)):
+            a_t = ceil(t / task.period)
+            tss["a"] = a_t * task.data["C"]
+            tss["b"] = a_t * task.period
+        w = w + tss["a"]
+    return t - tc - w + wc, w
+
+
+slackcalc = counted_global(globals(), "slackcalc", _slackcalc)
+
+
+def get_slack(task, task_list, tc, cache=None):
+    cc_start = cc_count(ceil, floor)
+    calcs_start = cc_count(slackcalc)
 
     # theorems and corollaries applied
     theorems = []
@@ -41,11 +33,15 @@ def get_slack(task, task_list, tc):
 
     # if it is the max priority task, the slack is trivial
     if task.identifier == 1:
-        return {"slack": task.data["ss"]["di"] - tc - task.data["R"], "ttma": task.data["ss"]["di"], "cc": ceil.counter,
-                "theorems": theorems, "interval_length": 0, "slack_calcs": slackcalc.counter}
+        return {"slack": task.data["ss"]["di"] - tc - task.data["R"], "ttma": task.data["ss"]["di"],
+                "cc": cc_count(ceil, floor) - cc_start,
+                "theorems": theorems, "interval_length": 0, "slack_calcs": cc_count(slackcalc) - calcs_start}
 
-    # sort the task list by period (RM)
-    tl = sorted(task_list, key=lambda x: x.period)
+    # task list sorted by period (RM)
+    if cache is None:
+        cache = SlackCache(task_list)
+    tl = cache.tasks
+    task_states = cache.states("Fixed2")[task.identifier]
 
     kmax = 0
     tmax = task.data["ss"]["di"]
@@ -56,8 +52,9 @@ def get_slack(task, task_list, tc):
     # corollary 2 (theorem 5)
     if (htask.data["ss"]["di"] + htask.data["C"] >= task.data["ss"]["di"]) and (task.data["ss"]["di"] >= htask.data["ss"]["ttma"]):
         theorems.append(5)
-        return {"slack": htask.data["ss"]["slack"] - task.data["C"], "ttma": htask.data["ss"]["ttma"], "cc": ceil.counter,
-                "theorems": theorems, "interval_length": 0, "slack_calcs": slackcalc.counter}
+        return {"slack": htask.data["ss"]["slack"] - task.data["C"], "ttma": htask.data["ss"]["ttma"],
+                "cc": cc_count(ceil, floor) - cc_start,
+                "theorems": theorems, "interval_length": 0, "slack_calcs": cc_count(slackcalc) - calcs_start}
 
     # theorem 3
     intervalo = xi + (task.deadline - task.data["R"]) + task.data["C"]
@@ -71,14 +68,14 @@ def get_slack(task, task_list, tc):
 
     # workload at t
     wc = 0
-    for task in tl[:task.identifier]:
+    for task in cache.hp[task.identifier]:
         a = floor(tc / task.deadline)
         wc += (a * task.data["C"])
         if task.job and task.job.computation_time > 0:
             wc += task.data["C"]
 
     # calculate slack in deadline
-    k2, w = slackcalc(tl[:task.identifier], tc, task.data["ss"]["di"], wc)
+    k2, w = slackcalc(task_states, tc, task.data["ss"]["di"], wc)
 
     # update kmax and tmax if the slack at the deadline is bigger
     if k2 >= kmax:
@@ -90,11 +87,11 @@ def get_slack(task, task_list, tc):
         kmax = k2
 
     # calculate slack at arrival time of higher priority tasks
-    for htask in tl[:(task.identifier - 1)]:
+    for htask in cache.hp[task.identifier - 1]:
         ii = ceil(intervalo / htask.period) * htask.period
 
         while ii < task.data["ss"]["di"]:
-            k2, w = slackcalc(tl[:task.identifier], tc, ii, wc)
+            k2, w = slackcalc(task_states, tc, ii, wc)
 
             # update kmax and tmax if a greater slack value was found
             if k2 > kmax:
@@ -108,5 +105,5 @@ def get_slack(task, task_list, tc):
             # next arrival
             ii += htask.period
 
-    return {"slack": kmax, "ttma": tmax, "cc": ceil.counter + floor.counter, "theorems": theorems,
-            "interval_length": task.data["ss"]["di"] - intervalo, "slack_calcs": slackcalc.counter}
+    return {"slack": kmax, "ttma": tmax, "cc": cc_count(ceil, floor) - cc_start, "theorems": theorems,
+            "interval_length": task.data["ss"]["di"] - intervalo, "slack_calcs": cc_count(slackcalc) - calcs_start}
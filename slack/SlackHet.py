@@ -1,72 +1,64 @@
-def get_slack(task, task_list, tc):
-    import math
-
-    def cc_counter(fn):
-        def wrapper(*args, **kwargs):
-            wrapper.counter += 1
-            return fn(*args, **kwargs)
-        wrapper.counter = 0
-        wrapper.__name__ = fn.__name__
-        return wrapper
-
-    @cc_counter
-    def ceil(v):
-        return math.ceil(v)
-
-    @cc_counter
-    def floor(v):
-        return math.floor(v)
-
-    def slackcalc(task_list, tc, t, wc):
-        w = 0
-        for task in task_list:
-            b = task.data["ss"]["SlackHet"]["b"]
-            if (t > b) or (t <= (b - task.period)):
-                a_t = ceil(t / task.period)
-                task.data["ss"]["SlackHet"]["a"] = a_t * task.wcet
-                task.data["ss"]["SlackHet"]["b"] = a_t * task.period
-            w = w + task.data["ss"]["SlackHet"]["a"]
-        return t - tc - w + wc
-
-    def _het_search(task_list, i, ii, params):
-        method_name = "SlackHet"
-
-        if i < 0:
-            params["points"].append(ii)
-            params["intervalo"] = ii  # update intervalo with the last calculated point
-            return
-
-        b = ii
-        b_c = 0
-
-        if task_list[i].data["ss"][method_name]["blimit"] <= ii:
-            if task_list[i].data["ss"][method_name]["blimit"] < ii - task_list[i].period:
-                b = floor(ii / task_list[i].period) * task_list[i].period
-            else:
-                b = task_list[i].data["ss"][method_name]["blimit"]
-
-            if b == ii:
-                b_c = task_list[i].wcet
-
-            task_list[i].data["ss"][method_name]["blimit"] = b + task_list[i].period
-
-            if b < params["intervalo"] or b <= params["last_psi"]:
-                if params["intervalo"] < b <= params["last_psi"]:
-                    params["last_psi"] += task_list[i].wcet
-                b = ii  # cut the b branch
-
-        _het_search(task_list, i - 1, b, params)
-        if b + task_list[i].wcet < ii:  # if b == ii, this is always false
-            _het_search(task_list, i - 1, ii, params)
-            params["last_psi"] = ii + task_list[i + 1].wcet
+import math
+from slack.SlackCache import SlackCache
+from utils.profiling import counted_global, cc_count
+
+ceil = counted_global(globals(), "ceil", math.ceil)
+floor = counted_global(globals(), "floor", math.floor)
+
+
+def slackcalc(task_states, tc, t, wc):
+    w = 0
+    for task, tss in task_states:
+        b = tss["b"]
+        if (t > b) or (t <= (b - task.period)):
+            a_t = ceil(t / task.period)
+            tss["a"] = a_t * task.wcet
+            tss["b"] = a_t * task.period
+        w = w + tss["a"]
+    return t - tc - w + wc
+
+
+def _het_search(task_list, i, ii, params):
+    method_name = "SlackHet"
+
+    if i < 0:
+        params["points"].append(ii)
+        params["intervalo"] = ii  # update intervalo with the last calculated point
+        return
+
+    b = ii
+    b_c = 0
+
+    if task_list[i].data["ss"][method_name]["blimit"] <= ii:
+        if task_list[i].data["ss"][method_name]["blimit"] < ii - task_list[i].period:
+            b = floor(ii / task_list[i].period) * task_list[i].period
         else:
-            params["last_psi"] = b + task_list[i + 1].wcet + b_c
-            if b < ii:
+            b = task_list[i].data["ss"][method_name]["blimit"]
+
+        if b == ii:
+            b_c = task_list[i].wcet
+
+        task_list[i].data["ss"][method_name]["blimit"] = b + task_list[i].period
+
+        if b < params["intervalo"] or b <= params["last_psi"]:
+            if params["intervalo"] < b <= params["last_psi"]:
                 params["last_psi"] += task_list[i].wcet
+            b = ii  # cut the b branch
+
+    _het_search(task_list, i - 1, b, params)
+    if b + task_list[i].wcet < ii:  # if b == ii, this is always false
+        _het_search(task_list, i - 1, ii, params)
+        params["last_psi"] = ii + task_list[i + 1].wcet
+    else:
+        params["last_psi"] = b + task_list[i + 1].wcet + b_c
+        if b < ii:
+            params["last_psi"] += task_list[i].wcet
+
+
+def get_slack(task, task_list, tc, cache=None):
+    cc_start = cc_count(ceil, floor)
 
     method_name = "SlackHet"
-    ceil.counter = 0
-    floor.counter = 0
     theorems = []
 
     xi = ceil(tc / task.period) * task.period
@@ -75,13 +67,16 @@ def get_slack(task, task_list, tc):
     # if it is the max priority task, the slack is trivial
     if task.identifier == 1:
         return {"slack": task.data["ss"]["di"] - tc - task.data["R"],
-                "ttma": task.data["ss"]["di"], "cc": ceil.counter, "theorems": []}
+                "ttma": task.data["ss"]["di"], "cc": cc_count(ceil, floor) - cc_start, "theorems": []}
 
     max_s = 0
     max_t = task.data["ss"]["di"]
 
-    # sort the task list by period (RM)
-    tl = sorted(task_list, key=lambda x: x.period)
+    # task list sorted by period (RM)
+    if cache is None:
+        cache = SlackCache(task_list)
+    tl = cache.tasks
+    task_states = cache.states(method_name)[task.identifier]
 
     # immediate higher priority task
     ptask = tl[task.identifier - 2]
@@ -90,7 +85,7 @@ def get_slack(task, task_list, tc):
     if (ptask.data["ss"]["di"] + ptask.wcet >= task.data["ss"]["di"]) and \
             (task.data["ss"]["di"] >= ptask.data["ss"]["ttma"]):
         return {"slack": ptask.data["ss"]["slack"] - task.wcet,
-                "ttma": ptask.data["ss"]["ttma"], "cc": ceil.counter,
+                "ttma": ptask.data["ss"]["ttma"], "cc": cc_count(ceil, floor) - cc_start,
                 "theorems": [2]}
 
     # theorem 3
@@ -105,7 +100,7 @@ def get_slack(task, task_list, tc):
 
     # workload at tc
     wc = 0
-    for task in tl[:task.identifier]:
+    for task in cache.hp[task.identifier]:
         a = floor(tc / task.deadline)
         wc += (a * task.wcet) + (task.job.actual_computation_time if task.job else 0)
 
@@ -129,7 +124,7 @@ def get_slack(task, task_list, tc):
 
     # calculate slack in each point
     for point in params["points"]:
-        s = slackcalc(tl[:task.identifier], tc, point, wc)
+        s = slackcalc(task_states, tc, point, wc)
 
         # update max_s and max_t
         if s > max_s:
@@ -143,4 +138,4 @@ def get_slack(task, task_list, tc):
         print(" --- Job {} , tc {},  --- ".format(task.job.name if task.job else "?", tc))
         print("dups:", dups)
 
-    return {"slack": max_s, "ttma": max_t, "cc": ceil.counter + floor.counter, "theorems": theorems}
+    return {"slack": max_s, "ttma": max_t, "cc": cc_count(ceil, floor) - cc_start, "theorems": theorems}
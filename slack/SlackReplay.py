@@ -0,0 +1,150 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from slack.SlackCache import SlackCache
+from slack.SlackTime import EPSILON
+
+# values recorded for each task: slack, ttma, di, job computation time and job actual computation time
+_TASK_FIELDS = 5
+_NO_JOB = -1.0
+
+
+class SlackLog:
+    """
+    Compact log of the slack calculations of a simulation. Each record holds the time, the task, the slack state of
+    every task before the calculation and the result of the reference method, so the calculations can be replayed
+    later with other slack methods.
+    """
+    def __init__(self):
+        self.tasks = []
+        self.records = array('d')
+        self.count = 0
+        self.epsilon = EPSILON
+        self.unit = 1
+
+    def bind(self, task_list, epsilon=EPSILON, unit=1):
+        """
+        Keep the static parameters of the tasks (sorted by period, as in SlackCache).
+        :param task_list: simso tasks
+        :param epsilon: fixed point step of the time base
+        :param unit: time unit of the task parameters in the time base
+        """
+        self._tasks = task_list
+        self.epsilon = epsilon
+        self.unit = unit
+        self.tasks = [{"identifier": task.identifier, "name": task.name, "period": task.period, "wcet": task.wcet,
+                       "deadline": task.deadline,
+                       "data": {key: value for key, value in task.data.items() if key not in ("ss", "dvs")}}
+                      for task in task_list]
+
+    def record(self, tc, task):
+        """ Record the inputs of a slack calculation """
+        records = self.records
+        records.append(tc)
+        records.append(task.identifier)
+        for t in self._tasks:
+            ss = t.data["ss"]
+            job = t.job
+            records.extend((ss["slack"], ss["ttma"], ss["di"], job.computation_time if job else _NO_JOB,
+                            job.actual_computation_time if job else _NO_JOB))
+
+    def result(self, slack, ttma):
+        """ Record the result of the reference method for the last calculation """
+        self.records.append(slack)
+        self.records.append(ttma)
+        self.count += 1
+
+    def __len__(self):
+        return self.count
+
+    def __getstate__(self):
+        # the simso tasks stay in the simulation process
+        return {"tasks": self.tasks, "records": self.records, "count": self.count, "epsilon": self.epsilon,
+                "unit": self.unit}
+
+
+class _ReplayJob:
+    __slots__ = ("name", "computation_time", "actual_computation_time")
+
+
+class _ReplayTask:
+    """
+    Stand-in for a simso task, with the attributes read by the slack methods.
+    """
+    def __init__(self, params, method):
+        self.identifier = params["identifier"]
+        self.name = params["name"]
+        self.period = params["period"]
+        self.wcet = params["wcet"]
+        self.deadline = params["deadline"]
+        self.data = dict(params["data"])
+        self.data["ss"] = {"slack": 0, "ttma": 0, "di": 0,
+                           method: {'a': self.data["C"], 'b': self.data["T"], 'c': 0}}
+        self.job = None
+        self._job = _ReplayJob()
+        self._job.name = self.name
+
+    def set_state(self, slack, ttma, di, computation_time, actual_computation_time):
+        ss = self.data["ss"]
+        ss["slack"], ss["ttma"], ss["di"] = slack, ttma, di
+        if computation_time == _NO_JOB:
+            self.job = None
+        else:
+            self.job = self._job
+            self._job.computation_time = computation_time
+            self._job.actual_computation_time = actual_computation_time
+
+
+def replay_slack_log(log: SlackLog, method: str):
+    """
+    Replay a slack log with a slack method.
+    :param log: slack log
+    :param method: slack method name
+    :return: None if the method agrees with the reference on every calculation, otherwise a dict with the record
+    number, time, task name and the results of both methods of the first divergence
+    """
+    from slack.SlackUtils import get_slack_methods
+
+    get_slack = get_slack_methods()[method]
+    tasks = [_ReplayTask(params, method) for params in log.tasks]
+    by_id = {task.identifier: task for task in tasks}
+    # the tasks of the log are already in the time base of the simulation
+    cache = SlackCache(tasks)
+    cache.epsilon, cache.unit = log.epsilon, log.unit
+
+    width = 2 + _TASK_FIELDS * len(tasks) + 2
+    records = log.records
+
+    for n in range(log.count):
+        start = n * width
+        tc, task_id = records[start], int(records[start + 1])
+        pos = start + 2
+        for task in tasks:
+            task.set_state(*records[pos:pos + _TASK_FIELDS])
+            pos += _TASK_FIELDS
+        ref_slack, ref_ttma = records[pos], records[pos + 1]
+
+        task = by_id[task_id]
+        result = get_slack(task, tasks, tc, cache)
+
+        # same criteria as multiple_slack_calc
+        if result["slack"] < 0 or result["slack"] != ref_slack or (result["ttma"] > 0 and result["ttma"] != ref_ttma):
+            return {"record": n, "tc": tc, "task": task.name, "method": method,
+                    "result": (result["slack"], result["ttma"]), "reference": (ref_slack, ref_ttma)}
+
+    return None
+
+
+def verify_slack_log(log: SlackLog, methods: list, jobs=1):
+    """
+    Replay a slack log with several slack methods, each one in its own worker process if jobs > 1.
+    :param log: slack log
+    :param methods: slack method names
+    :param jobs: number of worker processes
+    :return: list of divergences (see replay_slack_log), one for each method that does not agree with the reference
+    """
+    if jobs > 1 and len(methods) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(methods))) as executor:
+            results = list(executor.map(replay_slack_log, [log] * len(methods), methods))
+    else:
+        results = [replay_slack_log(log, method) for method in methods]
+    return [result for result in results if result is not None]
@@ -0,0 +1,98 @@
+"""
+Time base of the slack stealing state of a simso simulation.
+
+By default the slack, ttma and di values and the task parameters used by the slack methods are ms floats. As the
+simulation clock counts processor cycles, the conversions drift, so slack values close to zero are rounded to zero
+(TOLERANCE) and the Fast methods step over a fixed point with a small EPSILON.
+
+In integer mode every time is an integer number of processor cycles, the unit of the simulation clock, so the
+arithmetic is exact: no rounding is needed and the fixed point step is one cycle.
+"""
+
+# slack values within TOLERANCE ms of zero are zero (ms mode only)
+TOLERANCE = 1e-5
+
+# step over a fixed point of the Fast methods, in ms
+EPSILON = 5 * 0.0000001
+
+# task parameters that are times
+_TIME_FIELDS = ("C", "T", "D", "R", "k")
+
+
+def to_cycles(value, cycles_per_ms) -> int:
+    """ Time in ms to the nearest number of cycles """
+    return int(round(value * cycles_per_ms))
+
+
+class SlackClock:
+    """
+    Current time and elapsed times of a simso scheduler, in ms or in cycles.
+    """
+    def __init__(self, sim, integer=False):
+        """
+        :param sim: simso Model
+        :param integer: use integer times in cycles
+        """
+        self.integer = integer
+        self.cycles_per_ms = sim.cycles_per_ms
+        self._sim = sim
+
+    def now(self):
+        """ Current simulation time """
+        return self._sim.now() if self.integer else self._sim.now() / self.cycles_per_ms
+
+    def since(self, date):
+        """ Time elapsed since a simulation date (in cycles, as sim.now()) """
+        elapsed = self._sim.now() - date
+        return elapsed if self.integer else elapsed / self.cycles_per_ms
+
+    def from_ms(self, value):
+        """ Time in ms in this time base """
+        return to_cycles(value, self.cycles_per_ms) if self.integer else value
+
+    def ms(self, value):
+        """ Time in this time base in ms """
+        return value / self.cycles_per_ms if self.integer else value
+
+
+class _CycleJob:
+    """
+    Job view with its computation times in cycles.
+    """
+    __slots__ = ("job",)
+
+    def __init__(self, job):
+        self.job = job
+
+    @property
+    def name(self):
+        return self.job.name
+
+    @property
+    def computation_time(self):
+        return self.job.computation_time_cycles
+
+    @property
+    def actual_computation_time(self):
+        return int(round(self.job.actual_computation_time_cycles))
+
+
+class CycleTask:
+    """
+    View of a simso task with the attributes read by the slack methods in cycles. The slack stealing state
+    (data["ss"]) is shared with the task, so it must be initialized in cycles too.
+    """
+    def __init__(self, task, cycles_per_ms):
+        self.task = task
+        self.identifier = task.identifier
+        self.name = task.name
+        self.period = to_cycles(task.period, cycles_per_ms)
+        self.wcet = to_cycles(task.wcet, cycles_per_ms)
+        self.deadline = to_cycles(task.deadline, cycles_per_ms)
+        self.data = {key: to_cycles(value, cycles_per_ms) if key in _TIME_FIELDS else value
+                     for key, value in task.data.items()}
+
+    @property
+    def job(self):
+        job = self.task.job
+        return _CycleJob(job) if job is not None else None
@@ -1,4 +1,6 @@
 from slack.SlackExceptions import NegativeSlackException, DifferentSlackException
+from slack.SlackTime import TOLERANCE
+from utils.results import job_number
 from slack import SlackFixed, SlackFixed15, SlackDavis, SlackFixed2, SlackFixed3, SlackHet, SlackFast, SlackFast2
 
 
@@ -14,19 +16,21 @@ def get_slack_methods():
     return slack_methods
 
 
-def reduce_slacks(tasks, amount, t):
-    from math import isclose, fabs
+def reduce_slacks(tasks, amount, t, exact=False):
+    """
+    Decrement the slack of the tasks.
+    :param exact: integer times, no rounding to zero of the slacks close to zero
+    """
     for task in tasks:
-        task.data["ss"]["slack"] -= amount
-        if isclose(task.data["ss"]["slack"], 0, abs_tol=1e-5):
-            task.data["ss"]["slack"] = 0
-        #if (fabs(task.data["ss"]["slack"] < 0.00005)):
-        #    task.data["ss"]["slack"] = 0
-        if task.data["ss"]["slack"] < 0:
-            raise NegativeSlackException(t, task, "Scheduler")
+        ss = task.data["ss"]
+        ss["slack"] -= amount
+        if not exact and -TOLERANCE <= ss["slack"] <= TOLERANCE:
+            ss["slack"] = 0
+        if ss["slack"] < 0:
+            raise NegativeSlackException(t, task, "Scheduler", task.sim.cycles_per_ms if exact else 1)
 
 
-def get_minimum_slack(tasks):
+def get_minimum_slack(tasks, exact=False):
     # Find the system minimum slack and the time at which it occurs
     from sys import maxsize
     from math import isclose
@@ -37,35 +41,63 @@ def get_minimum_slack(tasks):
 
     for task in tasks:
         slack, ttma = task.data["ss"]["slack"], task.data["ss"]["ttma"]
-        if isclose(slack, _min_slack) or (slack <= _min_slack):
-            if isclose(slack, _min_slack):
-                if _min_slack_t <= ttma:
-                    _min_slack = slack
-                    _min_slack_t = ttma
-                    _min_slack_task = task
-            else:
+        same = slack == _min_slack if exact else isclose(slack, _min_slack)
+        if same:
+            if _min_slack_t <= ttma:
                 _min_slack = slack
                 _min_slack_t = ttma
                 _min_slack_task = task
+        elif slack < _min_slack:
+            _min_slack = slack
+            _min_slack_t = ttma
+            _min_slack_task = task
 
     return (_min_slack, _min_slack_t, _min_slack_task)
 
 
-def multiple_slack_calc(tc, task, tasks, slack_methods: list) -> dict:
+_slack_methods = get_slack_methods()
+
+
+def multiple_slack_calc(tc, task, tasks, slack_methods: list, cache=None) -> dict:
+    if cache is not None and cache.integer:
+        # views of the tasks in cycles
+        task = cache.tasks[task.identifier - 1]
+        tasks = cache.tasks
+
+    log = cache.log if cache is not None else None
+    if log is not None:
+        log.record(tc, task)
+
     # calculate slack with each method in slack_methods
-    slack_results = [(m, get_slack_methods()[m](task, tasks, tc)) for m in slack_methods]
+    slack_results = [(m, _slack_methods[m](task, tasks, tc, cache)) for m in slack_methods]
+
+    # the errors report the times in ms
+    unit = cache.unit if cache is not None else 1
 
     # check for negative slacks
     for method, result in slack_results:
         if result["slack"] < 0:
-            raise NegativeSlackException(tc, method, task.job.name if task.job else task.name)
+            raise NegativeSlackException(tc, task, method, unit)
 
     # verify that all the methods produces the same results
     ss = slack_results[0][1]["slack"]
     ttma = slack_results[0][1]["ttma"]
     for method, result in slack_results:
         if result["slack"] != ss or (result["ttma"] > 0 and result["ttma"] != ttma):
-            raise DifferentSlackException(tc, task.job.name if task.job else task.name, method, slack_results)
+            if unit != 1:
+                slack_results = [(m, dict(r, slack=r["slack"] / unit, ttma=r["ttma"] / unit))
+                                 for m, r in slack_results]
+            raise DifferentSlackException(tc / unit, task.job.name if task.job else task.name, method, slack_results)
+
+    if log is not None:
+        log.result(ss, ttma)
+
+    recorder = cache.recorder if cache is not None else None
+    if recorder is not None:
+        job = job_number(task.job)
+        for method, result in slack_results:
+            recorder.record(tc / unit, task.identifier, job, "C", slack=result["slack"] / unit,
+                            ttma=result["ttma"] / unit, cc=result["cc"], method=method)
 
     # return slack and ttma
     return {"slack": ss, "ttma": ttma, "ss_results": slack_results}
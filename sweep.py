@@ -0,0 +1,311 @@
+#!python
+
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import redirect_stdout
+from copy import deepcopy
+from itertools import product
+from sched import analyze_rts
+from simulation import simulation_worker, json_file
+from utils.files import get_from_file
+from utils.rts import mixrange
+from utils.profiling import set_profiling
+from utils.results import ResultStore, read_events, events_tables
+import pandas as pd
+import hashlib
+import io
+import os
+import sys
+import time
+
+
+def grid_files(args) -> list:
+    """
+    Files of the grid, the {u} and {n} fields of the pattern are replaced by each utilization and task count.
+    :return: list of (file, u, n)
+    """
+    return [(args.pattern.format(u=u, n=n), u, n) for u, n in product(args.utilizations, args.task_counts)]
+
+
+def grid_configs(args) -> list:
+    """
+    Configurations of the grid: the schedulability tests and each scheduler, slack methods and cpu combination.
+    :return: list of configurations
+    """
+    configs = []
+    if args.sched_tests:
+        configs.append({"test": "sched"})
+    for scheduler, methods, cpu in product(args.schedulers, args.ss_methods, args.cpus):
+        configs.append({"test": "sim", "scheduler": scheduler, "ss_methods": methods.split(","), "cpu": cpu})
+    return configs
+
+
+def unit_key(file: str, rts_id, config: dict) -> str:
+    """ Unique key of a work unit """
+    if config["test"] == "sched":
+        return "{}:{}:sched".format(file, rts_id)
+    return "{}:{}:{}:{}:{}".format(file, rts_id, config["scheduler"], ",".join(config["ss_methods"]), config["cpu"])
+
+
+def run_sched_tests(rts: dict) -> dict:
+    """
+    Evaluate the rts with the schedulability tests of sched.py.
+    :param rts: rts
+    :return: number of ceil and floor operations of each method
+    """
+    set_profiling(True)
+    result = {"error": False, "error_msg": "", "cc": {}}
+    output = io.StringIO()
+    try:
+        with redirect_stdout(output):
+            analyze_rts(rts["ptasks"])
+    except SystemExit:
+        result["error"] = True
+        result["error_msg"] = "The schedulability tests do not agree."
+    for line in output.getvalue().splitlines():
+        method, cc = line.split("\t")
+        result["cc"][method] = int(cc)
+    return result
+
+
+def events_file(args, key: str) -> str:
+    """ File of the events recorded by the simulation of a work unit """
+    return os.path.join(args.events_dir, hashlib.sha1(key.encode()).hexdigest()[:16] + ".npz")
+
+
+def run_simulation(rts: dict, config: dict, args, path: str) -> dict:
+    """
+    Simulate the rts with the scheduler, slack methods and cpu of the configuration. The scheduler events and slack
+    calculations are recorded in a file instead of printed.
+    :param rts: rts
+    :param config: configuration
+    :param args: sweep parameters
+    :param path: events file
+    :return: error, error message and events file
+    """
+    sim_args = Namespace(instance_count=args.instance_count, only_schedulable=args.only_schedulable,
+                         integer_time=args.integer_time, scheduler=config["scheduler"],
+                         ss_methods=config["ss_methods"], cpu=json_file(config["cpu"]), gantt=False,
+                         verify_methods=None, jobs=args.jobs, trace="null", trace_size=0, trace_file=None,
+                         results_file=path, engine="simpy", energy=False, profile=False, profile_stacks=None)
+    result = simulation_worker(rts, sim_args)
+    return {"error": result["error"], "error_msg": result["error_msg"], "events": path}
+
+
+def sweep_worker(unit: dict, rts: dict, args) -> dict:
+    """
+    Run a work unit.
+    :param unit: unit record (key, file, u, n, rts id and configuration)
+    :param rts: rts
+    :param args: sweep parameters
+    :return: unit record with its results
+    """
+    config = unit["config"]
+    try:
+        if config["test"] == "sched":
+            result = run_sched_tests(rts)
+        else:
+            result = run_simulation(rts, config, args, events_file(args, unit["key"]))
+    except Exception as exc:
+        result = {"error": True, "error_msg": "{}: {}".format(type(exc).__name__, exc)}
+    return dict(unit, **result)
+
+
+def sweep_units(args, store: ResultStore):
+    """
+    Work units of the grid not found in the store.
+    :return: iterator of (unit, rts)
+    """
+    configs = grid_configs(args)
+    for file, u, n in grid_files(args):
+        with open(file) as f:
+            for rts in get_from_file(f, mixrange(args.rts)):
+                for config in configs:
+                    key = unit_key(file, rts["id"], config)
+                    if key not in store:
+                        yield {"key": key, "file": file, "u": u, "n": n, "rts": rts["id"], "config": config}, rts
+
+
+def run_sweep(args, store: ResultStore) -> int:
+    """
+    Run the pending work units in a pool of args.jobs processes. Each completed unit is saved in the store.
+    :return: number of units run
+    """
+    count = 0
+    start = time.perf_counter()
+
+    if args.schedulers:
+        os.makedirs(args.events_dir, exist_ok=True)
+
+    def save(record):
+        nonlocal count
+        store.append(record)
+        count += 1
+        if args.verbose:
+            print("Completed {}".format(record["key"]), file=sys.stderr)
+        if record["error"]:
+            print("Error: {}, {}".format(record["key"], record["error_msg"]), file=sys.stderr)
+
+    units = sweep_units(args, store)
+
+    if args.jobs == 1:
+        for unit, rts in units:
+            save(sweep_worker(unit, deepcopy(rts), args))
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            pending = set()
+
+            def submit_next():
+                item = next(units, None)
+                if item is not None:
+                    pending.add(executor.submit(sweep_worker, item[0], item[1], args))
+
+            # Keep a bounded window of submitted units, any idle worker takes the next one.
+            for _ in range(args.jobs * 2):
+                submit_next()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    save(future.result())
+                    submit_next()
+
+    elapsed = time.perf_counter() - start
+    print("Completed {0:} units in {1:.3f} s ({2:.2f} units/s)".format(count, elapsed,
+                                                                    count / elapsed if elapsed else 0),
+          file=sys.stderr)
+    return count
+
+
+def awk_number(value) -> str:
+    """ Number printed as awk does """
+    if value is None:
+        return "-"
+    if value == int(value):
+        return str(int(value))
+    return "{:.6g}".format(value)
+
+
+def rta_u_row(records: list) -> str:
+    """
+    Comparison of RTA4 and RTA4u, as rta_u.awk: mean cc of RTA4 and RTA4u, number of rts where RTA4u needs more,
+    equal and less operations, and mean difference when it needs more and less. Undefined means are printed as -.
+    :param records: sched records of a file
+    """
+    rta4 = [record["cc"]["RTA4"] for record in records]
+    rta4u = [record["cc"]["RTA4u"] for record in records]
+    greater = [b - a for a, b in zip(rta4, rta4u) if a < b]
+    lesser = [a - b for a, b in zip(rta4, rta4u) if a > b]
+    equal = len(records) - len(greater) - len(lesser)
+
+    def mean(values):
+        return sum(values) / len(values) if values else None
+
+    return " ".join(awk_number(v) for v in [mean(rta4), mean(rta4u), len(greater), equal, len(lesser),
+                                            mean(greater), mean(lesser)])
+
+
+def sched_table(records: list) -> str:
+    """ Mean cc of each method, as process.py --test sched """
+    rows = [(method, cc) for record in records for method, cc in record["cc"].items()]
+    df = pd.DataFrame(rows, columns=["Method", "CC"])
+    return df.groupby(["Method"]).mean().to_markdown()
+
+
+def sim_table(records: list) -> str:
+    """ Simulated rts and errors of each scheduler, slack methods and cpu """
+    rows = [(record["config"]["scheduler"], ",".join(record["config"]["ss_methods"]), record["config"]["cpu"],
+             int(record["error"])) for record in records]
+    df = pd.DataFrame(rows, columns=["Scheduler", "Methods", "CPU", "Errors"])
+    df["RTS"] = 1
+    return df.groupby(["Scheduler", "Methods", "CPU"])[["RTS", "Errors"]].sum().reset_index().to_markdown(index=False)
+
+
+def sim_events_tables(records: list) -> list:
+    """
+    Tables of process.py --test events of each scheduler, slack methods and cpu, from the events recorded by the
+    simulations without errors.
+    :return: list of (configuration, tables)
+    """
+    configs = {}
+    for record in records:
+        if not record["error"] and record.get("events") and os.path.exists(record["events"]):
+            config = record["config"]
+            configs.setdefault((config["scheduler"], ",".join(config["ss_methods"]), config["cpu"]), []).append(
+                record["events"])
+    return [(config, events_tables(pd.concat([read_events(path) for path in paths], ignore_index=True)))
+            for config, paths in configs.items()]
+
+
+def report(args, store: ResultStore) -> None:
+    """ Print the aggregate tables of each file of the grid """
+    records = store.records()
+    for file, u, n in grid_files(args):
+        file_records = [record for record in records if record["file"] == file]
+        sched = sorted((record for record in file_records if record["config"]["test"] == "sched" and
+                        not record["error"]), key=lambda record: record["rts"])
+        sim = [record for record in file_records if record["config"]["test"] == "sim"]
+        errors = sum(record["error"] for record in file_records if record["config"]["test"] == "sched")
+
+        print("# {} (u={}, n={})".format(file, u, n))
+        if sched:
+            print()
+            print(rta_u_row(sched))
+            print()
+            print(sched_table(sched))
+        if errors:
+            print()
+            print("{} rts where the schedulability tests do not agree.".format(errors))
+        if sim:
+            print()
+            print(sim_table(sim))
+            for (scheduler, methods, cpu), tables in sim_events_tables(sim):
+                print()
+                print("## {} {} {}".format(scheduler, methods, cpu))
+                print()
+                print(tables)
+        print()
+
+
+def get_args():
+    """ Command line arguments """
+    parser = ArgumentParser(description="Run the schedulability tests and simulations over a grid of rts files.")
+    parser.add_argument("pattern", type=str, help="RTS file name, {u} and {n} are replaced by the utilization and task count.")
+    parser.add_argument("--utilizations", nargs='+', type=str, default=[""], help="Utilization levels.")
+    parser.add_argument("--task-counts", nargs='+', type=str, default=[""], help="Task counts.")
+    parser.add_argument("--rts", type=str, help="Which RTS of each file.", default="1")
+    parser.add_argument("--sched-tests", action="store_true", default=False, help="Run the schedulability tests of sched.py.")
+    parser.add_argument("--schedulers", nargs='+', type=str, default=[], help="Scheduling algorithms to simulate.")
+    parser.add_argument("--ss-methods", nargs='+', type=str, default=["Fast"], help="Slack Stealing methods, each a comma separated list.")
+    parser.add_argument("--cpus", nargs='+', type=str, default=["cpu.json"], help="CPU models.")
+    parser.add_argument("--instance-count", type=int, default=5, help="Stop the simulation after the specified number of instances of the lowest priority task.")
+    parser.add_argument("--only-schedulable", action="store_true", default=False, help="Simulate only schedulable systems.")
+    parser.add_argument("--integer-time", default=False, action="store_true", help="Slack Stealing with integer times in cycles.")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of processes.")
+    parser.add_argument("--store", type=str, default="sweep.jsonl", help="Results store, completed units are skipped.")
+    parser.add_argument("--events-dir", type=str, default="sweep_events", help="Directory of the events recorded by each simulation.")
+    parser.add_argument("--verbose", default=False, action="store_true", help="Show progress information on stderr.")
+    args = parser.parse_args()
+    if not args.sched_tests and not args.schedulers:
+        parser.error("nothing to run, use --sched-tests and/or --schedulers")
+    return args
+
+
+def main():
+    args = get_args()
+    store = ResultStore(args.store)
+
+    try:
+        run_sweep(args, store)
+    except KeyboardInterrupt:
+        print("Interrupted, {} units in {}.".format(len(store), args.store), file=sys.stderr)
+        sys.exit(1)
+    finally:
+        store.close()
+
+    report(args, store)
+
+
+if __name__ == '__main__':
+    main()
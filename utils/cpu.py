@@ -9,50 +9,92 @@ DVS CPU model.
 5:	frecuencia rel
 6:	normalizado
 
+Optional keys of the model: idle_power (power in the power down mode), transition_latency (ms) and
+transition_energy of a level change, all 0 by default.
+
+The levels are immutable tuples, sorted from the slowest to the fastest, and the level lookups are binary searches
+over the normalized frequencies, so the model supports fine grained DVFS tables.
 """
+from bisect import bisect_left
+from typing import NamedTuple
+
+
+class CpuLevel(NamedTuple):
+    freq: float
+    volt: float
+    icc: float
+    power: float
+    rel_power: float
+    rel_freq: float
+    norm: float
 
 
 class Cpu:
 
     def __init__(self, cpuinfo):
         self._cpuinfo = cpuinfo
-        self._current_lvl = self.lvls[0]
-
-        for lvl in self.lvls:
-            # Calculate ICC (ampers)
-            lvl.append(self.calc_icc(lvl[1]))
-            # Power
-            lvl.append(lvl[2] * lvl[1])
-            # Relative power
-            lvl.append(lvl[3] / (self.maxv * self.maxicc))
-            # Relative frequency
-            lvl.append(self.lvls[-1][0] / lvl[0])
-            # Normalize lvl into [0 .. 1]
-            lvl.append(lvl[0] / self.lvls[-1][0])
+        raw = sorted((lvl[0], lvl[1]) for lvl in cpuinfo["lvls"])
+        self._minv, self._maxv = raw[0][1], raw[-1][1]
+
+        lvls = []
+        maxf = raw[-1][0]
+        for freq, volt in raw:
+            icc = self.calc_icc(volt)
+            power = icc * volt
+            lvls.append(CpuLevel(freq, volt, icc, power, power / (self.maxv * self.maxicc), maxf / freq, freq / maxf))
+
+        self._lvls = tuple(lvls)
+        self._norms = [lvl.norm for lvl in lvls]
+        self._current_lvl = self._lvls[0]
+        self._energy = 0
 
     def calc_icc(self, v):
         M = (self.maxicc - self.minicc) / (self.maxv - self.minv)
         b = (self.maxv * self.minicc - self.minv * self.maxicc) / (self.maxv - self.minv)
         return M * v + b
 
+    def find_lvl(self, speed):
+        """
+        Slowest level with a normalized frequency of at least speed.
+        :param speed: normalized frequency
+        :return: level position, or None if speed is greater than the maximum
+        """
+        pos = bisect_left(self._norms, speed)
+        return pos if pos < len(self._norms) and self._norms[pos] >= speed else None
+
     def set_lvl(self, new_lvl):
-        for lvl in self.lvls:
-            if lvl[6] >= new_lvl:
-                self._current_lvl = lvl
-                return
+        pos = self.find_lvl(new_lvl)
+        if pos is not None:
+            self._current_lvl = self._lvls[pos]
 
     def get_adjacent_lvls(self, freq):
-        lvl_u = None
-        lvl_d = None
-        for i, lvl in enumerate(self.lvls):
-            if lvl[6] >= freq:
-                lvl_u = lvl
-                lvl_d = self.lvls[i - 1]
-                break
-        return lvl_u, lvl_d
+        pos = self.find_lvl(freq)
+        if pos is None:
+            return None, None
+        return self._lvls[pos], self._lvls[pos - 1]
 
     def get_lvl(self, lvl):
-        return self._cpuinfo["lvls"][lvl]
+        return self._lvls[lvl]
+
+    def power(self, speed):
+        """ Power of the level set for a normalized frequency """
+        pos = self.find_lvl(speed)
+        return self._lvls[pos].power if pos is not None else self._current_lvl.power
+
+    def consume(self, duration):
+        """
+        Accumulate the energy consumed in the current level during an interval.
+        :param duration: interval length
+        :return: energy of the interval
+        """
+        energy = duration * self._current_lvl.power
+        self._energy += energy
+        return energy
+
+    @property
+    def energy(self):
+        """ Energy accumulated by consume() """
+        return self._energy
 
     @property
     def curlvl(self):
@@ -60,7 +102,7 @@ class Cpu:
 
     @property
     def numlvls(self):
-        return len(self._cpuinfo["lvls"])
+        return len(self._lvls)
 
     @property
     def maxicc(self):
@@ -72,17 +114,24 @@ class Cpu:
 
     @property
     def minv(self):
-        return self._cpuinfo["lvls"][0][1]
+        return self._minv
 
     @property
     def maxv(self):
-        return self._cpuinfo["lvls"][-1][1]
+        return self._maxv
 
     @property
-    def lvl(self, lvl):
-        return self._cpuinfo["lvls"][lvl]
+    def lvls(self):
+        return self._lvls
 
     @property
-    def lvls(self):
-        return self._cpuinfo["lvls"]
+    def idle_power(self):
+        return self._cpuinfo.get("idle_power", 0)
 
+    @property
+    def transition_latency(self):
+        return self._cpuinfo.get("transition_latency", 0)
+
+    @property
+    def transition_energy(self):
+        return self._cpuinfo.get("transition_energy", 0)
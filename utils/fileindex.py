@@ -0,0 +1,202 @@
+"""
+Sidecar index of the task sets stored in a XML or JSON file.
+
+The index keeps the byte range of each task set (a <S count=...> element, or an entry of the top level JSON array),
+so any subset of task sets can be loaded by seeking directly into the file. It is saved next to the file, with the
+.idx suffix, and rebuilt when the file size or modification time changes.
+"""
+from array import array
+from bisect import bisect_left
+import mmap
+import os
+import re
+import struct
+import tempfile
+
+_MAGIC = b"RTSIDX01"
+_HEADER = struct.Struct("<8sqqq")
+
+_xml_start = re.compile(rb'<S\b[^>]*>')
+_xml_count = re.compile(rb'count=["\']([^"\']*)["\']')
+_json_tokens = re.compile(rb'[\[\]{}"\\]')
+_json_id = re.compile(rb'"id"\s*:\s*(-?\d+)')
+
+
+def _scan_xml(mm):
+    """ Yield the id, start and end offsets of each <S> element """
+    for match in _xml_start.finditer(mm):
+        count = _xml_count.search(match.group(0))
+        end = mm.find(b"</S>", match.end())
+        if count is None or end < 0:
+            continue
+        yield int(float(count.group(1))), match.start(), end + len(b"</S>")
+
+
+def _scan_json(mm):
+    """
+    Yield the id, start and end offsets of each object or array in the top level array. The id is the value of the
+    "id" key of the object, or its position in the array if it has none.
+    """
+    depth, idx, start, rts_id = 0, 0, 0, None
+    in_string, skip = False, -1
+
+    for match in _json_tokens.finditer(mm):
+        pos = match.start()
+        if pos == skip:
+            continue
+        token = match.group(0)
+
+        if in_string:
+            if token == b'\\':
+                skip = pos + 1
+            elif token == b'"':
+                in_string = False
+        elif token == b'"':
+            in_string = True
+            if depth == 2 and rts_id is None:
+                key = _json_id.match(mm, pos)
+                if key is not None:
+                    rts_id = int(key.group(1))
+        elif token in (b'[', b'{'):
+            depth += 1
+            if depth == 2:
+                start = pos
+        elif token in (b']', b'}'):
+            if depth == 2:
+                yield idx if rts_id is None else rts_id, start, pos + 1
+                idx += 1
+                rts_id = None
+            depth -= 1
+
+
+class RtsIndex:
+    """
+    Byte ranges of the task sets in a file, sorted by task set id.
+    """
+    def __init__(self, ids: array, starts: array, ends: array, size=0, mtime=0):
+        self._ids = ids
+        self._starts = starts
+        self._ends = ends
+        self._size = size
+        self._mtime = mtime
+
+    @classmethod
+    def build(cls, path: str):
+        """
+        Scan a XML or JSON file.
+        :param path: file path
+        :return: index
+        """
+        stat = os.stat(path)
+        scan = _scan_json if os.path.splitext(path)[1] == '.json' else _scan_xml
+
+        entries = []
+        if stat.st_size > 0:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                entries = sorted(scan(mm))
+
+        ids, starts, ends = array('q'), array('q'), array('q')
+        for rts_id, start, end in entries:
+            ids.append(rts_id)
+            starts.append(start)
+            ends.append(end)
+
+        return cls(ids, starts, ends, stat.st_size, stat.st_mtime_ns)
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        Load an index file.
+        :param path: index file path
+        :return: index, or None if the file is not a valid index
+        """
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return None
+            magic, size, mtime, count = _HEADER.unpack(header)
+            if magic != _MAGIC:
+                return None
+            ids, starts, ends = array('q'), array('q'), array('q')
+            try:
+                ids.fromfile(f, count)
+                starts.fromfile(f, count)
+                ends.fromfile(f, count)
+            except EOFError:
+                return None
+        return cls(ids, starts, ends, size, mtime)
+
+    def save(self, path: str):
+        """
+        Save the index. It is written to a temporary file in the same directory and renamed, so processes loading the
+        index at the same time never read a partially written file.
+        :param path: index file path
+        """
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                        dir=os.path.dirname(path) or ".")
+        try:
+            os.chmod(tmp_path, 0o644)
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, self._size, self._mtime, len(self._ids)))
+                self._ids.tofile(f)
+                self._starts.tofile(f)
+                self._ends.tofile(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def is_current(self, path: str) -> bool:
+        """ True if the index matches the current version of the file """
+        stat = os.stat(path)
+        return stat.st_size == self._size and stat.st_mtime_ns == self._mtime
+
+    def find(self, rts_id: int):
+        """
+        Byte range of a task set.
+        :param rts_id: task set id
+        :return: start and end offsets, or None if the task set is not in the file
+        """
+        pos = bisect_left(self._ids, rts_id)
+        if pos < len(self._ids) and self._ids[pos] == rts_id:
+            return self._starts[pos], self._ends[pos]
+        return None
+
+    def read(self, f, rts_id: int):
+        """
+        Read the raw content of a task set.
+        :param f: file opened in binary mode
+        :param rts_id: task set id
+        :return: bytes, or None if the task set is not in the file
+        """
+        span = self.find(rts_id)
+        if span is None:
+            return None
+        f.seek(span[0])
+        return f.read(span[1] - span[0])
+
+    def __len__(self):
+        return len(self._ids)
+
+
+def get_index(path: str) -> RtsIndex:
+    """
+    Load the sidecar index of a file, building it if it does not exist or is outdated.
+    :param path: XML or JSON file path
+    :return: index
+    """
+    idx_path = path + ".idx"
+
+    index = None
+    if os.path.exists(idx_path):
+        index = RtsIndex.load(idx_path)
+
+    if index is None or not index.is_current(path):
+        index = RtsIndex.build(path)
+        try:
+            index.save(idx_path)
+        except OSError:
+            # read-only location, keep the index in memory only
+            pass
+
+    return index
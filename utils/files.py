@@ -1,55 +1,38 @@
 from typing import TextIO
+from utils.fileindex import get_index
+from utils.rtsbin import RtsBinFile
 import xml.etree.cElementTree as et
 import sys
 
 def get_from_xml(file: TextIO, rts_id_list: list) -> dict:
     """
-    Retrieve the specified rts from a xml file
+    Retrieve the specified rts from a xml file. Each rts is read by seeking to its position, recorded in the file
+    sidecar index.
     :param file: file object handle
     :param rts_id: rts id
     :return: rts
     """
-    # get an iterable
-    context = et.iterparse(file.name, events=('start', 'end',))
-    # turn it into a iterator
-    context = iter(context)
-    # get the root element
-    event, root = next(context)
-
-    current_id, rts_found = 0, False
-
-    for rts_id in rts_id_list:
-        rts = {"id": rts_id, "ptasks": []}
-
-        # read the xml, parse task-sets and simulate it
-        for event, elem in context:
-            if elem.tag == 'S':
-                if event == 'start':
-                    current_id = int(float(elem.get("count")))
-                    if rts_id == current_id:
-                        rts_found = True
-                if event == 'end':
-                    if rts_found:
-                        break
-                    elem.clear()
-
-            if rts_found:
-                if elem.tag == 'i':
-                    if event == 'start':
-                        task = elem.attrib
-                        for k, v in task.items():
-                            task[k] = int(float(v))
-                        rts["ptasks"].append(task)
-
-            root.clear()
-
-        yield rts
-    del context
+    index = get_index(file.name)
+
+    with open(file.name, "rb") as f:
+        for rts_id in rts_id_list:
+            rts = {"id": rts_id, "ptasks": [], "atasks": [], "stasks": []}
+
+            content = index.read(f, rts_id)
+            if content is not None:
+                for elem in et.fromstring(content).iter('i'):
+                    task = dict(elem.attrib)
+                    for k, v in task.items():
+                        task[k] = int(float(v))
+                    rts["ptasks"].append(task)
+
+            yield rts
 
 
 def get_from_json(file: TextIO, ids: list) -> dict:
     """
-    Retrieve the specified rts from a json file
+    Retrieve the specified rts from a json file. Each rts is read by seeking to its position, recorded in the file
+    sidecar index.
     :param file: file object handle
     :param ids: list of rts ids
     :return: list of rts
@@ -82,25 +65,26 @@ def get_from_json(file: TextIO, ids: list) -> dict:
         return result
 
     import json
-    rts_in_file = json.load(file)
-    rts_list = []
+    index = get_index(file.name)
 
-    for id, tasks in [(id, rts_in_file[id]) for id in ids]:
-        rts = {"id": id, "ptasks": get_tasks(tasks["periodic"]), "atasks": [], "stasks": []}
+    with open(file.name, "rb") as f:
+        for id in ids:
+            content = index.read(f, id)
+            if content is None:
+                raise IndexError("RTS {0:} not found in {1:}".format(id, file.name))
+            tasks = json.loads(content)
 
-        if "aperiodic" in tasks:
-            rts["atasks"] = get_atasks(tasks["aperiodic"])
+            rts = {"id": id, "ptasks": get_tasks(tasks["periodic"]), "atasks": [], "stasks": []}
 
-        rts_list.append(rts)
+            if "aperiodic" in tasks:
+                rts["atasks"] = get_atasks(tasks["aperiodic"])
 
-        yield rts
+            yield rts
 
 
 def get_from_txt(file: TextIO) -> dict:
     param_keys = ["C", "T", "D"]
 
-    rts = {"id": 0, "tasks": []}
-
     flag = False
 
     rts_counter = 0
@@ -110,8 +94,7 @@ def get_from_txt(file: TextIO) -> dict:
             number_of_tasks = int(line)
             flag = True
             rts_counter += 1
-            rts["id"] = rts_counter
-            rts["ptasks"] = []
+            rts = {"id": rts_counter, "ptasks": []}
             task_counter = 0
         else:
             task = {}
@@ -130,6 +113,27 @@ def get_from_txt(file: TextIO) -> dict:
                 yield rts
 
 
+def get_from_bin(file: TextIO, ids: list) -> dict:
+    """
+    Retrieve the specified rts from a binary task-set file, mapped into memory.
+    :param file: file object handle
+    :param ids: list of rts ids, all the rts in the file if empty
+    :return: rts
+    """
+    rts_file = RtsBinFile(file.name)
+
+    if not ids:
+        for pos in range(len(rts_file)):
+            yield rts_file.rts(pos)
+        return
+
+    for rts_id in ids:
+        pos = rts_file.position(rts_id)
+        if pos is None:
+            raise IndexError("RTS {0:} not found in {1:}".format(rts_id, file.name))
+        yield rts_file.rts(pos)
+
+
 def get_from_file(file: TextIO, ids: list = []) -> dict:
     """
     Retrieve the specified rts from file.
@@ -143,6 +147,8 @@ def get_from_file(file: TextIO, ids: list = []) -> dict:
         return get_from_xml(file, ids)
     if file_type == '.json':
         return get_from_json(file, ids)
+    if file_type == '.rtsb':
+        return get_from_bin(file, ids)
     if file_type == '.txt':
         return get_from_txt(file)
     else:
@@ -0,0 +1,257 @@
+"""
+Vectorized task set generation.
+
+The task sets are generated in batches of 2-D arrays, one task set per row: utilizations (UUniFast-discard or
+RandFixedSum), periods (log-uniform, uniform or harmonic), and integer wcets. The tasks of each set are sorted by
+period (RM priority order) and have implicit deadlines. Every random number comes from a numpy Generator, so the same
+seed and batch size give the same task sets.
+
+The batches are written with write_rts() to the formats read by utils.files.
+"""
+import numpy as np
+
+# consecutive batches without any task set kept before giving up
+MAX_ATTEMPTS = 100
+
+
+def uunifast_discard(rng, nsets: int, n: int, u: float, max_attempts: int = MAX_ATTEMPTS):
+    """
+    UUniFast utilizations, the sets with a task utilization greater than 1 are discarded.
+    :param rng: numpy Generator
+    :param nsets: number of sets
+    :param n: number of tasks
+    :param u: total utilization, at most n
+    :param max_attempts: consecutive batches where every set is discarded before raising ValueError
+    :return: utilization matrix (nsets x n)
+    """
+    if n < u:
+        raise ValueError("The utilization {} is greater than the number of tasks {}.".format(u, n))
+
+    # exponent of the random factor of each remaining sum
+    exps = 1.0 / np.arange(n - 1, 0, -1)
+
+    sets, count, attempts = [], 0, 0
+    while count < nsets:
+        if attempts == max_attempts:
+            raise ValueError("Every UUniFast set of {} tasks with utilization {} was discarded in {} attempts."
+                             .format(n, u, max_attempts))
+        m = nsets - count
+        sums = np.empty((m, n))
+        sums[:, 0] = u
+        sums[:, 1:] = u * np.cumprod(rng.random((m, n - 1)) ** exps, axis=1)
+        utils = np.empty((m, n))
+        utils[:, :-1] = sums[:, :-1] - sums[:, 1:]
+        utils[:, -1] = sums[:, -1]
+        utils = utils[(utils <= 1).all(axis=1)]
+        sets.append(utils)
+        count += len(utils)
+        attempts = 0 if len(utils) else attempts + 1
+
+    return np.concatenate(sets)
+
+
+def randfixedsum(rng, nsets: int, n: int, u: float):
+    """
+    Stafford's RandFixedSum utilizations, see simso.generator.task_generator.StaffordRandFixedSum. The simplex walk
+    is done for all the sets at once.
+    :param rng: numpy Generator
+    :param nsets: number of sets
+    :param n: number of tasks
+    :param u: total utilization, at most n
+    :return: utilization matrix (nsets x n)
+    """
+    if n < u:
+        raise ValueError("The utilization {} is greater than the number of tasks {}.".format(u, n))
+    if n == 1:
+        return np.full((nsets, 1), float(u))
+
+    k = min(int(u), n - 1)
+    s1 = u - np.arange(k, k - n, -1.)
+    s2 = np.arange(k + n, k, -1.) - u
+
+    tiny = np.finfo(float).tiny
+    huge = np.finfo(float).max
+
+    # transition probabilities between simplex types
+    w = np.zeros((n, n + 1))
+    w[0, 1] = huge
+    t = np.zeros((n - 1, n))
+    for i in range(2, n + 1):
+        tmp1 = w[i - 2, 1:i + 1] * s1[:i] / float(i)
+        tmp2 = w[i - 2, :i] * s2[n - i:n] / float(i)
+        w[i - 1, 1:i + 1] = tmp1 + tmp2
+        tmp3 = w[i - 1, 1:i + 1] + tiny
+        tmp4 = s2[n - i:n] > s1[:i]
+        t[i - 2, :i] = (tmp2 / tmp3) * tmp4 + (1 - tmp1 / tmp3) * np.logical_not(tmp4)
+
+    x = np.zeros((nsets, n))
+    rt = rng.random((nsets, n - 1))  # rand simplex type
+    rs = rng.random((nsets, n - 1))  # rand position in simplex
+    s = np.full(nsets, float(u))
+    j = np.full(nsets, k + 1)
+    sm = np.zeros(nsets)
+    pr = np.ones(nsets)
+
+    for i in range(n - 1, 0, -1):
+        e = rt[:, n - i - 1] <= t[i - 1, j - 1]
+        sx = rs[:, n - i - 1] ** (1.0 / i)
+        sm = sm + (1.0 - sx) * pr * s / (i + 1)
+        pr = sx * pr
+        x[:, n - i - 1] = sm + pr * e
+        s = s - e
+        j = j - e
+
+    x[:, n - 1] = sm + pr * s
+
+    # the coordinates are generated in a fixed order, shuffle them within each set
+    return rng.permuted(x, axis=1)
+
+
+def loguniform_periods(rng, nsets: int, n: int, pmin: int, pmax: int, granularity: int = 1):
+    """ Periods with a log-uniform distribution in [pmin, pmax], rounded to multiples of granularity """
+    periods = np.exp(rng.uniform(np.log(pmin), np.log(pmax), size=(nsets, n)))
+    return _round_periods(periods, granularity)
+
+
+def uniform_periods(rng, nsets: int, n: int, pmin: int, pmax: int, granularity: int = 1):
+    """ Periods with a uniform distribution in [pmin, pmax], rounded to multiples of granularity """
+    return _round_periods(rng.uniform(pmin, pmax, size=(nsets, n)), granularity)
+
+
+def harmonic_periods(rng, nsets: int, n: int, pmin: int, pmax: int, granularity: int = 1):
+    """
+    Harmonic periods p * 2^k in [pmin, pmax], each period divides every longer one. The base period p is pmin rounded
+    up to a multiple of granularity, so every period is a multiple of it.
+    """
+    base = -(-pmin // granularity) * granularity
+    if base > pmax:
+        raise ValueError("No multiple of the granularity {} in [{}, {}].".format(granularity, pmin, pmax))
+    levels = int(np.floor(np.log2(pmax / base))) + 1
+    return base * np.left_shift(1, rng.integers(0, levels, size=(nsets, n))).astype(np.int64)
+
+
+def _round_periods(periods, granularity):
+    return np.maximum(np.rint(periods / granularity), 1).astype(np.int64) * granularity
+
+
+utilization_methods = {"uunifast": uunifast_discard,
+                       "randfixedsum": randfixedsum}
+
+period_methods = {"loguniform": loguniform_periods,
+                  "uniform": uniform_periods,
+                  "harmonic": harmonic_periods}
+
+
+def generate_batches(rng, nsets: int, n: int, u: float, batch_size: int = 10000, utilizations: str = "uunifast",
+                     periods: str = "loguniform", pmin: int = 10, pmax: int = 1000, granularity: int = 1,
+                     predicate=None, max_attempts: int = MAX_ATTEMPTS):
+    """
+    Generate task sets in batches.
+    :param rng: numpy Generator
+    :param nsets: number of task sets
+    :param n: number of tasks of each set
+    :param u: total utilization of each set
+    :param batch_size: task sets generated at once
+    :param utilizations: utilization method, a key of utilization_methods
+    :param periods: period method, a key of period_methods
+    :param pmin: minimum period
+    :param pmax: maximum period
+    :param granularity: periods are multiples of granularity
+    :param predicate: function of the (c, t, d) matrices that returns a boolean vector, the task sets where it is
+                      false are discarded
+    :param max_attempts: consecutive batches where the predicate discards every set before raising ValueError
+    :return: iterator of (c, t, d) integer matrices, one task set per row
+    """
+    if n < u:
+        raise ValueError("The utilization {} is greater than the number of tasks {}.".format(u, n))
+
+    gen_utils = utilization_methods[utilizations]
+    gen_periods = period_methods[periods]
+
+    count, attempts = 0, 0
+    while count < nsets:
+        if attempts == max_attempts:
+            raise ValueError("Every task set was discarded in {} batches.".format(max_attempts))
+        m = min(batch_size, nsets - count)
+        t = gen_periods(rng, m, n, pmin, pmax, granularity)
+        c = np.maximum(np.rint(gen_utils(rng, m, n, u) * t), 1).astype(np.int64)
+
+        # RM priority order
+        order = np.argsort(t, axis=1, kind="stable")
+        c = np.take_along_axis(c, order, axis=1)
+        t = np.take_along_axis(t, order, axis=1)
+        d = t.copy()
+
+        if predicate is not None:
+            keep = predicate(c, t, d)
+            c, t, d = c[keep], t[keep], d[keep]
+
+        if len(c):
+            attempts = 0
+            c, t, d = c[:nsets - count], t[:nsets - count], d[:nsets - count]
+            count += len(c)
+            yield c, t, d
+        else:
+            attempts += 1
+
+
+def _write_txt(f, first_id, c, t, d):
+    n = c.shape[1]
+    rows = np.stack((c, t, d), axis=2).reshape(-1, 3)
+    lines = ["{} {} {}".format(*row) for row in rows.tolist()]
+    for i in range(len(c)):
+        f.write("{}\n".format(n))
+        f.write("\n".join(lines[i * n:(i + 1) * n]))
+        f.write("\n")
+
+
+def _write_xml(f, first_id, c, t, d):
+    for i, (cs, ts, ds) in enumerate(zip(c.tolist(), t.tolist(), d.tolist()), first_id):
+        f.write('  <S count="{}.0">\n'.format(i))
+        for nro, (ci, ti, di) in enumerate(zip(cs, ts, ds), 1):
+            f.write('    <i nro="{}" C="{}" T="{}" D="{}"/>\n'.format(nro, ci, ti, di))
+        f.write('  </S>\n')
+
+
+def _write_json(f, first_id, c, t, d):
+    for i, (cs, ts, ds) in enumerate(zip(c.tolist(), t.tolist(), d.tolist()), first_id):
+        tasks = ", ".join('{{"c": {}, "t": {}, "d": {}}}'.format(ci, ti, di) for ci, ti, di in zip(cs, ts, ds))
+        f.write('{}  {{"id": {}, "periodic": [{}], "aperiodic": [], "sporadic": []}}'.format(
+            ",\n" if i > 1 else "", i, tasks))
+
+
+def write_rts(path: str, batches) -> int:
+    """
+    Write task sets to a file, in the format given by its extension (.xml, .json, .rtsb, or txt otherwise). The ids
+    are consecutive from 1, json entries record theirs in an "id" key.
+    :param path: output file path, "-" for txt to stdout
+    :param batches: iterator of (c, t, d) matrices, one task set per row
+    :return: number of task sets written
+    """
+    import os
+    import sys
+    ext = os.path.splitext(path)[1]
+
+    if ext == ".rtsb":
+        from utils.rtsbin import write_bin_arrays
+        batches = list(batches)
+        if not batches:
+            return write_bin_arrays(path, 1, [], [], [])
+        return write_bin_arrays(path, 1, *(np.concatenate(column) for column in zip(*batches)))
+
+    header, footer, write = {".xml": ('<?xml version="1.0"?>\n<rtts>\n', '</rtts>\n', _write_xml),
+                             ".json": ('[\n', '\n]\n', _write_json)}.get(ext, ("", "", _write_txt))
+
+    f = sys.stdout if path == "-" else open(path, "w")
+    try:
+        f.write(header)
+        count = 0
+        for c, t, d in batches:
+            write(f, 1 + count, c, t, d)
+            count += len(c)
+        f.write(footer)
+    finally:
+        if f is not sys.stdout:
+            f.close()
+
+    return count
@@ -0,0 +1,216 @@
+"""
+Operation counting for the slack methods and the schedulability tests.
+
+The functions whose calls are measured (ceil, floor, slack calculations...) are wrapped with counted(). By default
+counted() returns the function itself, so there is no overhead. With profiling enabled, by set_profiling(True) or
+the HRTSIM_PROFILE environment variable, it returns a new counted function, and cc_count() gives its number of calls.
+The slack methods and schedulability tests bind their counted functions once, as module globals with
+counted_global(), and set_profiling() binds them again. The calls of each evaluation are the difference of cc_count()
+at its end and at its start.
+
+WallProfiler measures the wall-clock time of nested sections of code. The functions to measure are wrapped when a
+profiler is created, so there is no overhead without one.
+"""
+import os
+import time
+
+_profiling = bool(os.environ.get("HRTSIM_PROFILE"))
+
+# (module globals, name, function) of the counted module globals
+_counted_globals = []
+
+
+class CountedFunction:
+    """
+    Function wrapper that counts its calls.
+    """
+    __slots__ = ("fn", "counter", "__name__")
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.counter = 0
+        self.__name__ = fn.__name__
+
+    def __call__(self, *args, **kwargs):
+        self.counter += 1
+        return self.fn(*args, **kwargs)
+
+
+def set_profiling(enabled: bool) -> None:
+    """ Enable or disable the operation counting """
+    global _profiling
+    if enabled != _profiling:
+        _profiling = enabled
+        for namespace, name, fn in _counted_globals:
+            namespace[name] = counted(fn)
+
+
+def profiling() -> bool:
+    """ True if the operation counting is enabled """
+    return _profiling
+
+
+def counted(fn):
+    """
+    Wrap a function to count its calls if profiling is enabled. It can be used as a decorator.
+    :param fn: function
+    :return: counted function, or fn if profiling is disabled
+    """
+    return CountedFunction(fn) if _profiling else fn
+
+
+def counted_global(namespace: dict, name: str, fn):
+    """
+    Bind a function wrapped by counted() to a global name of a module. The name is bound again when profiling is
+    enabled or disabled, so the functions of the module use the plain function or a counted one without wrapping it
+    on every call.
+    :param namespace: globals() of the module
+    :param name: global name
+    :param fn: function
+    :return: function bound to the name
+    """
+    _counted_globals.append((namespace, name, fn))
+    namespace[name] = counted(fn)
+    return namespace[name]
+
+
+def cc_count(*fns) -> int:
+    """
+    Number of calls made through counted functions.
+    :param fns: functions returned by counted()
+    :return: total number of calls, 0 if profiling is disabled
+    """
+    if not _profiling:
+        return 0
+    return sum(getattr(fn, "counter", 0) for fn in fns)
+
+
+_MISSING = object()
+
+
+class WallProfiler:
+    """
+    Wall-clock profiler of nested sections. Each section accumulates its number of calls, its total time and its self
+    time (total minus the time of the nested sections). The self time of each stack of sections is also kept, to be
+    written in the folded format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        """
+        :param clock: time function in seconds
+        """
+        self._clock = clock
+        self._frames = []  # [name, start time, time of the nested sections, stack]
+        self._stats = {}  # name -> [calls, total time, self time]
+        self._stacks = {}  # stack -> self time
+        self._patches = []
+
+    def enter(self, name: str) -> None:
+        """ Start a section, nested in the current one """
+        stack = self._frames[-1][3] + (name,) if self._frames else (name,)
+        self._frames.append([name, self._clock(), 0.0, stack])
+
+    def exit(self) -> None:
+        """ End the current section """
+        name, start, nested, stack = self._frames.pop()
+        elapsed = self._clock() - start
+        if self._frames:
+            self._frames[-1][2] += elapsed
+
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += elapsed - nested
+        self._stacks[stack] = self._stacks.get(stack, 0.0) + elapsed - nested
+
+    def wrap(self, name: str, fn):
+        """
+        Wrap a function to measure its calls as a section.
+        :param name: section name
+        :param fn: function
+        :return: measured function
+        """
+        def measured(*args, **kwargs):
+            self.enter(name)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.exit()
+        measured.__name__ = getattr(fn, "__name__", name)
+        return measured
+
+    def wrap_generator(self, name: str, gen):
+        """
+        Wrap a generator to measure each of its steps as a section.
+        :param name: section name
+        :param gen: generator
+        :return: measured generator
+        """
+        while True:
+            self.enter(name)
+            try:
+                value = next(gen)
+            except StopIteration:
+                return
+            finally:
+                self.exit()
+            yield value
+
+    def patch(self, obj, attr: str, name: str = None, replacement=None) -> None:
+        """
+        Replace an attribute of an object, class or module, or an item of a dict, with its measured function, until
+        restore().
+        :param obj: object, class, module or dict
+        :param attr: attribute name or key
+        :param name: section name
+        :param replacement: function of the original attribute that returns its replacement, instead of measuring it
+        """
+        if isinstance(obj, dict):
+            previous = original = obj[attr]
+        else:
+            previous, original = vars(obj).get(attr, _MISSING), getattr(obj, attr)
+        value = replacement(original) if replacement is not None else self.wrap(name, original)
+        if isinstance(obj, dict):
+            obj[attr] = value
+        else:
+            setattr(obj, attr, value)
+        self._patches.append((obj, attr, previous))
+
+    def restore(self) -> None:
+        """ Undo the patches, in reverse order """
+        for obj, attr, previous in reversed(self._patches):
+            if isinstance(obj, dict):
+                obj[attr] = previous
+            elif previous is _MISSING:
+                delattr(obj, attr)
+            else:
+                setattr(obj, attr, previous)
+        self._patches = []
+
+    def stats(self) -> dict:
+        """
+        :return: dict of section name -> (calls, total time, self time)
+        """
+        return {name: tuple(stats) for name, stats in self._stats.items()}
+
+    def summary(self) -> str:
+        """ Table of the sections sorted by self time """
+        total = sum(stats[2] for stats in self._stats.values()) or 1.0
+        width = max([len(name) for name in self._stats] + [len("Section")])
+        lines = ["{:<{w}}  {:>10}  {:>10}  {:>10}  {:>6}".format("Section", "Calls", "Total (s)", "Self (s)", "Self %",
+                                                                 w=width)]
+        for name, (calls, elapsed, self_time) in sorted(self._stats.items(), key=lambda item: -item[1][2]):
+            lines.append("{:<{w}}  {:>10}  {:>10.4f}  {:>10.4f}  {:>6.1f}".format(name, calls, elapsed, self_time,
+                                                                                 100 * self_time / total, w=width))
+        return "\n".join(lines)
+
+    def write_folded(self, path: str) -> None:
+        """
+        Write the self time of each stack in microseconds, one "a;b;c time" line per stack.
+        :param path: output file path
+        """
+        with open(path, "w") as f:
+            for stack, self_time in self._stacks.items():
+                f.write("{} {}\n".format(";".join(stack), int(round(self_time * 1e6))))
@@ -0,0 +1,116 @@
+"""
+Ready queues of the monoprocessor schedulers.
+
+Selecting the next job with min(ready_list, key=...) and removing it with ready_list.remove(job) costs O(n) per
+scheduling decision. These queues return the same job as min(): the first inserted job among those with the minimum
+key. The key of a job must not change while it is queued.
+
+    - HeapReadyQueue: binary heap with lazy deletion, O(log n) insertion and selection.
+    - PriorityBitmapReadyQueue: a FIFO queue for each fixed priority and a bitmap of the non-empty ones, O(1)
+      insertion and selection. The priorities (keys) of the jobs must be known when it is created.
+"""
+from collections import deque
+from heapq import heappush, heappop, heapify
+
+
+class HeapReadyQueue:
+    """
+    Binary heap of jobs keyed on (key(job), insertion order). Removed jobs are marked and discarded when they reach
+    the top of the heap.
+    """
+    __slots__ = ("_key", "_heap", "_entries", "_counter")
+
+    def __init__(self, key):
+        """
+        :param key: job priority, the lower the value the higher the priority
+        """
+        self._key = key
+        self._heap = []
+        self._entries = {}
+        self._counter = 0
+
+    def append(self, job):
+        entry = [self._key(job), self._counter, job]
+        self._counter += 1
+        self._entries[job] = entry
+        heappush(self._heap, entry)
+
+    def remove(self, job):
+        entry = self._entries.pop(job, None)
+        if entry is None:
+            raise ValueError("job not in the ready queue")
+        entry[2] = None
+
+        # rebuild the heap if most of it are removed jobs
+        if len(self._heap) > 2 * len(self._entries) + 32:
+            self._heap = [entry for entry in self._heap if entry[2] is not None]
+            heapify(self._heap)
+
+    def first(self):
+        """ Job with the highest priority """
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heappop(heap)
+        if not heap:
+            raise IndexError("first from an empty ready queue")
+        return heap[0][2]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, job):
+        return job in self._entries
+
+
+class PriorityBitmapReadyQueue:
+    """
+    Fixed priority ready queue. Bit i of the bitmap is set if the FIFO queue of the i-th highest priority is not
+    empty, so the highest priority job is the first one of the queue of its lowest set bit.
+    """
+    __slots__ = ("_key", "_levels", "_queues", "_bitmap", "_len")
+
+    def __init__(self, key, priorities):
+        """
+        :param key: job priority, the lower the value the higher the priority
+        :param priorities: every priority that the jobs can have
+        """
+        self._key = key
+        self._levels = {priority: level for level, priority in enumerate(sorted(set(priorities)))}
+        self._queues = [deque() for _ in self._levels]
+        self._bitmap = 0
+        self._len = 0
+
+    def append(self, job):
+        level = self._levels[self._key(job)]
+        self._queues[level].append(job)
+        self._bitmap |= 1 << level
+        self._len += 1
+
+    def remove(self, job):
+        level = self._levels[self._key(job)]
+        queue = self._queues[level]
+        queue.remove(job)
+        if not queue:
+            self._bitmap &= ~(1 << level)
+        self._len -= 1
+
+    def first(self):
+        """ Job with the highest priority """
+        bitmap = self._bitmap
+        if not bitmap:
+            raise IndexError("first from an empty ready queue")
+        return self._queues[(bitmap & -bitmap).bit_length() - 1][0]
+
+    def __iter__(self):
+        for queue in self._queues:
+            yield from queue
+
+    def __len__(self):
+        return self._len
+
+    def __contains__(self, job):
+        level = self._levels.get(self._key(job))
+        return level is not None and job in self._queues[level]
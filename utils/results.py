@@ -0,0 +1,235 @@
+"""
+Result stores.
+
+ResultStore keeps the records of the work units of a sweep.
+
+EventRecorder keeps the events of a simulation (scheduler events and slack calculations) in typed columns, instead of
+printing them as text. The columns are buffered and written in chunks of chunk_size rows. The file format is given by
+the file extension:
+
+    - .npz: a NumPy archive with an entry "<column>.<chunk>" for each column and chunk.
+    - .parquet: a Parquet file with a row group for each chunk (requires pyarrow).
+    - .feather or .arrow: an Arrow IPC file with a record batch for each chunk (requires pyarrow).
+
+read_events() loads any of them as a pandas DataFrame, and events_tables() gives the aggregate tables of
+process.py --test events.
+"""
+from array import array
+import json
+import math
+import os
+
+
+class ResultStore:
+    """
+    Results of the work units of a sweep, one JSON record per line. Each record is written as soon as its unit is
+    completed, so an interrupted sweep can be resumed skipping the units already in the store.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._records = []
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self._records.append(json.loads(line))
+                    except ValueError:
+                        # last record of an interrupted write
+                        break
+        self._keys = {record["key"] for record in self._records}
+        self._f = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def __len__(self):
+        return len(self._records)
+
+    def append(self, record: dict) -> None:
+        """
+        Save the record of a completed unit.
+        :param record: result record, with an unique "key"
+        """
+        if self._f is None:
+            self._f = open(self.path, "a")
+        self._f.write(json.dumps(record) + "\n")
+        self._f.flush()
+        self._records.append(record)
+        self._keys.add(record["key"])
+
+    def records(self) -> list:
+        """ Every record in the store """
+        return self._records
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+# (column, array typecode, numpy dtype), typecode None for string columns
+EVENT_COLUMNS = (
+    ("rts", 'q', "int64"),          # rts id
+    ("time", 'd', "float64"),       # simulation time, in ms
+    ("task", 'q', "int64"),         # task identifier
+    ("job", 'q', "int64"),          # job number
+    ("event", None, "U1"),          # A: activation, E: end, S: schedule, C: slack calculation
+    ("method", None, "U"),          # slack method of C events
+    ("slack", 'd', "float64"),      # slack of the task, in ms
+    ("ttma", 'd', "float64"),       # time of the slack, in ms
+    ("cpu_level", 'd', "float64"),  # cpu speed
+    ("energy", 'd', "float64"),     # energy consumed until time
+    ("cc", 'q', "int64"),           # ceil and floor operations of the slack calculation
+)
+
+def job_number(job) -> int:
+    """ Number of a simso job, named T_<task>_<job>, or -1 if there is no job """
+    return int(job.name.rsplit("_", 1)[1]) if job is not None else -1
+
+
+_NPZ, _PARQUET, _FEATHER = ".npz", ".parquet", (".feather", ".arrow")
+
+
+class EventRecorder:
+    """
+    Simulation events in typed columns, written to a file in chunks. Missing float values are NaN and missing integer
+    values are -1.
+    """
+    def __init__(self, path: str, rts=-1, chunk_size=65536):
+        """
+        :param path: output file, its extension selects the format
+        :param rts: rts id of every event
+        :param chunk_size: rows buffered before they are written
+        """
+        self.path = path
+        self.rts = rts
+        self.chunk_size = chunk_size
+        self._chunks = 0
+        self._count = 0
+        self._writer = None
+        self._ext = os.path.splitext(path)[1]
+        if self._ext != _NPZ and self._ext != _PARQUET and self._ext not in _FEATHER:
+            raise ValueError("Unknown results format: {}.".format(path))
+        self._new_buffers()
+
+    def _new_buffers(self):
+        self._columns = [array(code) if code is not None else [] for _, code, _ in EVENT_COLUMNS]
+        (self._rts, self._time, self._task, self._job, self._event, self._method, self._slack, self._ttma,
+         self._cpu_level, self._energy, self._cc) = self._columns
+
+    def __len__(self):
+        return self._count + len(self._time)
+
+    def record(self, time, task, job, event, slack=math.nan, ttma=math.nan, cpu_level=math.nan, energy=math.nan,
+               cc=-1, method=""):
+        """
+        Record an event.
+        :param time: simulation time, in ms
+        :param task: task identifier
+        :param job: job number
+        :param event: event code
+        """
+        self._rts.append(self.rts)
+        self._time.append(time)
+        self._task.append(task)
+        self._job.append(job)
+        self._event.append(event)
+        self._method.append(method)
+        self._slack.append(slack)
+        self._ttma.append(ttma)
+        self._cpu_level.append(cpu_level)
+        self._energy.append(energy)
+        self._cc.append(cc)
+        if len(self._time) >= self.chunk_size:
+            self.flush()
+
+    def record_job(self, time, job, event, **values):
+        """ Record an event of a simso job """
+        self.record(time, job.task.identifier, job_number(job), event, **values)
+
+    def flush(self) -> None:
+        """ Write the buffered rows as a new chunk """
+        if not self._time:
+            return
+        import numpy as np
+
+        arrays = {}
+        for (name, code, dtype), column in zip(EVENT_COLUMNS, self._columns):
+            arrays[name] = np.array(column, dtype=dtype) if code is None else np.frombuffer(column, dtype=dtype)
+
+        if self._ext == _NPZ:
+            import zipfile
+            if self._writer is None:
+                self._writer = zipfile.ZipFile(self.path, "w", zipfile.ZIP_STORED)
+            for name, values in arrays.items():
+                with self._writer.open("{}.{:06d}.npy".format(name, self._chunks), "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, values, allow_pickle=False)
+        else:
+            import pyarrow as pa
+            table = pa.table(arrays)
+            if self._writer is None:
+                if self._ext == _PARQUET:
+                    import pyarrow.parquet as pq
+                    self._writer = pq.ParquetWriter(self.path, table.schema)
+                else:
+                    import pyarrow.ipc as ipc
+                    self._writer = ipc.new_file(self.path, table.schema)
+            self._writer.write_table(table)
+
+        self._chunks += 1
+        self._count += len(self._time)
+        self._new_buffers()
+
+    def close(self) -> None:
+        """ Write the buffered rows and close the file """
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def read_events(path: str):
+    """
+    Load the events written by an EventRecorder.
+    :param path: events file
+    :return: pandas DataFrame with a row for each event
+    """
+    import pandas as pd
+    ext = os.path.splitext(path)[1]
+
+    if ext == _PARQUET:
+        return pd.read_parquet(path)
+    if ext in _FEATHER:
+        return pd.read_feather(path)
+
+    import numpy as np
+    with np.load(path) as npz:
+        chunks = {}
+        for key in sorted(npz.files):
+            name = key.split(".")[0]
+            chunks.setdefault(name, []).append(npz[key])
+    return pd.DataFrame({name: np.concatenate(chunks[name]) if name in chunks else np.array([], dtype=dtype)
+                         for name, _, dtype in EVENT_COLUMNS})
+
+
+def events_tables(df, total=False) -> str:
+    """
+    Aggregate tables of recorded events (process.py --test events): cc and slack of the slack calculations by task and
+    method and by method, and the number of events, final energy and mean cpu level of each rts.
+    :param df: events, as read by read_events()
+    :param total: sums of cc and slack instead of means
+    :return: markdown tables
+    """
+    import pandas as pd
+    calcs = df[df["event"] == "C"][["task", "method", "cc", "slack"]]
+    if total:
+        tables = [calcs.groupby(["task", "method"]).sum(), calcs.drop(columns="task").groupby(["method"]).sum()]
+    else:
+        tables = [calcs.groupby(["task", "method"]).mean(), calcs.drop(columns="task").groupby(["method"]).mean()]
+    events = df[df["event"] != "C"].groupby(["rts"])
+    tables.append(pd.DataFrame({"events": events.size(), "energy": events["energy"].last(),
+                                "cpu_level": events["cpu_level"].mean()}))
+    return "\n".join(table.to_markdown() for table in tables)
@@ -1,4 +1,6 @@
 import math
+from bisect import bisect_right
+from functools import lru_cache
 
 
 def lcm(rts: list) -> float:
@@ -43,17 +45,31 @@ def first_free_slot(rts: list):
 
 def calculate_k(rts: list, vf=1.0) -> None:
     """ Calcula el K de cada tarea (maximo retraso en el instante critico) """
-    rts[0]["k"] = rts[0]["T"] - (rts[0]["C"] * vf)
+    for task, k in zip(rts, _k_values(fingerprint(rts), vf)):
+        task["k"] = k
 
-    for i, task in enumerate(rts[1:], 1):
+
+@lru_cache(maxsize=4096)
+def _k_values(tasks: tuple, vf) -> tuple:
+    """ K of each task of a fingerprint, see calculate_k """
+    ks = [tasks[0][1] - (tasks[0][0] * vf)]
+
+    for i, (c, _, d) in enumerate(tasks[1:], 1):
         t = 0
         k = 1
-        while t <= task["D"]:
-            w = k + (task["C"]*vf) + sum([math.ceil(float(t) / float(taskp["T"]))*(taskp["C"]*vf) for taskp in rts[:i]])
+        while t <= d:
+            w = k + (c*vf) + sum([math.ceil(float(t) / float(tp))*(cp*vf) for cp, tp, _ in tasks[:i]])
             if t == w:
                 k += 1
             t = w
-        task["k"] = k - 1
+        ks.append(k - 1)
+
+    return tuple(ks)
+
+
+def fingerprint(rts: list) -> tuple:
+    """ (C, T, D) of each task, identifies a rts in the caches of the analysis results """
+    return tuple((task["C"], task["T"], task["D"]) for task in rts)
 
 
 def calculate_y(rts: list) -> None:
@@ -62,6 +78,21 @@ def calculate_y(rts: list) -> None:
         task["y"] = task["D"] - task["R"]
 
 
+def rts_to_arrays(rts_list: list) -> tuple:
+    """
+    Pack task sets with the same number of tasks into 2-D arrays, one task set per row.
+    :param rts_list: list of task lists
+    :return: wcet, period and deadline matrices, int64 if all the values are integers and float64 otherwise
+    """
+    import numpy as np
+    c = np.array([[task["C"] for task in rts] for rts in rts_list], dtype=np.float64)
+    t = np.array([[task["T"] for task in rts] for rts in rts_list], dtype=np.float64)
+    d = np.array([[task["D"] for task in rts] for rts in rts_list], dtype=np.float64)
+    if all(np.all(np.mod(column, 1) == 0) for column in (c, t, d)):
+        c, t, d = c.astype(np.int64), t.astype(np.int64), d.astype(np.int64)
+    return c, t, d
+
+
 def mixrange(s):
     """
     Create a list of numbers from a string. Ie: "1-3,6,8-10" into [1,2,3,6,8,9,10]
@@ -108,3 +139,185 @@ def rta(rts, vf=1.0):
             break
 
     return schedulable
+
+
+def min_feasible_lvl(rts: list, lvls: list):
+    """
+    Find the slowest v/f level of a DVS cpu in which the rts is schedulable, and set the wcrt (R) of each task at that
+    level, as the first level of lvls for which rta(rts, lvl[5]) is true.
+    :param rts: rts
+    :param lvls: cpu levels (see utils.cpu), from the slowest to the fastest
+    :return: level, or None if the rts is not schedulable in any level
+    """
+    pos, wcrt = _min_feasible_vf(fingerprint(rts), tuple(lvl[5] for lvl in lvls))
+    if pos is None:
+        return None
+    for task, r in zip(rts, wcrt):
+        task["R"] = r
+    return lvls[pos]
+
+
+@lru_cache(maxsize=4096)
+def _min_feasible_vf(tasks: tuple, vfs: tuple) -> tuple:
+    """
+    Binary search of the first feasible wcet factor. The factors decrease (the levels are faster), so the feasible
+    ones are a suffix of vfs. The wcrts of a faster level are lower bounds of the wcrts of a slower one, so the fixed
+    points start from the wcrts of the slowest feasible level found so far.
+    :return: position of the first feasible factor and the wcrts there, or (None, None)
+    """
+    lo, hi = 0, len(vfs)
+    found, start = None, None
+    while lo < hi:
+        mid = (lo + hi) // 2
+        schedulable, wcrt = _rta_from(tasks, vfs[mid], start)
+        if schedulable:
+            hi = mid
+            found, start = mid, wcrt
+        else:
+            lo = mid + 1
+    return found, start
+
+
+def _rta_from(tasks: tuple, vf, start=None) -> tuple:
+    """
+    rta() of a fingerprint, with the fixed point of each task started from a lower bound of its wcrt.
+    :return: schedulability and wcrts
+    """
+    wcrt = []
+    schedulable, _ = _fixed_points(tasks, vf, wcrt, 0, start)
+    return (True, tuple(wcrt)) if schedulable else (False, None)
+
+
+def _fixed_points(tasks, vf, wcrt: list, first: int, seed=None) -> tuple:
+    """
+    Fixed points of rta() for the tasks from first on, given the wcrts of the tasks before first. The fixed point of
+    each task starts from the wcrt of the previous task plus its wcet, or from seed[i] if it is greater. A seed must be
+    a lower bound of the wcrt: then the iterations stay below the least fixed point and they give the same wcrt and
+    schedulability as rta(), with the same floating point operations.
+    :param tasks: (C, T, D) of each task, sorted by priority
+    :param vf: wcet factor
+    :param wcrt: wcrts of tasks[:first], the wcrts of the analyzed tasks are appended
+    :param first: first task to analyze
+    :param seed: lower bound of the wcrt of each task (None for no bound), or None
+    :return: schedulability and number of ceil evaluations
+    """
+    from math import ceil
+
+    ceils = 0
+    if first == 0 and tasks:
+        wcrt.append(tasks[0][0] * vf)
+        first = 1
+
+    for idx in range(first, len(tasks)):
+        c, _, d = tasks[idx]
+        t_mas = wcrt[idx - 1] + (c * vf)
+        if seed is not None and seed[idx] is not None and seed[idx] > t_mas:
+            t_mas = seed[idx]
+
+        while True:
+            t = t_mas
+            w = c * vf
+
+            for cj, tj, _ in tasks[:idx]:
+                w += ceil(t_mas / tj) * (cj * vf)
+                ceils += 1
+                if w > d:
+                    return False, ceils
+
+            t_mas = w
+            if t == t_mas:
+                break
+
+        wcrt.append(t)
+
+    return True, ceils
+
+
+class IncrementalRTA:
+    """
+    Response time analysis (as rta()) of a rts that changes: tasks are added or removed, and the wcets are scaled by a
+    speed factor (as the vf of rta()). Each change only analyzes the tasks it affects, the ones with a priority lower
+    or equal to the added or removed task, and the previous wcrts seed the fixed points when they are lower bounds of
+    the new ones: after a task is added, and after the wcets grow (a slower level). The schedulability and the wcrts
+    are the same as those of rta() on the changed rts.
+    """
+
+    def __init__(self, rts: list, vf=1.0, seed=None):
+        """
+        :param rts: tasks with C, T and D, sorted by priority
+        :param vf: wcet factor
+        :param seed: lower bounds of the wcrts (such as the wcrts of the rts with a lower factor), None for no bound
+        """
+        self._tasks = list(fingerprint(rts))
+        self._vf = vf
+        self._wcrt = []
+        self._schedulable = True
+        # Number of ceil evaluations of the fixed points.
+        self.ceils = 0
+        self._analyze(0, seed)
+
+    def _analyze(self, first: int, seed=None) -> None:
+        del self._wcrt[first:]
+        if len(self._wcrt) < first:
+            # A task with a higher priority is not schedulable.
+            return
+        self._schedulable, ceils = _fixed_points(self._tasks, self._vf, self._wcrt, first, seed)
+        self.ceils += ceils
+
+    def add_task(self, task: dict, index=None) -> int:
+        """
+        Add a task. The wcrts of the tasks with a higher priority do not change, and the previous wcrts of the tasks
+        with a lower priority are lower bounds of the new ones.
+        :param task: task with C, T and D
+        :param index: priority of the task, by default after the tasks with a period lower or equal to its period
+        :return: index of the task
+        """
+        if index is None:
+            index = bisect_right([t for _, t, _ in self._tasks], task["T"])
+        seed = [None] * (len(self._tasks) + 1)
+        seed[index + 1:index + 1 + len(self._wcrt[index:])] = self._wcrt[index:]
+        self._tasks.insert(index, (task["C"], task["T"], task["D"]))
+        self._analyze(index, seed)
+        return index
+
+    def remove_task(self, index: int) -> tuple:
+        """
+        Remove a task. The tasks with a lower priority are analyzed again from the usual lower bounds, their previous
+        wcrts are upper bounds.
+        :param index: index of the task
+        :return: (C, T, D) of the removed task
+        """
+        task = self._tasks.pop(index)
+        self._analyze(index)
+        return task
+
+    def scale(self, vf) -> None:
+        """
+        Change the wcet factor. With a greater factor the previous wcrts seed the fixed points.
+        :param vf: wcet factor
+        """
+        if vf == self._vf:
+            return
+        seed = None
+        if vf > self._vf:
+            seed = self._wcrt + [None] * (len(self._tasks) - len(self._wcrt))
+        self._vf = vf
+        self._analyze(0, seed)
+
+    @property
+    def schedulable(self) -> bool:
+        return self._schedulable
+
+    @property
+    def wcrt(self) -> tuple:
+        """ wcrt of each task, None for the tasks after the first one that is not schedulable """
+        return tuple(self._wcrt) + (None,) * (len(self._tasks) - len(self._wcrt))
+
+    @property
+    def vf(self):
+        return self._vf
+
+    @property
+    def tasks(self) -> tuple:
+        """ (C, T, D) of each task, sorted by priority """
+        return tuple(self._tasks)
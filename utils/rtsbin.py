@@ -0,0 +1,167 @@
+"""
+Columnar binary task-set format.
+
+Layout (little endian):
+
+0:	header	magic "RTSBIN01", value type (0: int64, 1: float64), number of rts N, number of tasks M
+1:	ids	int64[N]	rts ids
+2:	offsets	int64[N + 1]	index of the first task of each rts, and M
+3:	C	type[M]	wcet of every task, rts after rts
+4:	T	type[M]	periods
+5:	D	type[M]	deadlines
+
+The file is mapped with numpy.memmap, so loading does not copy it and processes reading the same file share its
+pages.
+"""
+from array import array
+import struct
+
+_MAGIC = b"RTSBIN01"
+_HEADER = struct.Struct("<8sqqq")
+_INT, _FLOAT = 0, 1
+
+
+def write_bin(path: str, rts_list) -> int:
+    """
+    Write task sets in the binary format. Values are stored as int64 if all of them are integers.
+    :param path: output file path
+    :param rts_list: iterable of rts
+    :return: number of rts written
+    """
+    import numpy as np
+
+    ids, offsets = array('q'), array('q', [0])
+    columns = [array('d'), array('d'), array('d')]
+    integer = True
+
+    for rts in rts_list:
+        ids.append(rts["id"])
+        for task in rts["ptasks"]:
+            for column, key in zip(columns, ("C", "T", "D")):
+                column.append(task[key])
+                integer = integer and float(task[key]).is_integer()
+        offsets.append(len(columns[0]))
+
+    dtype = np.int64 if integer else np.float64
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _INT if integer else _FLOAT, len(ids), len(columns[0])))
+        ids.tofile(f)
+        offsets.tofile(f)
+        for column in columns:
+            np.frombuffer(column, dtype=np.float64).astype(dtype).tofile(f)
+
+    return len(ids)
+
+
+def write_bin_arrays(path: str, first_id: int, c, t, d) -> int:
+    """
+    Write task sets with the same number of tasks, given as integer matrices with one task set per row. The ids are
+    consecutive.
+    :param path: output file path
+    :param first_id: id of the first rts
+    :param c: wcet matrix
+    :param t: period matrix
+    :param d: deadline matrix
+    :return: number of rts written
+    """
+    import numpy as np
+
+    c, t, d = (np.asarray(column, dtype=np.int64) for column in (c, t, d))
+    n = len(c)
+    m = c.size
+    tasks = m // n if n else 0
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _INT, n, m))
+        np.arange(first_id, first_id + n, dtype=np.int64).tofile(f)
+        np.arange(0, m + 1, max(tasks, 1), dtype=np.int64).tofile(f)
+        for column in (c, t, d):
+            column.tofile(f)
+
+    return n
+
+
+class RtsBinFile:
+    """
+    Memory mapped task-set file.
+    """
+    def __init__(self, path: str):
+        import numpy as np
+
+        with open(path, "rb") as f:
+            magic, value_type, n, m = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError("{0:} is not a binary task-set file".format(path))
+
+        dtype = np.int64 if value_type == _INT else np.float64
+        offset = _HEADER.size
+
+        def map_array(dtype, size):
+            nonlocal offset
+            view = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(size,)) if size else \
+                np.zeros(0, dtype=dtype)
+            offset += size * 8
+            return view
+
+        self.ids = map_array(np.int64, n)
+        self.offsets = map_array(np.int64, n + 1)
+        self.c = map_array(dtype, m)
+        self.t = map_array(dtype, m)
+        self.d = map_array(dtype, m)
+
+        # position of each rts id, only needed if the ids are not consecutive
+        self._first_id = int(self.ids[0]) if n else 0
+        self._consecutive = bool(np.array_equal(self.ids, np.arange(self._first_id, self._first_id + n)))
+        self._positions = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def position(self, rts_id: int):
+        """
+        Position of a rts in the file.
+        :param rts_id: rts id
+        :return: position, or None if the rts is not in the file
+        """
+        if self._consecutive:
+            pos = rts_id - self._first_id
+            return pos if 0 <= pos < len(self.ids) else None
+        if self._positions is None:
+            self._positions = {int(rts_id): pos for pos, rts_id in enumerate(self.ids)}
+        return self._positions.get(rts_id)
+
+    def arrays(self, pos: int) -> tuple:
+        """
+        C, T and D of a rts, as views of the mapped file.
+        :param pos: rts position
+        :return: wcet, period and deadline arrays
+        """
+        start, end = self.offsets[pos], self.offsets[pos + 1]
+        return self.c[start:end], self.t[start:end], self.d[start:end]
+
+    def batch(self, first: int, last: int) -> tuple:
+        """
+        C, T and D of the rts in the positions [first, last) as 2-D views of the mapped file, one rts per row. All the
+        rts in the range must have the same number of tasks.
+        :param first: first position
+        :param last: last position (excluded)
+        :return: wcet, period and deadline matrices
+        """
+        start, end = self.offsets[first], self.offsets[last]
+        shape = (last - first, (end - start) // max(last - first, 1))
+        if shape[0] * shape[1] != end - start:
+            raise ValueError("The rts in the range have different number of tasks")
+        return (self.c[start:end].reshape(shape), self.t[start:end].reshape(shape),
+                self.d[start:end].reshape(shape))
+
+    def rts(self, pos: int) -> dict:
+        """
+        Build the rts dict used by the simulators and tests.
+        :param pos: rts position
+        :return: rts
+        """
+        c, t, d = self.arrays(pos)
+        ptasks = [{"nro": nro, "C": tc, "T": tt, "D": td}
+                  for nro, (tc, tt, td) in enumerate(zip(c.tolist(), t.tolist(), d.tolist()), 1)]
+        return {"id": int(self.ids[pos]), "ptasks": ptasks, "atasks": [], "stasks": []}